@@ -0,0 +1,141 @@
+"""
+Admission control for the prediction endpoints.
+
+Each model gets a concurrency cap and a priority queue that lives on the event
+loop, so waiting requests do not hold threadpool threads. Requests carry a
+deadline (`X-Request-Timeout` header, seconds). On arrival the controller
+estimates the queue wait from an EWMA of recent service times:
+
+- prediction-only requests jump ahead of explanation requests,
+- an explanation request that would miss its deadline is degraded to
+  prediction-only instead of queued behind slow SHAP calls,
+- a request that cannot finish in time even without SHAP is rejected with 429.
+
+A request cancelled while queued (client gone, server shutting down) gives up
+its place, and passes on the slot if one was already handed to it.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+
+PREDICT = 0
+EXPLAIN = 1
+
+
+class Ticket:
+    def __init__(self, controller: "AdmissionController", explain: bool, degraded: bool, deadline: float):
+        self.controller = controller
+        self.explain = explain
+        self.degraded = degraded
+        self.deadline = deadline
+        self.started = time.monotonic()
+
+
+class AdmissionController:
+    def __init__(self, name: str, max_concurrency: int, default_timeout: float = 10.0,
+                 max_queue: int = 256, smoothing: float = 0.2):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.max_queue = max_queue
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.rejected = 0
+        self.degraded = 0
+        # Seed estimates; the first completions replace them
+        self.service_time = {PREDICT: 0.005, EXPLAIN: 0.05}
+        self._waiters = []
+        self._order = itertools.count()
+
+    def _queued(self, priority: int):
+        return [item for item in self._waiters if item[0] <= priority and not item[2].done()]
+
+    def estimate_wait(self, priority: int) -> float:
+        """Expected seconds before a new request of this priority starts running."""
+        ahead = self._queued(priority)
+        if self.in_flight < self.max_concurrency and not ahead:
+            return 0.0
+        work = sum(self.service_time[item[0]] for item in ahead)
+        # Jobs already running finish, on average, halfway through their service time
+        work += self.in_flight * self.service_time[EXPLAIN] / 2
+        return work / self.max_concurrency
+
+    def _reject(self, detail: str, retry_after: float):
+        self.rejected += 1
+        raise HTTPException(
+            status_code=429,
+            detail=f"{self.name} overloaded: {detail}",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    async def acquire(self, explain: bool, timeout: Optional[float] = None) -> Ticket:
+        timeout = self.default_timeout if timeout is None else timeout
+        now = time.monotonic()
+        deadline = now + timeout
+        degraded = False
+        if explain and self.estimate_wait(EXPLAIN) + self.service_time[EXPLAIN] > timeout:
+            explain, degraded = False, True
+        priority = EXPLAIN if explain else PREDICT
+        wait = self.estimate_wait(priority)
+        if wait + self.service_time[priority] > timeout:
+            self._reject("queue wait exceeds request deadline", wait)
+        if len(self._queued(EXPLAIN)) >= self.max_queue:
+            self._reject("queue is full", wait)
+
+        if self.in_flight < self.max_concurrency and not self._queued(priority):
+            self.in_flight += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._order), future))
+            try:
+                # shield so a timeout does not cancel a slot that was just handed over
+                await asyncio.wait_for(asyncio.shield(future), timeout=deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                self._abandon(future)
+                self._reject("deadline expired while queued", self.estimate_wait(priority))
+            except asyncio.CancelledError:
+                self._abandon(future)
+                raise
+            # Re-check after queueing: skip SHAP if it would no longer fit
+            if explain and time.monotonic() + self.service_time[EXPLAIN] > deadline:
+                explain, degraded = False, True
+        if degraded:
+            self.degraded += 1
+        return Ticket(self, explain, degraded, deadline)
+
+    def release(self, ticket: Ticket):
+        elapsed = time.monotonic() - ticket.started
+        kind = EXPLAIN if ticket.explain else PREDICT
+        self.service_time[kind] += self.smoothing * (elapsed - self.service_time[kind])
+        self._release_slot()
+
+    def _abandon(self, future: asyncio.Future):
+        """Leave the queue; a slot that was already handed over goes to the next waiter."""
+        if future.done():
+            self._release_slot()
+        else:
+            future.cancel()
+
+    def _release_slot(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the next waiter
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self):
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queued": len(self._queued(EXPLAIN)),
+            "rejected": self.rejected,
+            "degraded": self.degraded,
+            "service_time_s": {"predict": self.service_time[PREDICT], "explain": self.service_time[EXPLAIN]},
+        }
@@ -0,0 +1,147 @@
+"""
+Two-stage cascade for classifiers.
+
+A small, shallow first-stage model scores every row. Rows where its top class
+probability reaches the calibrated threshold are answered by it (with SHAP
+values from XGBoost's native `pred_contribs`, which is cheap on shallow trees);
+the rest escalate to the full model and its explainer.
+
+`calibrate` picks the lowest threshold whose cascade accuracy on held-out rows
+stays within `max_accuracy_loss` of the full model, which minimizes the
+escalation rate under that constraint. `fit_cascade` trains the first stage
+and calibrates it; both training scripts save the first-stage model, threshold
+and calibration report together (`models/engine_cascade.pkl`).
+"""
+import threading
+from typing import Dict
+
+import numpy as np
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+
+from tree_compiler import CompiledForest, verify
+
+# Shallow trees that answer confident readings. multi:softmax, because the tree compiler
+# reproduces its probabilities exactly, so the first stage is served compiled.
+FIRST_STAGE_PARAMS = {"objective": "multi:softmax", "n_estimators": 30, "max_depth": 2,
+                      "eval_metric": "mlogloss", "random_state": 42}
+# Largest accuracy drop (absolute) the cascade may trade for fewer escalations
+MAX_ACCURACY_LOSS = 0.01
+
+
+def calibrate(stage1_proba: np.ndarray, full_pred: np.ndarray, y_true: np.ndarray,
+              max_accuracy_loss: float) -> Dict:
+    """Lowest confidence threshold keeping cascade accuracy within `max_accuracy_loss` of the full model."""
+    y_true = np.asarray(y_true)
+    confidence = stage1_proba.max(axis=1)
+    order = np.argsort(-confidence, kind="stable")
+    confidence = confidence[order]
+    stage1_correct = (stage1_proba.argmax(axis=1) == y_true)[order]
+    full_correct = (np.asarray(full_pred) == y_true)[order]
+
+    # Accepting the m most confident rows: stage 1 answers rows [0, m), the full model the rest
+    accepted_hits = np.concatenate([[0], np.cumsum(stage1_correct)])
+    escalated_hits = full_correct.sum() - np.concatenate([[0], np.cumsum(full_correct)])
+    accuracy = (accepted_hits + escalated_hits) / len(y_true)
+    full_accuracy = accuracy[0]
+    # A threshold can only split between rows of different confidence
+    boundary = np.concatenate([[True], confidence[1:] < confidence[:-1], [True]])
+    allowed = np.flatnonzero(boundary & (accuracy >= full_accuracy - max_accuracy_loss))
+    accepted = allowed.max()
+    threshold = float(confidence[accepted - 1]) if accepted > 0 else np.inf
+    return {
+        "threshold": threshold,
+        "max_accuracy_loss": max_accuracy_loss,
+        "full_accuracy": float(full_accuracy),
+        "cascade_accuracy": float(accuracy[accepted]),
+        "escalation_rate": 1.0 - accepted / len(y_true),
+    }
+
+
+def evaluate(stage1_proba: np.ndarray, full_pred: np.ndarray, y_true: np.ndarray, threshold: float) -> Dict:
+    """Accuracy and escalation rate of a cascade with a fixed threshold."""
+    escalated = stage1_proba.max(axis=1) < threshold
+    prediction = np.where(escalated, full_pred, stage1_proba.argmax(axis=1))
+    return {
+        "full_accuracy": float((np.asarray(full_pred) == np.asarray(y_true)).mean()),
+        "cascade_accuracy": float((prediction == np.asarray(y_true)).mean()),
+        "escalation_rate": float(escalated.mean()),
+    }
+
+
+def fit_cascade(X_train, y_train, model, X_test, y_test, max_accuracy_loss: float = MAX_ACCURACY_LOSS,
+                **params) -> Dict:
+    """Train the first stage and calibrate its threshold against the full `model`; returns the artifact."""
+    stage1_model = xgb.XGBClassifier(**{**FIRST_STAGE_PARAMS, **params}).fit(X_train, y_train)
+
+    # Calibrate the escalation threshold on half of the test split, check it on the other half
+    X_cal, X_check, y_cal, y_check = train_test_split(
+        X_test, y_test, test_size=0.5, random_state=42, stratify=y_test
+    )
+    calibration = calibrate(
+        stage1_model.predict_proba(X_cal), model.predict(X_cal), y_cal, max_accuracy_loss
+    )
+    calibration["holdout"] = evaluate(
+        stage1_model.predict_proba(X_check), model.predict(X_check), y_check, calibration["threshold"]
+    )
+    return {"model": stage1_model, "threshold": calibration["threshold"], "calibration": calibration}
+
+
+def summary(calibration: Dict) -> str:
+    holdout = calibration["holdout"]
+    return "\n".join([
+        f"Cascade threshold {calibration['threshold']:.3f} "
+        f"(max accuracy loss {calibration['max_accuracy_loss']:.3f})",
+        f"Expected escalation rate: {holdout['escalation_rate']:.1%} "
+        f"(calibration split {calibration['escalation_rate']:.1%})",
+        f"Accuracy full {holdout['full_accuracy']:.4f}, cascade {holdout['cascade_accuracy']:.4f}",
+    ])
+
+
+class Cascade:
+    """Serving side of a trained cascade artifact."""
+
+    def __init__(self, artifact: Dict):
+        self.model = artifact["model"]
+        self.threshold = float(artifact["threshold"])
+        self.calibration = artifact.get("calibration", {})
+        self.predictor = self.model
+        # Shallow trees compile well and skip the wrapper overhead on every request
+        try:
+            compiled = CompiledForest.from_model(self.model)
+            if verify(self.model, compiled):
+                self.predictor = compiled
+        except ValueError as exc:
+            print(f"Warning: cascade first stage not compiled: {exc}")
+        self.rows = 0
+        self.escalated = 0
+        self.lock = threading.Lock()
+
+    def screen(self, features: np.ndarray):
+        """First-stage probabilities and the mask of rows that must escalate to the full model."""
+        proba = self.predictor.predict_proba(features)
+        escalated = proba.max(axis=1) < self.threshold
+        with self.lock:
+            self.rows += len(features)
+            self.escalated += int(escalated.sum())
+        return proba, escalated
+
+    def explain(self, features: np.ndarray) -> np.ndarray:
+        """SHAP values of the first stage laid out like TreeExplainer: (rows, features[, classes])."""
+        booster = self.model.get_booster()
+        contribs = booster.predict(xgb.DMatrix(features, feature_names=booster.feature_names), pred_contribs=True)
+        if contribs.ndim == 2:
+            return contribs[:, :-1]
+        return np.transpose(contribs[:, :, :-1], (0, 2, 1))
+
+    def stats(self) -> Dict:
+        with self.lock:
+            rows, escalated = self.rows, self.escalated
+        return {
+            "threshold": self.threshold,
+            "backend": "compiled" if self.predictor is not self.model else "native",
+            "rows": rows,
+            "escalated": escalated,
+            "escalation_rate": escalated / rows if rows else None,
+            "calibration": self.calibration,
+        }
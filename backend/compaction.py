@@ -0,0 +1,166 @@
+"""
+Post-training model compaction.
+
+Inference and TreeSHAP cost both grow with tree count and depth, so smaller
+boosters lower the cost of every request. `compact` builds variants of a
+trained XGBoost model and measures each one:
+
+- `pruned`: the full model truncated after the last boosting round whose
+  validation gain is not negligible,
+- `reduced`: retrained without the features that carry a negligible share of
+  global mean |SHAP| importance,
+- `distilled`: fewer, shallower trees fit to the teacher's outputs on the
+  training rows plus jittered copies of them.
+
+Every variant is scored on held-out rows for quality, single-row predict and
+SHAP latency, tree count and serialized size. The Pareto frontier of quality
+against explained-request latency (predict + SHAP) is reported, and the
+fastest variant within the quality tolerance is recommended.
+"""
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import shap
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, r2_score
+
+
+def is_classifier(model) -> bool:
+    return isinstance(model, xgb.XGBClassifier)
+
+
+def quality(model, X, y) -> float:
+    """Accuracy for classifiers, mean R² over targets for regressors."""
+    if is_classifier(model):
+        return float(accuracy_score(y, model.predict(X)))
+    return float(r2_score(y, model.predict(X)))
+
+
+def truncate(model, n_rounds: int):
+    """Copy of a fitted model keeping only its first `n_rounds` boosting rounds."""
+    compact = type(model)()
+    compact.load_model(model.get_booster()[:n_rounds].save_raw())
+    return compact
+
+
+def prune_rounds(model, X_val, y_val, tolerance: float, step: int = 5) -> int:
+    """Fewest boosting rounds whose validation quality is within `tolerance` of the best round count."""
+    total = model.get_booster().num_boosted_rounds()
+    candidates = sorted({*range(step, total, step), total})
+    scores = []
+    for rounds in candidates:
+        prediction = model.predict(X_val, iteration_range=(0, rounds))
+        scores.append(accuracy_score(y_val, prediction) if is_classifier(model) else r2_score(y_val, prediction))
+    best = max(scores)
+    return next(rounds for rounds, score in zip(candidates, scores) if score >= best - tolerance)
+
+
+def shap_importance(model, X) -> pd.Series:
+    """Share of global mean |SHAP| per feature, summed over classes/targets."""
+    values = np.abs(shap.TreeExplainer(model)(X).values)
+    per_feature = values.mean(axis=0)
+    if per_feature.ndim == 2:
+        per_feature = per_feature.sum(axis=1)
+    return pd.Series(per_feature / per_feature.sum(), index=list(X.columns)).sort_values(ascending=False)
+
+
+def refit(model, X, y, **overrides):
+    params = {**model.get_params(), **overrides}
+    params.pop("use_label_encoder", None)
+    return type(model)(**params).fit(X, y)
+
+
+def distill(teacher, X_train, n_estimators: int, max_depth: int, copies: int = 2, noise: float = 0.05,
+            random_state: int = 42):
+    """Student trained on the teacher's outputs over the training rows and jittered copies of them."""
+    rng = np.random.default_rng(random_state)
+    scale = X_train.std().to_numpy() * noise
+    frames = [X_train] + [
+        X_train + rng.normal(size=X_train.shape) * scale for _ in range(copies)
+    ]
+    X_transfer = pd.concat(frames, ignore_index=True).astype(np.float32)
+    targets = teacher.predict(X_transfer)
+    return refit(teacher, X_transfer, targets, n_estimators=n_estimators, max_depth=max_depth)
+
+
+def latency_us(fn, X, repeats: int = 200) -> float:
+    """Median single-row call latency in microseconds."""
+    rows = X.to_numpy(dtype=np.float32)
+    timings = []
+    for i in range(repeats):
+        row = rows[i % len(rows)][None, :]
+        start = time.perf_counter()
+        fn(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1e6)
+
+
+def measure(name: str, model, X_test, y_test, features: List[str]) -> Dict:
+    booster = model.get_booster()
+    explainer = shap.TreeExplainer(model)
+    X = X_test[features]
+    config_depth = model.get_params().get("max_depth")
+    return {
+        "variant": name,
+        "quality": quality(model, X, y_test),
+        "rounds": booster.num_boosted_rounds(),
+        "trees": len(booster.get_dump()),
+        "max_depth": config_depth if config_depth is not None else 6,
+        "features": len(features),
+        "size_bytes": len(booster.save_raw()),
+        "predict_us": latency_us(model.predict, X),
+        "shap_us": latency_us(lambda row: explainer(row), X, repeats=50),
+    }
+
+
+def request_us(result: Dict) -> float:
+    """Single-row cost of an explained request: predict plus SHAP."""
+    return result["predict_us"] + result["shap_us"]
+
+
+def pareto_frontier(results: List[Dict]) -> List[str]:
+    """Variants not beaten on both quality and request latency by another variant."""
+    frontier = []
+    for candidate in results:
+        dominated = any(
+            other["quality"] >= candidate["quality"] and request_us(other) <= request_us(candidate)
+            and (other["quality"] > candidate["quality"] or request_us(other) < request_us(candidate))
+            for other in results
+        )
+        if not dominated:
+            frontier.append(candidate["variant"])
+    return frontier
+
+
+def compact(model, X_train, y_train, X_val, y_val, X_test, y_test, tolerance: float,
+            importance_floor: float = 0.01, student: Optional[Dict] = None) -> Dict:
+    """Build, measure and rank the compacted variants of a fitted model."""
+    features = list(X_train.columns)
+    student = student or {"n_estimators": 40, "max_depth": 3}
+    variants = {"full": (model, features)}
+
+    rounds = prune_rounds(model, X_val, y_val, tolerance)
+    variants["pruned"] = (truncate(model, rounds), features)
+
+    importance = shap_importance(model, X_val)
+    kept = [name for name in features if importance[name] >= importance_floor]
+    if len(kept) < len(features):
+        variants["reduced"] = (refit(model, X_train[kept], y_train), kept)
+
+    variants["distilled"] = (distill(model, X_train, **student), features)
+
+    results = [measure(name, variant, X_test, y_test, cols) for name, (variant, cols) in variants.items()]
+    baseline = results[0]["quality"]
+    eligible = [r for r in results if r["quality"] >= baseline - tolerance]
+    recommended = min(eligible, key=request_us)
+    return {
+        "tolerance": tolerance,
+        "importance": importance.to_dict(),
+        "dropped_features": [name for name in features if name not in kept],
+        "results": results,
+        "frontier": pareto_frontier(results),
+        "recommended": recommended["variant"],
+        "models": {name: variant for name, (variant, _) in variants.items()},
+    }
@@ -0,0 +1,184 @@
+"""
+Data-parallel XGBoost training across worker processes.
+
+The training rows are split into one shard per worker. Every worker fits the
+same estimator on its shard inside an XGBoost collective (rabit) context, so
+quantile sketches and gradient histograms are allreduced each round and all
+workers grow the same trees. The model trained on the full dataset comes back
+from rank 0.
+
+`train` is the local launcher: it starts a tracker on the loopback interface
+and forks the workers, which slice their shard out of rows already in memory,
+so the whole protocol can run on one Linux box. Across machines the same
+`fit_worker` runs once per node against a tracker started with
+`start_tracker`. Each node then loads only its own shard: `read_shard` keeps
+every `world_size`-th row of the CSV, or `write_shards` pre-splits the file so
+a node reads nothing but its part (see `utils/train_distributed.py`).
+"""
+import multiprocessing
+import os
+import queue
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from xgboost import collective
+from xgboost.tracker import RabitTracker
+
+# Seconds a worker or the tracker waits for the others before giving up
+DEFAULT_TIMEOUT = 600
+
+
+def shard(y, world_size: int, rank: int, stratify: bool = False, seed: int = 42) -> np.ndarray:
+    """Row positions of one worker's shard; stratified shards keep every class on every worker."""
+    labels = np.asarray(y)
+    rng = np.random.default_rng(seed)
+    if not stratify:
+        return np.sort(np.array_split(rng.permutation(len(labels)), world_size)[rank])
+    positions = []
+    for label in np.unique(labels):
+        members = rng.permutation(np.flatnonzero(labels == label))
+        if len(members) < world_size:
+            raise ValueError(f"Class {label} has {len(members)} rows, fewer than {world_size} workers")
+        positions.append(np.array_split(members, world_size)[rank])
+    return np.sort(np.concatenate(positions))
+
+
+def memory_shards(X, y, stratify: bool = False) -> Callable[[int, int], Tuple]:
+    """Shard loader over rows already in memory (the local launcher's workers share them through fork)."""
+    def load(rank: int, world_size: int):
+        rows = shard(y, world_size, rank, stratify)
+        return X.iloc[rows], y.iloc[rows]
+    return load
+
+
+def read_shard(path, world_size: int, rank: int) -> pd.DataFrame:
+    """Rows `rank`, `rank + world_size`, ... of a CSV; the other rows are skipped while parsing."""
+    return pd.read_csv(path, skiprows=lambda line: line > 0 and (line - 1) % world_size != rank)
+
+
+def write_shards(path, world_size: int, directory, chunk_size: int = 100000) -> List:
+    """Split a CSV into `world_size` files the way `read_shard` does, streaming it once."""
+    directory.mkdir(parents=True, exist_ok=True)
+    outputs = [directory / f"{path.stem}-{rank}-of-{world_size}.csv" for rank in range(world_size)]
+    offset = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        for rank, output in enumerate(outputs):
+            part = chunk.iloc[(rank - offset) % world_size::world_size]
+            part.to_csv(output, mode="w" if offset == 0 else "a", header=offset == 0, index=False)
+        offset += len(chunk)
+    return outputs
+
+
+def start_tracker(n_workers: int, host: str = "127.0.0.1", port: int = 0,
+                  timeout: int = DEFAULT_TIMEOUT) -> Tuple[RabitTracker, Dict]:
+    """Start the rendezvous tracker; returns it with the arguments every worker needs to join."""
+    tracker = RabitTracker(n_workers=n_workers, host_ip=host, port=port, sortby="task", timeout=timeout)
+    tracker.start()
+    return tracker, {**tracker.worker_args(), "dmlc_timeout": timeout}
+
+
+def fit_worker(rank: int, world_size: int, tracker_args: Dict, make_estimator: Callable,
+               load_shard: Callable[[int, int], Tuple], nthread: Optional[int] = None) -> Dict:
+    """Prepare this worker's shard, join the collective as `rank` and fit; rank 0's report carries the model.
+
+    `load_shard(rank, world_size)` returns the shard's training rows (X, y).
+    """
+    started = time.perf_counter()
+    X_shard, y_shard = load_shard(rank, world_size)
+    sharded = time.perf_counter()
+    with collective.CommunicatorContext(dmlc_task_id=str(rank), **tracker_args):
+        connected = time.perf_counter()
+        estimator = make_estimator()
+        if nthread:
+            estimator.set_params(n_jobs=nthread)
+        estimator.fit(X_shard, y_shard)
+        fitted = time.perf_counter()
+    return {
+        "rank": rank,
+        "rows": len(X_shard),
+        "shard_s": sharded - started,
+        "connect_s": connected - sharded,
+        "fit_s": fitted - connected,
+        "total_s": fitted - started,
+        "model": estimator if rank == 0 else None,
+    }
+
+
+def _worker(results, rank: int, *args):
+    try:
+        results.put(fit_worker(rank, *args))
+    except BaseException as error:  # reported to the launcher, which stops the other workers
+        results.put({"rank": rank, "error": repr(error)})
+        raise
+
+
+def train(make_estimator: Callable, X, y, workers: int, stratify: bool = False, nthread: Optional[int] = None,
+          timeout: int = DEFAULT_TIMEOUT) -> Tuple[object, Dict]:
+    """Fit `make_estimator()` on X, y with `workers` local processes; returns the model and a timing report.
+
+    `nthread` is the kernel threads per worker (default: the cores split evenly).
+    """
+    nthread = nthread or max(1, (os.cpu_count() or 1) // workers)
+    started = time.perf_counter()
+    tracker, tracker_args = start_tracker(workers, timeout=timeout)
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker, args=(results, rank, workers, tracker_args, make_estimator,
+                                              memory_shards(X, y, stratify), nthread), daemon=True)
+        for rank in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    reports: List[Dict] = []
+    deadline = time.monotonic() + timeout
+    try:
+        while len(reports) < workers:
+            try:
+                report = results.get(timeout=1.0)
+            except queue.Empty:
+                failed = [p.exitcode for p in processes if p.exitcode not in (None, 0)]
+                if failed or time.monotonic() > deadline:
+                    raise RuntimeError(f"Distributed training failed (worker exit codes {failed or 'timeout'})")
+                continue
+            if "error" in report:
+                raise RuntimeError(f"Worker {report['rank']} failed: {report['error']}")
+            reports.append(report)
+        tracker.wait_for(timeout)
+    finally:
+        for process in processes:
+            if process.is_alive() and len(reports) < workers:
+                process.terminate()
+            process.join()
+        tracker.free()
+
+    reports.sort(key=lambda report: report["rank"])
+    model = reports[0].pop("model")
+    for report in reports[1:]:
+        report.pop("model")
+    model.set_params(n_jobs=make_estimator().get_params().get("n_jobs"))
+    return model, {
+        "workers": workers,
+        "nthread": nthread,
+        "wall_s": time.perf_counter() - started,
+        "fit_s": max(report["fit_s"] for report in reports),
+        "per_worker": reports,
+    }
+
+
+def scaling(make_estimator: Callable, X, y, worker_counts: Sequence[int], stratify: bool = False,
+            nthread: Optional[int] = None) -> List[Dict]:
+    """Train once per worker count; speedup and efficiency are relative to one worker through the same launcher."""
+    rows = []
+    for workers in worker_counts:
+        _, report = train(make_estimator, X, y, workers, stratify=stratify, nthread=nthread)
+        rows.append(report)
+    baseline = next((row for row in rows if row["workers"] == 1), rows[0])
+    for row in rows:
+        row["speedup"] = baseline["wall_s"] / row["wall_s"]
+        row["fit_speedup"] = baseline["fit_s"] / row["fit_s"]
+        row["efficiency"] = row["speedup"] * baseline["workers"] / row["workers"]
+    return rows
@@ -0,0 +1,150 @@
+"""
+Streaming input-drift monitoring.
+
+Training captures a reference distribution per feature: decile bin edges and
+the share of training rows in each bin (`build_reference`). At serving time a
+`DriftMonitor` bins every scored row against the same edges and keeps running
+counts, so memory is fixed at features x bins no matter how much traffic is
+seen. Rows are handed to a background thread through a bounded queue, so the
+request only pays for an enqueue. PSI and a binned KS statistic per feature
+compare the live histogram with the reference.
+"""
+import os
+import queue
+import threading
+import weakref
+from typing import Dict, List, Optional
+
+import numpy as np
+
+N_BINS = 10
+# Conventional PSI bands: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 drift
+PSI_MODERATE = 0.1
+PSI_DRIFT = 0.25
+EPSILON = 1e-6
+
+
+def bin_index(X: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Bin of every value given (features, N_BINS - 1) inner edges; equal to an edge goes right."""
+    return (X[:, :, None] >= edges[None, :, :]).sum(axis=2)
+
+
+def build_reference(X, n_bins: int = N_BINS) -> Dict:
+    """Reference histogram of a training frame, saved next to the model artifacts."""
+    # Round through float32 like the serving path does, so values sitting on an edge bin identically
+    values = np.asarray(X, dtype=np.float32).astype(np.float64)
+    quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+    edges = np.quantile(values, quantiles, axis=0).T
+    bins = bin_index(values, edges)
+    counts = np.stack([np.bincount(bins[:, f], minlength=n_bins) for f in range(values.shape[1])])
+    return {
+        "feature_names": list(X.columns) if hasattr(X, "columns") else None,
+        "edges": edges,
+        "proportions": counts / len(values),
+        "rows": len(values),
+    }
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    expected = np.maximum(expected, EPSILON)
+    actual = np.maximum(actual, EPSILON)
+    return ((actual - expected) * np.log(actual / expected)).sum(axis=-1)
+
+
+def binned_ks(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    return np.abs(np.cumsum(actual, axis=-1) - np.cumsum(expected, axis=-1)).max(axis=-1)
+
+
+# Threads do not survive fork(); pre-forked workers (prefork.py) restart them
+_monitors = weakref.WeakSet()
+
+
+def _restart_after_fork():
+    for monitor in list(_monitors):
+        monitor._start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+class DriftMonitor:
+    def __init__(self, reference: Dict, field_names: List[str], half_life: float = 0.0,
+                 queue_size: int = 10000):
+        self.field_names = list(field_names)
+        self.edges = np.asarray(reference["edges"], dtype=np.float64)
+        self.expected = np.asarray(reference["proportions"], dtype=np.float64)
+        self.counts = np.zeros_like(self.expected)
+        self.rows = 0
+        self.dropped = 0
+        # Exponential forgetting so the histogram tracks recent traffic; 0 keeps all history
+        self.decay = 0.5 ** (1.0 / half_life) if half_life > 0 else 1.0
+        self.queue_size = queue_size
+        self._offsets = np.arange(len(self.field_names))[None, :] * self.expected.shape[1]
+        self._start()
+        _monitors.add(self)
+
+    def _start(self):
+        self.lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._worker = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+        self._worker.start()
+
+    def observe(self, features: np.ndarray):
+        """Queue scored rows for the background worker; drops them if the queue is full."""
+        try:
+            self._queue.put_nowait(np.array(features, dtype=np.float64))
+        except queue.Full:
+            with self.lock:
+                self.dropped += len(features)
+
+    def update(self, X: np.ndarray):
+        bins = bin_index(X, self.edges) + self._offsets
+        batch = np.bincount(bins.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+        with self.lock:
+            if self.decay != 1.0:
+                self.counts *= self.decay ** len(X)
+            self.counts += batch
+            self.rows += len(X)
+
+    def _run(self):
+        while True:
+            X = self._queue.get()
+            try:
+                self.update(X)
+            except Exception as exc:
+                print(f"Warning: drift update failed: {exc}")
+
+    def report(self) -> Dict:
+        with self.lock:
+            counts = self.counts.copy()
+            rows, dropped = self.rows, self.dropped
+        totals = counts.sum(axis=1, keepdims=True)
+        report = {"rows_observed": rows, "rows_dropped": dropped, "pending": self._queue.qsize()}
+        if rows == 0:
+            return {**report, "status": "no_data", "features": {}}
+        actual = counts / np.maximum(totals, EPSILON)
+        psi_values = psi(self.expected, actual)
+        ks_values = binned_ks(self.expected, actual)
+        max_psi = float(psi_values.max())
+        status = "drift" if max_psi > PSI_DRIFT else "moderate" if max_psi > PSI_MODERATE else "stable"
+        return {
+            **report,
+            "status": status,
+            "max_psi": max_psi,
+            "features": {
+                name: {"psi": float(p), "ks": float(k)}
+                for name, p, k in zip(self.field_names, psi_values, ks_values)
+            },
+        }
+
+
+def create_monitor(reference: Optional[Dict], trained_names: List[str], field_names: List[str],
+                   label: str, half_life: float = 0.0) -> Optional[DriftMonitor]:
+    """Monitor for a model, or None when its reference is missing or was built for other features."""
+    if reference is None:
+        return None
+    if reference.get("feature_names") not in (None, list(trained_names)):
+        print(f"Warning: {label} drift reference does not match the model features, drift disabled")
+        return None
+    return DriftMonitor(reference, field_names, half_life)
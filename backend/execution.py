@@ -0,0 +1,93 @@
+"""
+Thread budgeting for model kernels.
+
+Sync routes run in Starlette's threadpool and, left alone, every XGBoost predict
+and TreeSHAP call (SHAP delegates to XGBoost's `pred_contribs`) starts an OpenMP
+team as wide as the machine. Under concurrency that is requests x cores threads
+fighting for cores. The `ExecutionPolicy` keeps the total at the core budget:
+
+- every booster (model and explainer) is pinned to `nthread=1` at load,
+- small requests run single-threaded in the request thread,
+- large batches are split into row chunks run on a shared kernel pool; the
+  number of chunks is the core budget divided by the requests currently
+  scoring, so a lone batch uses every core and concurrent ones share them.
+
+Chunking is used instead of changing `nthread` per call because boosters are
+shared between requests and `set_param` is not safe to call concurrently.
+XGBoost releases the GIL while predicting, so chunks run in parallel.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import numpy as np
+
+
+def limit_threads(model, explainer=None, nthread: int = 1):
+    """Pin the XGBoost boosters behind a model and its SHAP explainer to `nthread`."""
+    boosters = []
+    if hasattr(model, "get_booster"):
+        model.set_params(n_jobs=nthread)
+        boosters.append(model.get_booster())
+    original = getattr(getattr(explainer, "model", None), "original_model", None)
+    if hasattr(original, "set_param"):
+        boosters.append(original)
+    for booster in boosters:
+        booster.set_param({"nthread": nthread})
+
+
+class ExecutionPolicy:
+    def __init__(self, cores: Optional[int] = None, min_chunk_rows: int = 256):
+        self.cores = max(1, cores or os.cpu_count() or 1)
+        # Batches below this many rows per chunk are not worth the hand-off to the pool
+        self.min_chunk_rows = min_chunk_rows
+        self.active = 0
+        self.parallel_calls = 0
+        self.lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        # Pool threads do not survive fork(); pre-forked workers build their own
+        with self.lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ThreadPoolExecutor(max_workers=self.cores, thread_name_prefix="kernel")
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    @contextmanager
+    def request(self):
+        """Count a request as scoring while the block runs."""
+        with self.lock:
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def parallelism(self, rows: int) -> int:
+        """Kernel threads a batch of `rows` may use given the requests currently scoring."""
+        with self.lock:
+            share = self.cores // max(self.active, 1)
+        return max(1, min(share, rows // self.min_chunk_rows))
+
+    def map_rows(self, fn: Callable[[np.ndarray], np.ndarray], X: np.ndarray) -> np.ndarray:
+        """Apply a row-wise kernel, splitting large batches across the kernel pool."""
+        chunks = self.parallelism(len(X))
+        if chunks == 1:
+            return fn(X)
+        with self.lock:
+            self.parallel_calls += 1
+        return np.concatenate(list(self.pool.map(fn, np.array_split(X, chunks))))
+
+    def stats(self):
+        return {
+            "cores": self.cores,
+            "active": self.active,
+            "min_chunk_rows": self.min_chunk_rows,
+            "parallel_calls": self.parallel_calls,
+        }
@@ -0,0 +1,92 @@
+"""
+Request schemas and feature extractors derived from the trained boosters.
+
+The column order a model was trained with is stored in the booster
+(`feature_names`). At load time each model gets a `FeatureSchema` built from
+those names: a generated Pydantic request model and a precompiled extractor
+that copies request fields, in training order, into a preallocated float32
+row. A request field that cannot be matched to a trained feature raises at
+startup instead of silently feeding columns in the wrong order.
+"""
+import threading
+from operator import attrgetter
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import Field, create_model
+
+import gbm_backends
+
+# Naval training columns keep their CSV units/symbols; the API exposes friendlier names
+NAVAL_FIELD_ALIASES = {
+    "Lever_position": "Lever_position",
+    "Ship_speed_v": "Ship_speed_knots",
+    "Gas_Turbine_GT_shaft_torque_GTT_kN_m": "Gas_Turbine_shaft_torque_kN_m",
+    "GT_rate_of_revolutions_GTn_rpm": "Gas_Turbine_rate_of_revolutions_rpm",
+    "Gas_Generator_rate_of_revolutions_GGn_rpm": "Gas_Generator_rate_of_revolutions_rpm",
+    "Starboard_Propeller_Torque_Ts_kN": "Starboard_Propeller_Torque_kN",
+    "Port_Propeller_Torque_Tp_kN": "Port_Propeller_Torque_kN",
+    "Hight_Pressure_HP_Turbine_exit_temperature_T48_C": "HP_Turbine_exit_temperature_C",
+    "GT_Compressor_inlet_air_temperature_T1_C": "GT_Compressor_inlet_air_temperature_C",
+    "GT_Compressor_outlet_air_temperature_T2_C": "GT_Compressor_outlet_air_temperature_C",
+    "HP_Turbine_exit_pressure_P48_bar": "HP_Turbine_exit_pressure_psi",
+    "GT_Compressor_inlet_air_pressure_P1_bar": "GT_Compressor_inlet_air_pressure_psi",
+    "GT_Compressor_outlet_air_pressure_P2_bar": "GT_Compressor_outlet_air_pressure_bar",
+    "GT_exhaust_gas_pressure_Pexh_bar": "Gas_Turbine_exhaust_gas_pressure_psi",
+    "Turbine_Injecton_Control_TIC_%": "Turbine_Injecton_Control",
+    "Fuel_flow_mf_kg/s": "Fuel_flow_lg_s",
+}
+
+
+class FeatureSchema:
+    def __init__(self, model_name: str, trained_names: List[str],
+                 field_aliases: Optional[Dict[str, str]] = None):
+        self.trained_names = list(trained_names)
+        if field_aliases is not None:
+            missing = [name for name in self.trained_names if name not in field_aliases]
+            unused = [name for name in field_aliases if name not in self.trained_names]
+            if missing or unused:
+                raise RuntimeError(
+                    f"{model_name} features do not match the request schema: "
+                    f"untranslated model features {missing}, unknown aliases {unused}"
+                )
+            self.field_names = [field_aliases[name] for name in self.trained_names]
+        else:
+            self.field_names = list(self.trained_names)
+
+        invalid = [name for name in self.field_names if not name.isidentifier()]
+        if invalid or len(set(self.field_names)) != len(self.field_names):
+            raise RuntimeError(
+                f"{model_name} request fields must be unique identifiers: {invalid}; map the model's features "
+                f"to identifier names with field_aliases (the model's entry in models/registry.json)"
+            )
+
+        # NaN/inf would be scored as missing values or skew the drift statistics; reject them with a 422
+        self.request_model = create_model(
+            model_name, **{name: (float, Field(..., allow_inf_nan=False)) for name in self.field_names}
+        )
+        self._getter = attrgetter(*self.field_names)
+        self._local = threading.local()
+
+    @classmethod
+    def from_model(cls, model_name: str, model, declared_names: List[str],
+                   field_aliases: Optional[Dict[str, str]] = None) -> "FeatureSchema":
+        """Build the schema from the model's trained names, or the declared ones if no model is loaded."""
+        if model is None:
+            return cls(model_name, declared_names, field_aliases)
+        trained_names = gbm_backends.feature_names(model)
+        if trained_names is None:
+            raise RuntimeError(f"{model_name} model has no stored feature names; retrain from a DataFrame")
+        return cls(model_name, trained_names, field_aliases)
+
+    def extract(self, request) -> np.ndarray:
+        """Fill this thread's preallocated (1, n_features) float32 row from a request.
+
+        The returned array is reused by the next call on the same thread, so
+        copy it if it has to outlive the request.
+        """
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.empty((1, len(self.field_names)), dtype=np.float32)
+        row[0] = self._getter(request)
+        return row
@@ -0,0 +1,203 @@
+"""
+Gradient-boosting libraries behind one interface for training and serving.
+
+A backend builds the classifier and regressor that `utils/train_models.py`
+fits, and the explainer saved next to them. Serving only needs what every
+backend's model provides: the scikit-learn `predict`/`predict_proba` API,
+the trained feature names (`feature_names`) and the number of regression
+targets (`num_targets`).
+
+- `xgboost` (default): `XGBClassifier`/`XGBRegressor`; multi-target natively.
+- `sklearn`: `HistGradientBoostingClassifier`/`HistGradientBoostingRegressor`,
+  always available.
+- `lightgbm`, `catboost`: registered when the library is installed.
+
+Backends without native multi-target regression fit one model per target
+(`MultiOutputRegressor`), explained by `MultiOutputExplainer`. `defaults`
+follow XGBoost's own defaults (100 rounds, learning rate 0.3, depth 6, no
+early stopping), so backends are compared at the same boosting budget. The
+tree compiler, compaction, the cascade and distributed training stay
+XGBoost-only.
+"""
+import json
+import warnings
+from typing import Dict, List, Optional
+
+import numpy as np
+import shap
+import xgboost as xgb
+from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+from sklearn.multioutput import MultiOutputRegressor
+
+try:
+    import lightgbm
+except ImportError:  # pragma: no cover - optional backend
+    lightgbm = None
+
+try:
+    import catboost
+except ImportError:  # pragma: no cover - optional backend
+    catboost = None
+
+DEFAULT_BACKEND = "xgboost"
+
+
+class Backend:
+    name = ""
+    # Whether one regressor can fit several targets
+    multi_output = False
+    # Fit on float32 features, as served, so split thresholds see the values requests will carry
+    float32 = True
+    estimators: Dict[str, type] = {}
+
+    def defaults(self, kind: str) -> Dict:
+        return {}
+
+    def estimator(self, kind: str, **params):
+        """Unfitted estimator of `kind`; `params` override the backend defaults."""
+        model = self.estimators[kind](**{**self.defaults(kind), **params})
+        if kind == "regressor" and not self.multi_output:
+            return MultiOutputRegressor(model)
+        return model
+
+    def fit(self, X, y, kind: str, **params):
+        if self.float32:
+            X = X.astype(np.float32)
+        return self.estimator(kind, **params).fit(X, y)
+
+
+class XGBoostBackend(Backend):
+    name = "xgboost"
+    multi_output = True
+    # Converts to float32 itself
+    float32 = False
+    estimators = {"classifier": xgb.XGBClassifier, "regressor": xgb.XGBRegressor}
+
+
+class SklearnBackend(Backend):
+    name = "sklearn"
+    estimators = {"classifier": HistGradientBoostingClassifier, "regressor": HistGradientBoostingRegressor}
+
+    def defaults(self, kind: str) -> Dict:
+        return {"max_iter": 100, "learning_rate": 0.3, "max_depth": 6, "max_leaf_nodes": None,
+                "early_stopping": False}
+
+
+class LightGBMBackend(Backend):
+    name = "lightgbm"
+
+    @property
+    def estimators(self):
+        return {"classifier": lightgbm.LGBMClassifier, "regressor": lightgbm.LGBMRegressor}
+
+    def defaults(self, kind: str) -> Dict:
+        return {"n_estimators": 100, "learning_rate": 0.3, "max_depth": 6, "num_leaves": 2 ** 6,
+                "verbose": -1}
+
+
+class CatBoostBackend(Backend):
+    name = "catboost"
+
+    @property
+    def estimators(self):
+        return {"classifier": catboost.CatBoostClassifier, "regressor": catboost.CatBoostRegressor}
+
+    def defaults(self, kind: str) -> Dict:
+        return {"iterations": 100, "learning_rate": 0.3, "depth": 6, "verbose": False,
+                "allow_writing_files": False}
+
+
+BACKENDS: Dict[str, Backend] = {backend.name: backend for backend in (XGBoostBackend(), SklearnBackend())}
+if lightgbm is not None:
+    BACKENDS["lightgbm"] = LightGBMBackend()
+if catboost is not None:
+    BACKENDS["catboost"] = CatBoostBackend()
+
+
+def get(name: str) -> Backend:
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown or unavailable backend {name!r}; available: {sorted(BACKENDS)}") from None
+
+
+def available() -> List[str]:
+    return list(BACKENDS)
+
+
+class ArrayPredictor:
+    """Serves a scikit-learn-API model on bare float32 arrays.
+
+    Served rows are laid out in the trained feature order (features.FeatureSchema),
+    so scikit-learn's warning that they carry no column names is silenced for
+    these calls only.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def _call(self, method: str, X):
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            return getattr(self.model, method)(X)
+
+    def predict(self, X):
+        return self._call("predict", X)
+
+    def predict_proba(self, X):
+        return self._call("predict_proba", X)
+
+
+def serving_predictor(model):
+    """Predictor for served arrays: XGBoost models as they are, other backends' models wrapped."""
+    if model is None or hasattr(model, "get_booster"):
+        return model
+    return ArrayPredictor(model)
+
+
+def feature_names(model) -> Optional[List[str]]:
+    """Feature names a fitted model was trained on, or None if it was fit on a bare array."""
+    if hasattr(model, "get_booster"):
+        return model.get_booster().feature_names
+    names = getattr(model, "feature_names_in_", None)
+    if names is None:
+        names = getattr(model, "feature_names_", None)
+    return None if names is None else [str(name) for name in names]
+
+
+def num_targets(model) -> int:
+    if hasattr(model, "get_booster"):
+        config = json.loads(model.get_booster().save_config())
+        return max(int(config["learner"]["learner_model_param"]["num_target"]), 1)
+    if isinstance(model, MultiOutputRegressor):
+        return len(model.estimators_)
+    return 1
+
+
+class MultiOutputExplainer:
+    """TreeSHAP over a `MultiOutputRegressor`: one explainer per target, values stacked last."""
+
+    def __init__(self, model: MultiOutputRegressor):
+        self.explainers = [shap.TreeExplainer(estimator) for estimator in model.estimators_]
+
+    @property
+    def expected_value(self) -> np.ndarray:
+        """Base value per target, like a multi-target TreeExplainer's."""
+        return np.array([np.atleast_1d(explainer.expected_value)[0] for explainer in self.explainers])
+
+    def __call__(self, X) -> shap.Explanation:
+        parts = [explainer(X) for explainer in self.explainers]
+        return shap.Explanation(
+            values=np.stack([part.values for part in parts], axis=-1),
+            base_values=np.stack([np.broadcast_to(part.base_values, (len(part.values),)) for part in parts],
+                                 axis=-1),
+            data=parts[0].data,
+            feature_names=parts[0].feature_names,
+        )
+
+
+def explainer(model):
+    """SHAP explainer for a fitted model; `explainer(X).values` is (rows, features[, outputs])."""
+    if isinstance(model, MultiOutputRegressor):
+        return MultiOutputExplainer(model)
+    return shap.TreeExplainer(model)
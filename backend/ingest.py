@@ -0,0 +1,96 @@
+"""
+Binary batch ingestion for the prediction endpoints.
+
+High-volume callers send a whole batch at once instead of one JSON object per
+row. The batch is validated once (declared schema, shape, dtype, finite
+values) and handed to the model as a NumPy array:
+
+- `application/octet-stream`: row-major little-endian float32 buffer. The
+  column order is declared in the `X-Feature-Names` header and the dtype in
+  `X-Dtype` (only `float32` is accepted). The array is a zero-copy view of the
+  request body.
+- `application/vnd.apache.arrow.stream`: an Arrow IPC stream whose schema lists
+  the feature columns as float32 fields. Needs `pyarrow`; columns are read
+  without copying and gathered into one row-major array.
+"""
+from typing import List, Optional
+
+import numpy as np
+from fastapi import HTTPException
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional Arrow support
+    pa = None
+
+MEDIA_FLOAT32 = "application/octet-stream"
+MEDIA_ARROW = "application/vnd.apache.arrow.stream"
+SUPPORTED_DTYPES = {"float32": np.dtype("<f4")}
+
+
+def _check_columns(declared: List[str], expected: List[str]):
+    if declared != expected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Feature columns must be declared in model order: {expected}",
+        )
+
+
+def _check_values(features: np.ndarray) -> np.ndarray:
+    if features.shape[0] == 0:
+        raise HTTPException(status_code=400, detail="Batch contains no rows")
+    if not np.isfinite(features).all():
+        raise HTTPException(status_code=400, detail="Batch contains non-finite values")
+    return features
+
+
+def decode_float32(body: bytes, feature_names: Optional[str], dtype: Optional[str],
+                   expected: List[str]) -> np.ndarray:
+    if feature_names is None:
+        raise HTTPException(status_code=400, detail="Missing X-Feature-Names header")
+    _check_columns([name.strip() for name in feature_names.split(",")], expected)
+    if (dtype or "float32") not in SUPPORTED_DTYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported dtype {dtype}, expected float32")
+    row_bytes = SUPPORTED_DTYPES["float32"].itemsize * len(expected)
+    if len(body) % row_bytes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Body length {len(body)} is not a multiple of the {row_bytes}-byte row size",
+        )
+    features = np.frombuffer(body, dtype=SUPPORTED_DTYPES["float32"])
+    return _check_values(features.reshape(-1, len(expected)))
+
+
+def decode_arrow(body: bytes, expected: List[str]) -> np.ndarray:
+    if pa is None:
+        raise HTTPException(status_code=415, detail="Arrow ingestion requires pyarrow")
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid Arrow stream: {exc}")
+    _check_columns(table.schema.names, expected)
+    if any(field.type != pa.float32() for field in table.schema):
+        raise HTTPException(status_code=400, detail="All feature columns must be float32")
+    if any(column.null_count for column in table.columns):
+        raise HTTPException(status_code=400, detail="Batch contains null values")
+    features = np.empty((table.num_rows, len(expected)), dtype=np.float32)
+    for i, column in enumerate(table.columns):
+        offset = 0
+        for chunk in column.chunks:
+            values = chunk.to_numpy(zero_copy_only=True)
+            features[offset:offset + len(values), i] = values
+            offset += len(values)
+    return _check_values(features)
+
+
+def decode_batch(body: bytes, content_type: Optional[str], feature_names: Optional[str],
+                 dtype: Optional[str], expected: List[str]) -> np.ndarray:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type == MEDIA_FLOAT32:
+        return decode_float32(body, feature_names, dtype, expected)
+    if media_type == MEDIA_ARROW:
+        return decode_arrow(body, expected)
+    raise HTTPException(
+        status_code=415,
+        detail=f"Unsupported Content-Type {content_type}, expected {MEDIA_FLOAT32} or {MEDIA_ARROW}",
+    )
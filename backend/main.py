@@ -1,11 +1,30 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, Depends, FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
 from pathlib import Path
-import joblib
+import json
+import math
+import os
+import threading
+import time
 import numpy as np
 import shap
-from typing import List, Dict
+from pydantic import ValidationError
+from typing import Any, List, Dict, Optional
+
+from admission import AdmissionController, Ticket
+from execution import ExecutionPolicy
+from features import NAVAL_FIELD_ALIASES, FeatureSchema
+from ingest import decode_batch
+from model_store import LoadedModel, ModelSpec, ModelStore, load_registry
+from prediction_log import PredictionLog
+from prefork import memory_report
+from serialization import MEDIA_COLUMNAR, MEDIA_JSON, negotiate, render
+from streaming import TelemetryHub
+from whatif import SurfaceCache, WhatIfRequest, build_grid, cache_key
 
 app = FastAPI(title="Predictive Maintenance API")
 
@@ -18,59 +37,178 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+def error_detail(errors: List[Dict]) -> List[Dict]:
+    """Validation errors with rejected NaN/inf inputs echoed as strings, which JSON can carry."""
+    return [
+        {**error, "input": str(error["input"])}
+        if isinstance(error.get("input"), float) and not math.isfinite(error["input"]) else error
+        for error in errors
+    ]
+
+
+@app.exception_handler(RequestValidationError)
+async def request_validation_error(request: Request, exc: RequestValidationError):
+    return JSONResponse(status_code=422, content={"detail": jsonable_encoder(error_detail(exc.errors()))})
+
+
 # Paths for persisted artifacts
 BACKEND_ROOT = Path(__file__).resolve().parent
 MODELS_DIR = BACKEND_ROOT / "models"
 EXPLAINERS_DIR = BACKEND_ROOT / "explainers"
 
 
-def load_artifact(path: Path, label: str):
-    try:
-        return joblib.load(path)
-    except FileNotFoundError:
-        print(f"Warning: {label} missing at {path}")
-    except Exception as exc:
-        print(f"Warning: Failed to load {label}: {exc}")
-    return None
-
-
-# Load models and explainers
-engine_model = load_artifact(MODELS_DIR / "marine_model.pkl", "engine model")
-engine_explainer = load_artifact(EXPLAINERS_DIR / "engine_shap_explainer.pkl", "engine explainer")
-naval_model = load_artifact(MODELS_DIR / "naval_model.pkl", "naval model")
-naval_explainer = load_artifact(EXPLAINERS_DIR / "naval_shap_explainer.pkl", "naval explainer")
-
-# Request models
-class EnginePredictionRequest(BaseModel):
-    Lever_position: float
-    Ship_speed: float
-    Gas_Turbine_shaft_torque: float
-    Gas_Turbine_rate_of_revolutions: float
-    Gas_Generator_rate_of_revolutions: float
-    Starboard_Propeller_Torque: float
-    Port_Propeller_Torque: float
-    HP_Turbine_exit_temperature: float
-    GT_Compressor_inlet_air_temperature: float
-    GT_Compressor_outlet_air_temperature: float
-    HP_Turbine_exit_pressure: float
-
-class NavalPredictionRequest(BaseModel):
-    Lever_position: float
-    Ship_speed_knots: float
-    Gas_Turbine_shaft_torque_kN_m: float
-    Gas_Turbine_rate_of_revolutions_rpm: float
-    Gas_Generator_rate_of_revolutions_rpm: float
-    Starboard_Propeller_Torque_kN: float
-    Port_Propeller_Torque_kN: float
-    HP_Turbine_exit_temperature_C: float
-    GT_Compressor_inlet_air_temperature_C: float
-    GT_Compressor_outlet_air_temperature_C: float
-    HP_Turbine_exit_pressure_psi: float
-    GT_Compressor_inlet_air_pressure_psi: float
-    GT_Compressor_outlet_air_pressure_bar: float
-    Gas_Turbine_exhaust_gas_pressure_psi: float
-    Turbine_Injecton_Control: float
-    Fuel_flow_lg_s: float
+# Trained feature columns, used for the request schema when a model is not loaded
+ENGINE_TRAINED_FEATURES = [
+    "Vibration_Amplitude",
+    "RMS_Vibration",
+    "Vibration_Frequency",
+    "Surface_Temperature",
+    "Exhaust_Temperature",
+    "Acoustic_dB",
+    "Acoustic_Frequency",
+    "Intake_Pressure",
+    "Exhaust_Pressure",
+    "Frequency_Band_Energy",
+    "Amplitude_Mean",
+]
+
+# Response labels
+ENGINE_CONDITIONS = ["Normal", "Minor Fault", "Critical Fault"]
+ENGINE_PROBABILITY_KEYS = ["normal", "minor_fault", "critical_fault"]
+NAVAL_TARGETS = ["compressor_decay", "turbine_decay"]
+NAVAL_IMPORTANCE_KEYS = ["compressor", "turbine"]
+
+# Kernel thread budget shared by all requests; 0 leaves XGBoost/SHAP threading unmanaged
+KERNEL_THREADS = int(os.getenv("KERNEL_THREADS", os.cpu_count() or 1))
+execution = ExecutionPolicy(KERNEL_THREADS or 1)
+
+# Model store: built-in models plus any listed in models/registry.json, loaded on first use
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+DRIFT_HALF_LIFE = float(os.getenv("DRIFT_HALF_LIFE", "0"))
+BUILTIN_SPECS = {
+    "engine": ModelSpec(
+        "engine", "classifier",
+        MODELS_DIR / "marine_model.pkl",
+        EXPLAINERS_DIR / "engine_shap_explainer.pkl",
+        MODELS_DIR / "engine_reference.pkl",
+        declared_features=ENGINE_TRAINED_FEATURES,
+        labels=ENGINE_CONDITIONS,
+        output_keys=ENGINE_PROBABILITY_KEYS,
+        backend=os.getenv("ENGINE_INFERENCE_BACKEND", "native"),
+        cascade_path=MODELS_DIR / "engine_cascade.pkl" if os.getenv("ENGINE_CASCADE", "on") != "off" else None,
+    ),
+    "naval": ModelSpec(
+        "naval", "regressor",
+        MODELS_DIR / "naval_model.pkl",
+        EXPLAINERS_DIR / "naval_shap_explainer.pkl",
+        MODELS_DIR / "naval_reference.pkl",
+        declared_features=list(NAVAL_FIELD_ALIASES),
+        field_aliases=NAVAL_FIELD_ALIASES,
+        labels=NAVAL_TARGETS,
+        output_keys=NAVAL_IMPORTANCE_KEYS,
+        backend=os.getenv("NAVAL_INFERENCE_BACKEND", "native"),
+    ),
+}
+model_store = ModelStore(
+    {**load_registry(MODELS_DIR / "registry.json", MODELS_DIR, EXPLAINERS_DIR), **BUILTIN_SPECS},
+    memory_budget=int(MODEL_MEMORY_BUDGET_MB * 1024 * 1024),
+    drift_half_life=DRIFT_HALF_LIFE,
+    pin_threads=KERNEL_THREADS > 0,
+)
+
+# Load the built-in alarm-path models and PRELOAD_MODELS at startup. A model whose features do not
+# match its request schema stops startup; missing or unreadable artifacts show in /health instead
+PRELOAD_MODELS = [name.strip() for name in os.getenv("PRELOAD_MODELS", "engine,naval").split(",") if name.strip()]
+for name in dict.fromkeys([*BUILTIN_SPECS, *PRELOAD_MODELS]):
+    model_store.get(name, strict=True)
+
+# Request schemas for the engine/naval aliases; loaded boosters are checked against them
+engine_schema = FeatureSchema("EnginePredictionRequest", ENGINE_TRAINED_FEATURES)
+naval_schema = FeatureSchema("NavalPredictionRequest", list(NAVAL_FIELD_ALIASES), NAVAL_FIELD_ALIASES)
+EnginePredictionRequest = engine_schema.request_model
+NavalPredictionRequest = naval_schema.request_model
+
+# Model input column order
+ENGINE_FEATURES = engine_schema.field_names
+NAVAL_FEATURES = naval_schema.field_names
+
+# Append-only columnar log of served predictions, written by a background thread
+PREDICTION_LOG_DIR = Path(os.getenv("PREDICTION_LOG_DIR", BACKEND_ROOT / "logs" / "predictions"))
+prediction_log = PredictionLog(
+    PREDICTION_LOG_DIR,
+    segment_rows=int(os.getenv("PREDICTION_LOG_SEGMENT_ROWS", "65536")),
+    max_segments=int(os.getenv("PREDICTION_LOG_MAX_SEGMENTS", "0")),
+) if os.getenv("PREDICTION_LOG", "on") != "off" else None
+
+# Admission control: per-model concurrency cap, deadlines and priority for predict-only traffic
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "10"))
+admission_controllers: Dict[str, AdmissionController] = {}
+
+
+def admission_for(name: str, bulk: bool = False) -> AdmissionController:
+    """Controller of a model's single-row traffic, or of its batch and what-if traffic (`bulk`).
+
+    Bulk requests take far longer than single rows, so they have their own slots and
+    service-time estimates and never make single-row requests look slow.
+    """
+    # Only called from the event loop, so no lock is needed
+    key = f"{name}/bulk" if bulk else name
+    if key not in admission_controllers:
+        limit = os.getenv(f"{name.upper()}_MAX_CONCURRENCY", os.getenv("MAX_CONCURRENCY", os.cpu_count() or 4))
+        admission_controllers[key] = AdmissionController(key, int(limit), REQUEST_TIMEOUT)
+    return admission_controllers[key]
+
+
+def admitted(name: Optional[str] = None, bulk: bool = False, body: Optional[type] = None):
+    """Dependency that waits for a slot (on the event loop) and releases it after the handler.
+
+    Without a fixed name the model is taken from the `model_name` path parameter. `body` is
+    the request model of a route whose JSON body carries its own `explain` field.
+    """
+    async def dependency(
+        http_request: Request,
+        explain: bool = True,
+        x_request_timeout: Optional[float] = Header(None),
+    ):
+        model_name = name or http_request.path_params["model_name"]
+        if model_name not in model_store.specs:
+            raise HTTPException(status_code=404, detail=f"Unknown model {model_name}")
+        controller = admission_for(model_name, bulk)
+        if body is not None and explain:
+            try:
+                # Starlette caches the body, so the route still receives it
+                explain = body.model_validate(await http_request.json()).explain
+            except ValueError:
+                pass  # the route answers 422
+        ticket = await controller.acquire(explain, x_request_timeout)
+        try:
+            yield ticket
+        finally:
+            controller.release(ticket)
+    return dependency
+
+
+def mark_degraded(response, ticket: Ticket):
+    if ticket.degraded:
+        response.headers["X-Explanation"] = "skipped"
+    return response
+
+# Rolling telemetry state per vessel, one hub per model
+TELEMETRY_WINDOW = int(os.getenv("TELEMETRY_WINDOW", "60"))
+if TELEMETRY_WINDOW <= 0:
+    raise ValueError(f"TELEMETRY_WINDOW must be a positive number of readings, got {TELEMETRY_WINDOW}")
+# Regression predictions (naval decay) are reported when they move to a new bucket of this width
+NAVAL_DECAY_STEP = float(os.getenv("NAVAL_DECAY_STEP", "0.005"))
+telemetry_hubs: Dict[str, TelemetryHub] = {}
+telemetry_lock = threading.Lock()
+
+
+def telemetry_hub(entry: LoadedModel) -> TelemetryHub:
+    with telemetry_lock:
+        if entry.name not in telemetry_hubs:
+            telemetry_hubs[entry.name] = TelemetryHub(entry.schema.field_names, TELEMETRY_WINDOW)
+        return telemetry_hubs[entry.name]
 
 @app.get("/")
 def read_root():
@@ -79,119 +217,451 @@ def read_root():
         "endpoints": {
             "engine": "/predict/engine",
             "naval": "/predict/naval",
+            "engine_batch": "/predict/engine/batch",
+            "naval_batch": "/predict/naval/batch",
+            "predict": "/predict/{model_name}",
+            "predict_batch": "/predict/{model_name}/batch",
+            "models": "/models",
+            "whatif": "/whatif/{model_name}",
+            "telemetry": "/ws/telemetry",
+            "drift": "/drift",
+            "predictions": "/predictions/{model_name}",
+            "workers": "/workers",
             "health": "/health"
         }
     }
 
 @app.get("/health")
 def health_check():
+    engine = model_store.status("engine")
+    naval = model_store.status("naval")
     return {
         "status": "healthy",
-        "engine_model_loaded": engine_model is not None,
-        "engine_explainer_loaded": engine_explainer is not None,
-        "naval_model_loaded": naval_model is not None,
-        "naval_explainer_loaded": naval_explainer is not None,
+        "engine_model_loaded": engine["model_loaded"],
+        "engine_explainer_loaded": engine["explainer_loaded"],
+        "naval_model_loaded": naval["model_loaded"],
+        "naval_explainer_loaded": naval["explainer_loaded"],
+        "engine_backend": engine["backend"],
+        "naval_backend": naval["backend"],
+        "engine_load_errors": engine["load_errors"],
+        "naval_load_errors": naval["load_errors"],
+        "admission": {name: controller.stats() for name, controller in admission_controllers.items()},
+        "execution": execution.stats(),
+        "whatif_cache": whatif_cache.stats(),
+        "prediction_log": prediction_log.stats() if prediction_log is not None else None,
     }
 
-@app.post("/predict/engine")
-def predict_engine(request: EnginePredictionRequest):
-    if engine_model is None or engine_explainer is None:
-        raise HTTPException(status_code=503, detail="Engine artifacts not loaded")
-    
-    try:
-        # Convert request to array
-        features = np.array([[
-            request.Lever_position,
-            request.Ship_speed,
-            request.Gas_Turbine_shaft_torque,
-            request.Gas_Turbine_rate_of_revolutions,
-            request.Gas_Generator_rate_of_revolutions,
-            request.Starboard_Propeller_Torque,
-            request.Port_Propeller_Torque,
-            request.HP_Turbine_exit_temperature,
-            request.GT_Compressor_inlet_air_temperature,
-            request.GT_Compressor_outlet_air_temperature,
-            request.HP_Turbine_exit_pressure
-        ]])
-        
-        # Make prediction
-        prediction = int(engine_model.predict(features)[0])
-        probabilities = engine_model.predict_proba(features)[0].tolist()
-        
-        # Calculate SHAP values
-        shap_values = engine_explainer(features)
-        feature_names = list(request.dict().keys())
-        
-        condition_map = {0: "Normal", 1: "Minor Fault", 2: "Critical Fault"}
-        
+@app.get("/workers")
+def worker_memory():
+    return memory_report()
+
+@app.get("/models")
+def list_models():
+    return model_store.stats()
+
+@app.get("/drift")
+def drift_report():
+    return {
+        name: model_store.drift_monitors[name].report() if model_store.drift_monitors.get(name)
+        else {"status": "no_reference" if name in model_store.drift_monitors else "not_loaded"}
+        for name in sorted(model_store.specs)
+    }
+
+def get_model(name: str, explain: bool) -> LoadedModel:
+    if name not in model_store.specs:
+        raise HTTPException(status_code=404, detail=f"Unknown model {name}")
+    entry = model_store.get(name)
+    if entry is None or (explain and entry.explainer is None):
+        raise HTTPException(status_code=503, detail=f"{name.capitalize()} artifacts not loaded")
+    return entry
+
+
+def score(entry: LoadedModel, features: np.ndarray, explain: bool = True, track_drift: bool = True,
+          use_cascade: bool = True) -> Dict:
+    """Columnar results for a (rows, features) array.
+
+    `use_cascade=False` scores every row with the full model, for callers that
+    present results as that model's response surface.
+    """
+    if track_drift and entry.drift is not None:
+        entry.drift.observe(features)
+    with execution.request():
+        return _score(entry, features, explain, use_cascade)
+
+
+def log_prediction(entry: LoadedModel, features: np.ndarray, result: Dict, latency: float,
+                   vessel_id: Optional[str] = None):
+    if prediction_log is None:
+        return
+    version = entry.version
+    if entry.task == "classifier":
+        outputs = {"prediction": result["prediction"], "probabilities": result["probabilities"]}
+    else:
+        outputs = {"predictions": result["predictions"]}
+    if "escalated" in result:
+        # Rows with escalated == 0 were answered by the first stage, so both artifacts are recorded
+        outputs["escalated"] = result["escalated"]
+        version = f"{entry.version}+{entry.cascade_version}"
+    prediction_log.record(entry.name, version, features, outputs, latency, vessel_id,
+                          entry.schema.field_names, entry.labels)
+
+
+def _score(entry: LoadedModel, features: np.ndarray, explain: bool, use_cascade: bool = True) -> Dict:
+    result = {"feature_names": entry.schema.field_names}
+    if use_cascade and entry.cascade is not None and len(features):
+        result.update(_score_cascade(entry, features, explain))
+    elif entry.task == "classifier":
+        # Row index of each predicted class, used to pick probabilities and SHAP columns
+        predictions = np.searchsorted(entry.classes, execution.map_rows(entry.predictor.predict, features)).astype(int)
+        result.update({
+            "conditions": entry.labels,
+            "prediction": predictions,
+            "probabilities": execution.map_rows(entry.predictor.predict_proba, features),
+        })
+        if explain:
+            # SHAP values toward each row's predicted class
+            values = execution.map_rows(lambda X: entry.explainer(X).values, features)
+            result["feature_importance"] = (
+                values[np.arange(len(predictions)), :, predictions] if values.ndim == 3 else values
+            )
+    else:
+        predictions = execution.map_rows(entry.predictor.predict, features)
+        result.update({
+            "targets": entry.labels,
+            "predictions": predictions.reshape(len(features), -1),
+        })
+        if explain:
+            # SHAP values laid out as (rows, targets, features)
+            values = execution.map_rows(lambda X: entry.explainer(X).values, features)
+            result["feature_importance"] = (
+                np.transpose(values, (0, 2, 1)) if values.ndim == 3 else values[:, None, :]
+            )
+    return result
+
+
+def _score_cascade(entry: LoadedModel, features: np.ndarray, explain: bool) -> Dict:
+    """Classifier results where only rows the first stage is unsure about reach the full model."""
+    probabilities, escalated = entry.cascade.screen(features)
+    if escalated.any():
+        probabilities[escalated] = execution.map_rows(entry.predictor.predict_proba, features[escalated])
+    predictions = probabilities.argmax(axis=1)
+    result = {
+        "conditions": entry.labels,
+        "prediction": predictions,
+        "probabilities": probabilities,
+        "escalated": escalated,
+    }
+    if explain:
+        parts = []
+        if not escalated.all():
+            parts.append((~escalated, entry.cascade.explain(features[~escalated])))
+        if escalated.any():
+            parts.append((escalated, execution.map_rows(lambda X: entry.explainer(X).values, features[escalated])))
+        values = np.empty((len(features),) + parts[0][1].shape[1:], dtype=np.float32)
+        for mask, part in parts:
+            values[mask] = part
+        result["feature_importance"] = (
+            values[np.arange(len(predictions)), :, predictions] if values.ndim == 3 else values
+        )
+    return result
+
+
+def surface_payload(entry: LoadedModel, result: Dict, features: List[str], axes: List[np.ndarray]) -> Dict:
+    """Columnar scores reshaped onto the sweep grid: one leading axis per swept feature."""
+    shape = [len(axis) for axis in axes]
+    surface = {"model": entry.name, "features": features, "axes": axes, "shape": shape}
+    if entry.task == "classifier":
+        surface.update({
+            "conditions": entry.labels,
+            "prediction": result["prediction"].reshape(shape),
+            "probabilities": result["probabilities"].reshape(*shape, -1),
+        })
+    else:
+        surface.update({
+            "targets": entry.labels,
+            "predictions": result["predictions"].reshape(*shape, -1),
+        })
+    if "feature_importance" in result:
+        importance = result["feature_importance"]
+        surface["feature_names"] = result["feature_names"]
+        surface["feature_importance"] = importance.reshape(*shape, *importance.shape[1:])
+    return surface
+
+
+def legacy_payload(entry: LoadedModel, result: Dict) -> Dict:
+    """The original nested, name-keyed payload for the first row."""
+    names = entry.schema.field_names
+    importance = result.get("feature_importance")
+    if entry.task == "classifier":
+        prediction = int(result["prediction"][0])
         return {
             "prediction": prediction,
-            "condition": condition_map[prediction],
-            "probabilities": {
-                "normal": probabilities[0],
-                "minor_fault": probabilities[1],
-                "critical_fault": probabilities[2]
-            },
-            "feature_importance": {
-                feature_names[i]: float(shap_values.values[0, i, prediction])
-                for i in range(len(feature_names))
-            }
+            "condition": entry.labels[prediction],
+            "probabilities": dict(zip(entry.output_keys, result["probabilities"][0].tolist())),
+            "feature_importance": {} if importance is None else dict(zip(names, importance[0].tolist())),
         }
+    return {
+        "predictions": dict(zip(entry.labels, result["predictions"][0].tolist())),
+        "feature_importance": {
+            key: {} if importance is None else dict(zip(names, importance[0, target].tolist()))
+            for target, key in enumerate(entry.output_keys)
+        },
+    }
+
+
+def predict_row(name: str, request, accept: Optional[str], ticket: Ticket, vessel_id: Optional[str] = None):
+    entry = get_model(name, ticket.explain)
+    media_type = negotiate(accept)
+    
+    try:
+        # Fill the preallocated feature row in training order
+        features = entry.schema.extract(request)
+        
+        started = time.perf_counter()
+        result = score(entry, features, ticket.explain)
+        log_prediction(entry, features, result, time.perf_counter() - started, vessel_id)
+        content = result if media_type != MEDIA_JSON else legacy_payload(entry, result)
+        return mark_degraded(render(content, media_type), ticket)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/predict/naval")
-def predict_naval(request: NavalPredictionRequest):
-    if naval_model is None or naval_explainer is None:
-        raise HTTPException(status_code=503, detail="Naval artifacts not loaded")
+
+def predict_rows(name: str, body: bytes, content_type: Optional[str], feature_names: Optional[str],
+                 dtype: Optional[str], accept: Optional[str], ticket: Ticket, vessel_id: Optional[str] = None):
+    entry = get_model(name, ticket.explain)
+    media_type = negotiate(accept)
+    features = decode_batch(body, content_type, feature_names, dtype, entry.schema.field_names)
     
     try:
-        # Convert request to array
-        features = np.array([[
-            request.Lever_position,
-            request.Ship_speed_knots,
-            request.Gas_Turbine_shaft_torque_kN_m,
-            request.Gas_Turbine_rate_of_revolutions_rpm,
-            request.Gas_Generator_rate_of_revolutions_rpm,
-            request.Starboard_Propeller_Torque_kN,
-            request.Port_Propeller_Torque_kN,
-            request.HP_Turbine_exit_temperature_C,
-            request.GT_Compressor_inlet_air_temperature_C,
-            request.GT_Compressor_outlet_air_temperature_C,
-            request.HP_Turbine_exit_pressure_psi,
-            request.GT_Compressor_inlet_air_pressure_psi,
-            request.GT_Compressor_outlet_air_pressure_bar,
-            request.Gas_Turbine_exhaust_gas_pressure_psi,
-            request.Turbine_Injecton_Control,
-            request.Fuel_flow_lg_s,
-        ]])
-        
-        # Make prediction
-        predictions = naval_model.predict(features)[0]
-        
-        # Calculate SHAP values
-        shap_values = naval_explainer(features)
-        feature_names = list(request.dict().keys())
-        
-        return {
-            "predictions": {
-                "compressor_decay": float(predictions[0]),
-                "turbine_decay": float(predictions[1])
-            },
-            "feature_importance": {
-                "compressor": {
-                    feature_names[i]: float(shap_values.values[0, i, 0])
-                    for i in range(len(feature_names))
-                },
-                "turbine": {
-                    feature_names[i]: float(shap_values.values[0, i, 1])
-                    for i in range(len(feature_names))
-                }
-            }
-        }
+        started = time.perf_counter()
+        result = score(entry, features, ticket.explain)
+        log_prediction(entry, features, result, time.perf_counter() - started, vessel_id)
+        return mark_degraded(render(result, MEDIA_COLUMNAR if media_type == MEDIA_JSON else media_type), ticket)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict/engine")
+def predict_engine(
+    request: EnginePredictionRequest,
+    accept: Optional[str] = Header(None),
+    x_vessel_id: Optional[str] = Header(None),
+    ticket: Ticket = Depends(admitted("engine")),
+):
+    return predict_row("engine", request, accept, ticket, x_vessel_id)
+
+@app.post("/predict/naval")
+def predict_naval(
+    request: NavalPredictionRequest,
+    accept: Optional[str] = Header(None),
+    x_vessel_id: Optional[str] = Header(None),
+    ticket: Ticket = Depends(admitted("naval")),
+):
+    return predict_row("naval", request, accept, ticket, x_vessel_id)
+
+# Batch endpoints take a binary body (see ingest.py) and always answer in a columnar format
+@app.post("/predict/engine/batch")
+def predict_engine_batch(
+    body: bytes = Body(..., media_type="application/octet-stream"),
+    ticket: Ticket = Depends(admitted("engine", bulk=True)),
+    content_type: Optional[str] = Header(None),
+    x_feature_names: Optional[str] = Header(None),
+    x_dtype: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    x_vessel_id: Optional[str] = Header(None),
+):
+    return predict_rows("engine", body, content_type, x_feature_names, x_dtype, accept, ticket, x_vessel_id)
+
+@app.post("/predict/naval/batch")
+def predict_naval_batch(
+    body: bytes = Body(..., media_type="application/octet-stream"),
+    ticket: Ticket = Depends(admitted("naval", bulk=True)),
+    content_type: Optional[str] = Header(None),
+    x_feature_names: Optional[str] = Header(None),
+    x_dtype: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    x_vessel_id: Optional[str] = Header(None),
+):
+    return predict_rows("naval", body, content_type, x_feature_names, x_dtype, accept, ticket, x_vessel_id)
+
+# Generic routes for any model in the store; the request schema comes from the loaded booster
+@app.post("/predict/{model_name}")
+def predict_model(
+    model_name: str,
+    payload: Dict[str, Any] = Body(...),
+    accept: Optional[str] = Header(None),
+    x_vessel_id: Optional[str] = Header(None),
+    ticket: Ticket = Depends(admitted()),
+):
+    entry = get_model(model_name, ticket.explain)
+    try:
+        request = entry.schema.request_model.model_validate(payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=error_detail(e.errors(include_url=False)))
+    return predict_row(model_name, request, accept, ticket, x_vessel_id)
+
+@app.post("/predict/{model_name}/batch")
+def predict_model_batch(
+    model_name: str,
+    body: bytes = Body(..., media_type="application/octet-stream"),
+    ticket: Ticket = Depends(admitted(bulk=True)),
+    content_type: Optional[str] = Header(None),
+    x_feature_names: Optional[str] = Header(None),
+    x_dtype: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    x_vessel_id: Optional[str] = Header(None),
+):
+    return predict_rows(model_name, body, content_type, x_feature_names, x_dtype, accept, ticket, x_vessel_id)
+
+# What-if sweeps: one or two feature grids over a base vector, scored as a single matrix
+WHATIF_CACHE_SIZE = int(os.getenv("WHATIF_CACHE_SIZE", "256"))
+whatif_cache = SurfaceCache(WHATIF_CACHE_SIZE)
+
+@app.post("/whatif/{model_name}")
+def what_if(
+    model_name: str,
+    request: WhatIfRequest,
+    accept: Optional[str] = Header(None),
+    ticket: Ticket = Depends(admitted(bulk=True, body=WhatIfRequest)),
+):
+    explain = request.explain and ticket.explain
+    entry = get_model(model_name, explain)
+    media_type = negotiate(accept)
+    names = entry.schema.field_names
+    unknown = [grid.feature for grid in request.grid if grid.feature not in names]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown features {unknown}, expected one of {names}")
+
+    columns = [names.index(grid.feature) for grid in request.grid]
+    axes = [grid.points() for grid in request.grid]
+    # Swept features may be left out of the base vector
+    payload = {**{grid.feature: float(axis[0]) for grid, axis in zip(request.grid, axes)}, **request.base}
+    try:
+        base = entry.schema.extract(entry.schema.request_model.model_validate(payload))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=error_detail(e.errors(include_url=False)))
+
+    key = cache_key(f"{entry.name}@{entry.loaded_at}", base, columns, axes, explain)
+    surface = whatif_cache.get(key)
+    cached = surface is not None
+    if not cached:
+        try:
+            X = build_grid(base, columns, axes)
+            # Full model only: a cascade would stitch two models into one surface
+            result = score(entry, X, explain, track_drift=False, use_cascade=False)
+            surface = surface_payload(entry, result, [grid.feature for grid in request.grid], axes)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        whatif_cache.put(key, surface)
+
+    response = render(surface, MEDIA_COLUMNAR if media_type == MEDIA_JSON else media_type)
+    response.headers["X-Cache"] = "hit" if cached else "miss"
+    return mark_degraded(response, ticket)
+
+@app.get("/predictions/{model_name}")
+def prediction_history(
+    model_name: str,
+    vessel_id: Optional[str] = None,
+    start: Optional[float] = Query(None, description="Unix time, inclusive"),
+    end: Optional[float] = Query(None, description="Unix time, inclusive"),
+    limit: int = Query(1000, ge=1, le=100000),
+    accept: Optional[str] = Header(None),
+):
+    """Logged predictions of a model, oldest first; `limit` keeps the most recent rows."""
+    if model_name not in model_store.specs:
+        raise HTTPException(status_code=404, detail=f"Unknown model {model_name}")
+    if prediction_log is None:
+        raise HTTPException(status_code=503, detail="Prediction log is disabled")
+    media_type = negotiate(accept)
+    history = prediction_log.query(model_name, vessel_id, start, end, limit)
+    return render(history, MEDIA_COLUMNAR if media_type == MEDIA_JSON else media_type)
+
+def handle_telemetry(message: Dict) -> Optional[Dict]:
+    """Merge one telemetry message and score the vessel's rolling window mean.
+
+    Returns the reply to push, or None when the vessel's condition is unchanged.
+    """
+    model_name = message.get("model", "engine")
+    vessel_id = message.get("vessel_id")
+    readings = message.get("readings")
+    if model_name not in model_store.specs:
+        raise ValueError(f"Unknown model {model_name}, expected one of {sorted(model_store.specs)}")
+    if not isinstance(vessel_id, str) or not isinstance(readings, dict):
+        raise ValueError("Messages need a string vessel_id and a readings object")
+    entry = model_store.get(model_name)
+    if entry is None:
+        raise ValueError(f"{model_name.capitalize()} model not loaded")
+
+    hub = telemetry_hub(entry)
+    aggregates = hub.update(vessel_id, readings)
+    if aggregates is None:
+        return {"type": "pending", "vessel_id": vessel_id, "missing": hub.missing(vessel_id)}
+
+    features = aggregates["mean"][None, :].astype(np.float32)
+    started = time.perf_counter()
+    result = score(entry, features, explain=False, track_drift=False)
+    log_prediction(entry, features, result, time.perf_counter() - started, vessel_id)
+    if entry.task == "classifier":
+        condition = entry.labels[int(result["prediction"][0])]
+        output = {
+            "condition": condition,
+            "probabilities": dict(zip(entry.output_keys, result["probabilities"][0].tolist())),
+        }
+    else:
+        predictions = result["predictions"][0]
+        condition = tuple(np.floor(predictions / NAVAL_DECAY_STEP).astype(int).tolist())
+        output = {"predictions": dict(zip(entry.labels, predictions.tolist()))}
+
+    if not hub.swap_condition(vessel_id, condition):
+        return None
+    return {
+        "type": "prediction",
+        "vessel_id": vessel_id,
+        "model": model_name,
+        **output,
+        "window": {
+            "samples": aggregates["samples"],
+            "mean": dict(zip(hub.field_names, aggregates["mean"].tolist())),
+            "rms": dict(zip(hub.field_names, aggregates["rms"].tolist())),
+        },
+    }
+
+@app.websocket("/ws/telemetry")
+async def telemetry_stream(websocket: WebSocket):
+    await websocket.accept()
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                # Parsed here so a malformed frame gets an error reply instead of closing the socket
+                message = json.loads(text)
+                reply = await run_in_threadpool(handle_telemetry, message)
+            except (ValueError, TypeError, AttributeError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            if reply is not None:
+                await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+
+def warm_models():
+    """Run one explained prediction per resident model so lazy initialization happens before fork."""
+    for name in model_store.stats()["resident"]:
+        entry = model_store.get(name)
+        features = np.zeros((1, len(entry.schema.field_names)), dtype=np.float32)
+        # The full model is warmed even where the first stage would answer the row
+        score(entry, features, explain=entry.explainer is not None, track_drift=False, use_cascade=False)
+        if entry.cascade is not None:
+            score(entry, features, explain=entry.explainer is not None, track_drift=False)
+
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "8000"))
+    workers = int(os.getenv("WORKERS", "1"))
+    if workers > 1:
+        import prefork
+        warm_models()
+        prefork.serve(app, host, port, workers)
+    else:
+        import uvicorn
+        uvicorn.run(app, host=host, port=port)
@@ -0,0 +1,373 @@
+"""
+Model store for serving many models from one process.
+
+Models are described by a `ModelSpec` (artifact paths, task, labels) and loaded
+lazily on first use. The store records each model's resident memory (RSS
+growth while loading, never less than its artifact size) and evicts the least
+recently used models once the configured memory budget is exceeded. Drift
+monitors outlive evictions so a reload keeps its history.
+
+Besides the built-in engine and naval models, extra models can be listed in
+`models/registry.json`:
+
+    [{"name": "engine_lm2500", "task": "classifier",
+      "model": "engine_lm2500.pkl", "explainer": "engine_lm2500_shap_explainer.pkl",
+      "reference": "engine_lm2500_reference.pkl",
+      "labels": ["Normal", "Minor Fault", "Critical Fault"]},
+     {"name": "naval_lm2500", "task": "regressor", "model": "naval_lm2500.pkl",
+      "field_aliases": {"Fuel_flow_mf_kg/s": "Fuel_flow_lg_s", ...}}]
+
+Request fields are the booster's feature names, so they must be Python
+identifiers. `field_aliases` maps every trained feature to its request field;
+models trained on the bundled naval CSV need it (see `features.NAVAL_FIELD_ALIASES`).
+
+Any model trained through `gbm_backends` can be served; the compiled backend
+applies to XGBoost models only.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import joblib
+import numpy as np
+
+from cascade import Cascade
+from drift import create_monitor
+from execution import limit_threads
+import gbm_backends
+from features import FeatureSchema
+from tree_compiler import CompiledForest, verify
+
+TASKS = {"classifier", "regressor"}
+
+
+def load_artifact(path: Path, label: str, errors: Optional[List[str]] = None):
+    """Unpickled artifact, or None with a warning (also appended to `errors`)."""
+    try:
+        return joblib.load(path)
+    except FileNotFoundError:
+        message = f"{label} missing at {path}"
+    except Exception as exc:
+        message = f"Failed to load {label}: {exc}"
+    print(f"Warning: {message}")
+    if errors is not None:
+        errors.append(message)
+    return None
+
+
+def select_backend(model, label: str, backend: str):
+    """Return the predictor to serve with: the native model or its verified compiled forest."""
+    if model is None or backend != "compiled":
+        return gbm_backends.serving_predictor(model), "native"
+    if not hasattr(model, "get_booster"):
+        print(f"Warning: compiled backend supports XGBoost models only, serving {label} natively")
+        return gbm_backends.serving_predictor(model), "native"
+    try:
+        compiled = CompiledForest.from_model(model)
+        if verify(model, compiled):
+            return compiled, "compiled"
+        print(f"Warning: compiled {label} does not match native predictions, using native")
+    except Exception as exc:
+        print(f"Warning: Failed to compile {label}: {exc}")
+    return model, "native"
+
+
+def resident_bytes() -> Optional[int]:
+    """Current process RSS, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ModelSpec:
+    """How to load and present one servable model."""
+
+    def __init__(self, name: str, task: str, model_path: Path, explainer_path: Optional[Path] = None,
+                 reference_path: Optional[Path] = None, declared_features: Optional[List[str]] = None,
+                 field_aliases: Optional[Dict[str, str]] = None, labels: Optional[List[str]] = None,
+                 output_keys: Optional[List[str]] = None, backend: str = "native",
+                 cascade_path: Optional[Path] = None):
+        if task not in TASKS:
+            raise ValueError(f"Model {name} has unknown task {task}, expected one of {sorted(TASKS)}")
+        self.name = name
+        self.task = task
+        self.model_path = Path(model_path)
+        self.explainer_path = Path(explainer_path) if explainer_path else None
+        self.reference_path = Path(reference_path) if reference_path else None
+        # Classifier: condition names per class. Regressor: target names.
+        self.labels = labels
+        # Classifier: probability keys. Regressor: feature_importance keys per target.
+        self.output_keys = output_keys
+        self.declared_features = declared_features
+        self.field_aliases = field_aliases
+        self.backend = backend
+        # Optional first-stage classifier (cascade.py); rows it is unsure about escalate to this model
+        self.cascade_path = Path(cascade_path) if cascade_path else None
+
+    @classmethod
+    def from_dict(cls, entry: Dict, models_dir: Path, explainers_dir: Path) -> "ModelSpec":
+        name = entry["name"]
+        return cls(
+            name,
+            entry["task"],
+            models_dir / entry["model"],
+            explainers_dir / entry["explainer"] if entry.get("explainer") else None,
+            models_dir / entry["reference"] if entry.get("reference") else None,
+            field_aliases=entry.get("field_aliases"),
+            labels=entry.get("labels"),
+            output_keys=entry.get("output_keys"),
+            backend=entry.get("backend", os.getenv("INFERENCE_BACKEND", "native")),
+            cascade_path=models_dir / entry["cascade"] if entry.get("cascade") else None,
+        )
+
+
+def artifact_version(path: Path) -> str:
+    """Short content hash of a model file, logged with every prediction it serves."""
+    digest = hashlib.blake2b(digest_size=6)
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def artifact_signature(spec: ModelSpec) -> tuple:
+    """(mtime, size) of each of a model's artifacts, None where missing; changes when a file is replaced."""
+    signature = []
+    for path in (spec.model_path, spec.explainer_path, spec.cascade_path):
+        try:
+            stat = path.stat() if path is not None else None
+        except OSError:
+            stat = None
+        signature.append((stat.st_mtime_ns, stat.st_size) if stat is not None else None)
+    return tuple(signature)
+
+
+def registry_entry(name: str, task: str, model, model_file: str, explainer_file: Optional[str] = None,
+                   field_aliases: Optional[Dict[str, str]] = None, **fields) -> Dict:
+    """`models/registry.json` entry serving `model`; `field_aliases` is cut down to the features it was trained on."""
+    entry = {"name": name, "task": task, "model": model_file}
+    if explainer_file:
+        entry["explainer"] = explainer_file
+    if field_aliases is not None:
+        trained = gbm_backends.feature_names(model) or []
+        entry["field_aliases"] = {feature: field_aliases[feature] for feature in trained if feature in field_aliases}
+    entry.update(fields)
+    return entry
+
+
+def load_registry(path: Path, models_dir: Path, explainers_dir: Path) -> Dict[str, ModelSpec]:
+    if not path.exists():
+        return {}
+    with open(path) as registry:
+        entries = json.load(registry)
+    return {entry["name"]: ModelSpec.from_dict(entry, models_dir, explainers_dir) for entry in entries}
+
+
+class LoadedModel:
+    def __init__(self, spec: ModelSpec, model, explainer, predictor, backend: str,
+                 schema: FeatureSchema, drift, nbytes: int, cascade: Optional[Cascade] = None):
+        self.spec = spec
+        self.name = spec.name
+        self.task = spec.task
+        self.model = model
+        self.explainer = explainer
+        self.predictor = predictor
+        self.backend = backend
+        self.schema = schema
+        self.drift = drift
+        self.cascade = cascade
+        self.nbytes = nbytes
+        self.version = artifact_version(spec.model_path)
+        self.cascade_version = artifact_version(spec.cascade_path) if cascade is not None else None
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.classes = np.asarray(getattr(model, "classes_", []))
+        if spec.task == "classifier":
+            self.labels = spec.labels or [str(c) for c in self.classes]
+            self.output_keys = spec.output_keys or [
+                label.lower().replace(" ", "_") for label in self.labels
+            ]
+        else:
+            self.labels = spec.labels or [f"target_{i}" for i in range(gbm_backends.num_targets(model))]
+            self.output_keys = spec.output_keys or self.labels
+
+
+class ModelStore:
+    def __init__(self, specs: Dict[str, ModelSpec], memory_budget: int = 0, drift_half_life: float = 0.0,
+                 pin_threads: bool = False):
+        self.specs = dict(specs)
+        # Single-threaded boosters; parallelism comes from the ExecutionPolicy instead
+        self.pin_threads = pin_threads
+        self.memory_budget = memory_budget
+        self.drift_half_life = drift_half_life
+        self.drift_monitors: Dict[str, object] = {}
+        self.loads = 0
+        self.evictions = 0
+        self._resident: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        # Models whose last load failed, with their artifacts' signature then; retried once the files change
+        self._failed: Dict[str, tuple] = {}
+        # Models that loaded at least once (still true after eviction), with whether their explainer did
+        self._loaded: Dict[str, bool] = {}
+        # Warnings of each model's most recent load, so status can report why it is unavailable
+        self.load_errors: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        # Loads are serialized so RSS deltas are attributable and a model is never loaded twice
+        self._load_lock = threading.Lock()
+
+    def get(self, name: str, strict: bool = False) -> Optional[LoadedModel]:
+        """Resident model, loading it on first use; None when its artifacts are missing or fail to load.
+
+        With `strict`, a model whose features do not match its request schema
+        raises instead, so startup fails rather than serving 503s.
+        """
+        if name not in self.specs:
+            raise KeyError(name)
+        entry = self._touch(name)
+        if entry is not None:
+            return entry
+        spec = self.specs[name]
+        if name in self._failed and self._failed[name] == artifact_signature(spec):
+            return None
+        with self._load_lock:
+            entry = self._touch(name)
+            if entry is not None:
+                return entry
+            errors = []
+            signature = artifact_signature(spec)
+            try:
+                entry = self._load(spec, errors, strict)
+            finally:
+                self.load_errors[name] = errors
+                if entry is None:
+                    self._failed[name] = signature
+            if entry is None:
+                self._loaded.pop(name, None)
+                return None
+            self._failed.pop(name, None)
+            self._loaded[name] = entry.explainer is not None
+            with self._lock:
+                self._resident[name] = entry
+                self._evict(keep=name)
+            return entry
+
+    def _touch(self, name: str) -> Optional[LoadedModel]:
+        with self._lock:
+            entry = self._resident.get(name)
+            if entry is not None:
+                self._resident.move_to_end(name)
+                entry.last_used = time.time()
+            return entry
+
+    def _load(self, spec: ModelSpec, errors: List[str], strict: bool = False) -> Optional[LoadedModel]:
+        label = f"{spec.name} model"
+        before = resident_bytes()
+        model = load_artifact(spec.model_path, label, errors)
+        if model is None:
+            return None
+
+        title = "".join(part.capitalize() for part in spec.name.split("_"))
+        try:
+            schema = FeatureSchema.from_model(
+                f"{title}PredictionRequest", model, spec.declared_features or [], spec.field_aliases
+            )
+            if spec.declared_features is not None and schema.trained_names != list(spec.declared_features):
+                raise RuntimeError(
+                    f"{label} features {schema.trained_names} do not match the declared request schema"
+                )
+        except RuntimeError as exc:
+            errors.append(str(exc))
+            if strict:
+                raise
+            # Served as unavailable (503) rather than failing every request
+            print(f"Warning: {exc}")
+            return None
+        explainer = (load_artifact(spec.explainer_path, f"{spec.name} explainer", errors)
+                     if spec.explainer_path else None)
+        if self.pin_threads:
+            limit_threads(model, explainer)
+        predictor, backend = select_backend(model, label, spec.backend)
+        cascade = None
+        if spec.cascade_path is not None and spec.task == "classifier":
+            artifact = load_artifact(spec.cascade_path, f"{spec.name} cascade", errors)
+            if artifact is not None:
+                cascade = Cascade(artifact)
+                if self.pin_threads:
+                    limit_threads(cascade.model)
+
+        if spec.name not in self.drift_monitors:
+            reference = None
+            if spec.reference_path is not None:
+                reference = load_artifact(spec.reference_path, f"{spec.name} drift reference", errors)
+            self.drift_monitors[spec.name] = create_monitor(
+                reference, schema.trained_names, schema.field_names, spec.name, self.drift_half_life
+            )
+
+        after = resident_bytes()
+        on_disk = sum(path.stat().st_size for path in (spec.model_path, spec.explainer_path, spec.cascade_path)
+                      if path is not None and path.exists())
+        nbytes = max(on_disk, (after - before) if before is not None and after is not None else 0)
+        if isinstance(predictor, CompiledForest):
+            nbytes += sum(arr.nbytes for arr in vars(predictor).values() if isinstance(arr, np.ndarray))
+        self.loads += 1
+        return LoadedModel(spec, model, explainer, predictor, backend, schema,
+                           self.drift_monitors[spec.name], nbytes, cascade)
+
+    def _evict(self, keep: str):
+        if not self.memory_budget:
+            return
+        while len(self._resident) > 1 and self.resident_total() > self.memory_budget:
+            name = next(iter(self._resident))
+            if name == keep:
+                break
+            # In-flight requests keep their reference; memory is released once they finish
+            self._resident.pop(name)
+            self.evictions += 1
+
+    def resident_total(self) -> int:
+        return sum(entry.nbytes for entry in self._resident.values())
+
+    def status(self, name: str) -> Dict:
+        """Whether the model (and its explainer) loaded, judged by loading them, not by the files existing."""
+        if name not in self.specs:
+            raise KeyError(name)
+        with self._lock:
+            entry = self._resident.get(name)
+        return {
+            "model_loaded": entry is not None or name in self._loaded,
+            "explainer_loaded": (entry.explainer is not None) if entry is not None else self._loaded.get(name, False),
+            "resident": entry is not None,
+            "backend": entry.backend if entry is not None else None,
+            "load_errors": list(self.load_errors.get(name, [])),
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            resident = {
+                name: {
+                    "bytes": entry.nbytes,
+                    "backend": entry.backend,
+                    "version": entry.version,
+                    "cascade": entry.cascade.stats() if entry.cascade is not None else None,
+                    "loaded_at": entry.loaded_at,
+                    "last_used": entry.last_used,
+                }
+                for name, entry in self._resident.items()
+            }
+            total = self.resident_total()
+        return {
+            "memory_budget_bytes": self.memory_budget,
+            "resident_bytes": total,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "available": sorted(self.specs),
+            "resident": resident,
+            # Per-model readiness, including why a model failed to load
+            "models": {name: self.status(name) for name in sorted(self.specs)},
+        }
@@ -0,0 +1,327 @@
+"""
+Append-only columnar log of served predictions.
+
+Every scored request (features, outputs, model version, latency and an optional
+vessel ID) is appended to the log of its model. The request thread only
+appends a tuple to a deque, which is atomic under the GIL and takes no lock. A
+background thread drains the deque a few times a second and writes whole
+batches into the current segment.
+
+A segment is a directory of fixed-capacity `.npy` columns opened as memory
+maps (`timestamp`, `vessel`, `version`, `latency_us`, `features` and one per
+model output), plus `meta.json`. When a segment is full the writer seals it
+and starts the next one. `meta.json` is the index: committed row count, first
+and last timestamp, and for each vessel its row range and count. A query
+skips segments outside the time range or without the vessel and reads only
+the vessel's row range of the rest. The data columns are written before the
+metadata, so readers never see rows that are only half written.
+
+Each process writes its own segments (the pid is in the directory name), so
+pre-forked workers share one log directory without coordinating.
+"""
+import atexit
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+import weakref
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+META = "meta.json"
+
+# Writer threads do not survive fork(); pre-forked workers (prefork.py) start their own
+_logs = weakref.WeakSet()
+
+
+def _restart_after_fork():
+    for log in list(_logs):
+        log._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+@atexit.register
+def _flush_at_exit():
+    for log in list(_logs):
+        try:
+            log.flush()
+        except Exception as exc:
+            print(f"Warning: prediction log flush failed: {exc}")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_meta(segment: Path) -> Optional[Dict]:
+    try:
+        with open(segment / META) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(segment: Path, meta: Dict):
+    temporary = segment / f"{META}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(meta, handle)
+    os.replace(temporary, segment / META)
+
+
+class Segment:
+    """One writable segment: preallocated memory-mapped columns and their index."""
+
+    def __init__(self, path: Path, model: str, capacity: int, columns: Dict[str, tuple],
+                 feature_names: List[str], labels: List[str]):
+        path.mkdir(parents=True)
+        self.path = path
+        self.capacity = capacity
+        self.columns = {
+            name: np.lib.format.open_memmap(path / f"{name}.npy", mode="w+", dtype=dtype, shape=(capacity,) + shape)
+            for name, (dtype, shape) in columns.items()
+        }
+        self.layout = columns
+        self.meta = {
+            "model": model,
+            "pid": os.getpid(),
+            "created": time.time(),
+            "capacity": capacity,
+            "rows": 0,
+            "sealed": False,
+            "start": None,
+            "end": None,
+            "feature_names": list(feature_names),
+            "labels": list(labels),
+            "columns": {name: {"dtype": np.dtype(dtype).str, "shape": list(shape)}
+                        for name, (dtype, shape) in columns.items()},
+            "versions": [],
+            "vessels": {},
+        }
+        _write_meta(path, self.meta)
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.meta["rows"]
+
+    def version_code(self, version: str) -> int:
+        """Per-segment dictionary code of a model version."""
+        versions = self.meta["versions"]
+        if version not in versions:
+            versions.append(version)
+        return versions.index(version)
+
+    def append(self, batch: Dict[str, np.ndarray], vessel_ids: List[Optional[str]]):
+        start = self.meta["rows"]
+        rows = len(batch["timestamp"])
+        stop = start + rows
+        vessels = self.meta["vessels"]
+        codes = np.full(rows, -1, dtype=np.int32)
+        for offset, vessel_id in enumerate(vessel_ids):
+            if vessel_id is None:
+                continue
+            entry = vessels.setdefault(vessel_id, {"code": len(vessels), "first": start + offset, "last": 0, "rows": 0})
+            entry["last"] = start + offset
+            entry["rows"] += 1
+            codes[offset] = entry["code"]
+        for name, column in self.columns.items():
+            column[start:stop] = codes if name == "vessel" else batch[name]
+        timestamps = batch["timestamp"]
+        first, last = float(timestamps.min()), float(timestamps.max())
+        self.meta["start"] = first if self.meta["start"] is None else min(first, self.meta["start"])
+        self.meta["end"] = last if self.meta["end"] is None else max(last, self.meta["end"])
+        self.meta["rows"] = stop
+
+    def commit(self, sealed: bool = False):
+        self.meta["sealed"] = sealed
+        _write_meta(self.path, self.meta)
+
+
+class PredictionLog:
+    def __init__(self, directory: Path, segment_rows: int = 65536, max_segments: int = 0,
+                 flush_interval: float = 0.25, max_pending: int = 100000):
+        """`max_segments` sealed segments are kept per model (0 keeps all)."""
+        self.directory = Path(directory)
+        self.segment_rows = segment_rows
+        self.max_segments = max_segments
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._seal_orphans()
+        self._reset()
+        _logs.add(self)
+
+    def _reset(self):
+        self._pending = deque()
+        # Statistics only: updated without a lock, so concurrent drops may undercount
+        self.dropped = 0
+        self._segments: Dict[str, Segment] = {}
+        self._sequence = itertools.count()
+        self.written = 0
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+        self._worker.start()
+
+    def record(self, model: str, version: str, features: np.ndarray, outputs: Dict[str, np.ndarray],
+               latency: float, vessel_id: Optional[str] = None, feature_names: List[str] = (),
+               labels: List[str] = ()):
+        """Queue scored rows for the writer; drops them when the writer has fallen too far behind."""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += len(features)
+            return
+        self._pending.append((time.time(), model, version, np.array(features, dtype=np.float32), outputs,
+                              latency, vessel_id, feature_names, labels))
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as exc:
+                print(f"Warning: prediction log write failed: {exc}")
+
+    def flush(self):
+        """Write everything queued so far."""
+        with self._lock:
+            records = [self._pending.popleft() for _ in range(len(self._pending))]
+            by_model: Dict[str, List] = {}
+            for record in records:
+                by_model.setdefault(record[1], []).append(record)
+            for model, batch in by_model.items():
+                self._write(model, batch)
+                self.written += sum(len(record[3]) for record in batch)
+
+    def _write(self, model: str, records: List):
+        columns = {
+            "timestamp": np.concatenate([np.full(len(r[3]), r[0]) for r in records]),
+            "latency_us": np.concatenate([np.full(len(r[3]), r[5] * 1e6, dtype=np.float32) for r in records]),
+            "features": np.concatenate([r[3] for r in records]),
+        }
+        for name in records[0][4]:
+            values = [np.asarray(r[4][name]) for r in records]
+            dtype = np.int32 if values[0].dtype.kind in "iub" else np.float32
+            columns[name] = np.concatenate(values).astype(dtype, copy=False)
+        versions = [r[2] for r in records for _ in range(len(r[3]))]
+        vessels = [r[6] for r in records for _ in range(len(r[3]))]
+        layout = {name: (values.dtype.str, values.shape[1:]) for name, values in columns.items()}
+        layout["version"] = (np.dtype(np.int16).str, ())
+        layout["vessel"] = (np.dtype(np.int32).str, ())
+
+        done = 0
+        while done < len(versions):
+            segment = self._segments.get(model)
+            if segment is not None and (segment.free == 0 or segment.layout != layout):
+                self._seal(model)
+                segment = None
+            if segment is None:
+                segment = self._open(model, layout, records[0][7], records[0][8])
+            take = min(segment.free, len(versions) - done)
+            part = {name: values[done:done + take] for name, values in columns.items()}
+            part["version"] = np.array([segment.version_code(v) for v in versions[done:done + take]],
+                                       dtype=np.int16)
+            segment.append(part, vessels[done:done + take])
+            done += take
+        self._segments[model].commit()
+
+    def _open(self, model: str, layout: Dict, feature_names: List[str], labels: List[str]) -> Segment:
+        name = f"{time.time_ns():020d}-{os.getpid()}-{next(self._sequence)}"
+        segment = Segment(self.directory / model / name, model, self.segment_rows, layout, feature_names, labels)
+        self._segments[model] = segment
+        return segment
+
+    def _seal(self, model: str):
+        self._segments.pop(model).commit(sealed=True)
+        if self.max_segments:
+            sealed = [path for path in self.segments(model) if (read_meta(path) or {}).get("sealed")]
+            for path in sealed[:-self.max_segments]:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _seal_orphans(self):
+        """Seal segments left behind by processes that are gone, so retention can remove them."""
+        for segment in self.directory.glob("*/*"):
+            meta = read_meta(segment)
+            if meta is not None and not meta["sealed"] and not _pid_alive(meta["pid"]):
+                meta["sealed"] = True
+                _write_meta(segment, meta)
+
+    def segments(self, model: str) -> List[Path]:
+        """Segment directories of a model, oldest first."""
+        return sorted(path for path in (self.directory / model).glob("*") if (path / META).exists())
+
+    def query(self, model: str, vessel_id: Optional[str] = None, start: Optional[float] = None,
+              end: Optional[float] = None, limit: Optional[int] = None) -> Dict:
+        """Logged rows of a model, oldest first; `limit` keeps the most recent rows."""
+        parts = []
+        remaining = limit
+        feature_names, labels = [], []
+        for path in reversed(self.segments(model)):
+            meta = read_meta(path)
+            if meta is None or meta["rows"] == 0:
+                continue
+            if (start is not None and meta["end"] < start) or (end is not None and meta["start"] > end):
+                continue
+            low, high = 0, meta["rows"]
+            code = None
+            if vessel_id is not None:
+                entry = meta["vessels"].get(vessel_id)
+                if entry is None:
+                    continue
+                low, high, code = entry["first"], entry["last"] + 1, entry["code"]
+
+            columns = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in meta["columns"]}
+            mask = np.ones(high - low, dtype=bool)
+            if code is not None:
+                mask &= columns["vessel"][low:high] == code
+            timestamps = columns["timestamp"][low:high]
+            if start is not None:
+                mask &= timestamps >= start
+            if end is not None:
+                mask &= timestamps <= end
+            rows = low + np.flatnonzero(mask)
+            if remaining is not None:
+                rows = rows[max(len(rows) - remaining, 0):]
+                remaining -= len(rows)
+            if len(rows):
+                part = {name: np.asarray(column[rows]) for name, column in columns.items()}
+                vessels = {entry["code"]: name for name, entry in meta["vessels"].items()}
+                part["vessel"] = [vessels.get(int(c)) for c in part["vessel"]]
+                part["version"] = [meta["versions"][int(c)] for c in part["version"]]
+                parts.append(part)
+                feature_names, labels = meta["feature_names"], meta["labels"]
+            if remaining == 0:
+                break
+
+        parts.reverse()
+        result = {"model": model, "rows": sum(len(part["timestamp"]) for part in parts),
+                  "feature_names": feature_names, "labels": labels}
+        for name in (parts[0] if parts else ()):
+            if isinstance(parts[0][name], list):
+                result[name] = [value for part in parts for value in part[name]]
+            else:
+                result[name] = np.concatenate([part[name] for part in parts])
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            open_segments = {model: segment.meta["rows"] for model, segment in self._segments.items()}
+        return {
+            "directory": str(self.directory),
+            "pending": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped,
+            "segment_rows": self.segment_rows,
+            "open_segments": open_segments,
+        }
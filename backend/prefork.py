@@ -0,0 +1,155 @@
+"""
+Pre-fork multi-worker serving.
+
+`uvicorn --workers N` starts N fresh interpreters, and each one imports `main`
+and unpickles every artifact again. `serve` instead runs in the process that
+already imported the app (models loaded and warmed by `PRELOAD_MODELS`), binds
+the listening socket once and forks the workers from it. Model memory is then
+shared copy-on-write:
+
+- booster trees live in XGBoost's C++ heap and NumPy buffers (compiled forests,
+  SHAP expected values, drift references) sit outside the Python object
+  headers, so serving never writes to those pages;
+- `gc.freeze()` moves everything allocated so far into the permanent
+  generation, so the cyclic collector does not dirty the pages of long-lived
+  objects in the workers.
+
+Workers that exit are restarted. SIGTERM/SIGINT stop all workers and SIGUSR1
+prints a per-worker memory table. `memory_report` (served at `/workers`) gives
+RSS, PSS and USS for the parent and every worker from `/proc/<pid>/smaps_rollup`.
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+from typing import Dict, List, Optional
+
+import uvicorn
+
+SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared",
+    "Shared_Dirty": "shared",
+    "Private_Clean": "uss",
+    "Private_Dirty": "uss",
+}
+
+
+def memory_usage(pid: int) -> Optional[Dict[str, int]]:
+    """RSS, PSS, shared and unique (USS) bytes of a process, or None where /proc is unavailable."""
+    usage = {"rss": 0, "pss": 0, "shared": 0, "uss": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps:
+            for line in smaps:
+                key, _, value = line.partition(":")
+                if key in SMAPS_FIELDS:
+                    usage[SMAPS_FIELDS[key]] += int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        return None
+    return usage
+
+
+def child_pids(parent: int) -> List[int]:
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                # The command name may contain spaces; fields after it are fixed
+                fields = stat.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent:
+            pids.append(int(entry))
+    return sorted(pids)
+
+
+def memory_report() -> Dict:
+    """Memory of this server: the pre-fork parent and its workers, or just this process."""
+    pid = os.getpid()
+    parent = int(os.environ.get("PREFORK_PARENT", "0"))
+    if parent and os.path.exists(f"/proc/{parent}"):
+        workers = child_pids(parent)
+    else:
+        parent, workers = pid, [pid]
+    usage = {p: memory_usage(p) for p in {parent, *workers}}
+    usage = {p: u for p, u in usage.items() if u is not None}
+    return {
+        "pid": pid,
+        "parent": {"pid": parent, **usage[parent]} if parent in usage and parent not in workers else None,
+        "workers": [{"pid": p, **usage[p]} for p in workers if p in usage],
+        "total_pss": sum(u["pss"] for u in usage.values()),
+        "total_rss": sum(u["rss"] for u in usage.values()),
+    }
+
+
+def print_report(workers: List[int]):
+    mib = 1024 * 1024
+    print(f"{'pid':>8} {'rss MiB':>10} {'pss MiB':>10} {'uss MiB':>10} {'shared MiB':>11}")
+    for label, pid in [("parent", os.getpid())] + [("worker", p) for p in workers]:
+        usage = memory_usage(pid)
+        if usage is None:
+            continue
+        print(f"{pid:>8} {usage['rss'] / mib:>10.1f} {usage['pss'] / mib:>10.1f} "
+              f"{usage['uss'] / mib:>10.1f} {usage['shared'] / mib:>11.1f}  {label}")
+    sys.stdout.flush()
+
+
+def _run_worker(app, sock: socket.socket, log_level: str):
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGUSR1):
+        signal.signal(sig, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(app, host: str = "0.0.0.0", port: int = 8000, workers: int = 2, log_level: str = "info"):
+    """Fork `workers` uvicorn servers sharing one listening socket and the parent's loaded models."""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    os.environ["PREFORK_PARENT"] = str(os.getpid())
+
+    gc.collect()
+    gc.freeze()
+
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(app, sock, log_level)
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGUSR1, lambda signum, frame: print_report(sorted(children)))
+
+    for _ in range(workers):
+        spawn()
+    print(f"Pre-fork server on {host}:{port} with {workers} workers: {sorted(children)}")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+            spawn()
+    sock.close()
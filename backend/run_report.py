@@ -0,0 +1,149 @@
+"""
+Stage-level instrumentation for the training scripts.
+
+Each stage wrapped in `RunReport.stage` records wall time, process CPU time
+(all threads, so OpenMP work in XGBoost counts) and the peak RSS reached while
+it ran. On Linux the kernel's RSS high-water mark is reset at the start of every
+stage (`/proc/self/clear_refs`), so the peak belongs to that stage; elsewhere
+the process-wide `ru_maxrss` is reported instead. Stages served from the
+training stage cache are marked `cached` and never flagged against a run that
+computed them.
+
+`save` writes the report next to the artifacts as `<name>_run_report.json` and
+keeps a timestamped copy under `runs/`, which `utils/compare_runs.py` diffs to
+flag stages that got slower or hungrier.
+"""
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# A stage regresses when it grows by more than this fraction and by more than the absolute floor
+DEFAULT_THRESHOLD = 0.2
+MIN_SECONDS = 0.25
+MIN_BYTES = 32 * 1024 * 1024
+
+
+def _status_bytes(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _max_rss() -> int:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+class RunReport:
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.now(timezone.utc)
+        self.stages: List[Dict] = []
+        self.metrics: Dict = {}
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str):
+        per_stage_peak = _reset_peak()
+        rss_before = _status_bytes("VmRSS")
+        wall, cpu = time.perf_counter(), time.process_time()
+        # Extra fields the stage wants recorded (e.g. whether it was served from the stage cache)
+        notes: Dict = {}
+        try:
+            yield notes
+        finally:
+            rss_after = _status_bytes("VmRSS")
+            peak = _status_bytes("VmHWM") if per_stage_peak else None
+            self.stages.append({
+                "stage": name,
+                "wall_s": time.perf_counter() - wall,
+                "cpu_s": time.process_time() - cpu,
+                "peak_rss_bytes": peak if peak is not None else _max_rss(),
+                "rss_before_bytes": rss_before,
+                "rss_delta_bytes": (rss_after - rss_before) if rss_before is not None and rss_after else None,
+                "peak_scope": "stage" if peak is not None else "process",
+                **notes,
+            })
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "python": platform.python_version(),
+            "host": platform.node(),
+            "cpu_count": os.cpu_count(),
+            "total": {
+                "wall_s": time.perf_counter() - self._wall,
+                "cpu_s": time.process_time() - self._cpu,
+                "peak_rss_bytes": max((s["peak_rss_bytes"] for s in self.stages), default=None),
+            },
+            "stages": self.stages,
+            "metrics": self.metrics,
+        }
+
+    def save(self, directory: Path) -> Path:
+        report = self.to_dict()
+        history = directory / "runs"
+        history.mkdir(parents=True, exist_ok=True)
+        stamp = self.started_at.strftime("%Y%m%dT%H%M%S%f")
+        for path in (history / f"{self.name}-{stamp}.json", directory / f"{self.name}_run_report.json"):
+            with open(path, "w") as handle:
+                json.dump(report, handle, indent=2)
+        return directory / f"{self.name}_run_report.json"
+
+    def summary(self) -> str:
+        lines = [f"{'stage':<12} {'wall s':>8} {'cpu s':>8} {'peak MiB':>9}"]
+        for stage in self.stages:
+            lines.append(f"{stage['stage']:<12} {stage['wall_s']:>8.2f} {stage['cpu_s']:>8.2f} "
+                         f"{stage['peak_rss_bytes'] / 2 ** 20:>9.0f}{'  cached' if stage.get('cached') else ''}")
+        return "\n".join(lines)
+
+
+def history(directory: Path, name: str) -> List[Path]:
+    """Saved runs of one script, oldest first."""
+    return sorted((directory / "runs").glob(f"{name}-*.json"))
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Per-stage changes between two reports, with regressions flagged."""
+    before = {stage["stage"]: stage for stage in baseline["stages"]}
+    rows = []
+    for stage in current["stages"]:
+        old = before.get(stage["stage"])
+        row = {"stage": stage["stage"], "regressions": []}
+        for key, floor in (("wall_s", MIN_SECONDS), ("cpu_s", MIN_SECONDS), ("peak_rss_bytes", MIN_BYTES)):
+            new_value = stage[key]
+            old_value = old[key] if old is not None else None
+            row[key] = (old_value, new_value)
+            if old_value is None or new_value is None:
+                continue
+            # A stage recomputed after a stage-cache hit is not a regression
+            if old.get("cached") and not stage.get("cached"):
+                continue
+            if new_value - old_value > floor and new_value > old_value * (1 + threshold):
+                row["regressions"].append(key)
+        rows.append(row)
+    return rows
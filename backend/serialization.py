@@ -0,0 +1,86 @@
+"""
+Response encoding for the prediction endpoints.
+
+Handlers hand over plain dicts of NumPy arrays and lists; this module picks the
+wire format from the `Accept` header and encodes once to bytes, bypassing
+FastAPI's recursive `jsonable_encoder`.
+
+Formats:
+- `application/json` (default): the original nested, name-keyed payload.
+- `application/vnd.kurohana.columnar+json`: names sent once, values as arrays.
+- `application/msgpack`: the columnar payload in MessagePack.
+"""
+import json
+from typing import Optional
+
+import numpy as np
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional binary encoding
+    msgpack = None
+
+MEDIA_JSON = "application/json"
+MEDIA_COLUMNAR = "application/vnd.kurohana.columnar+json"
+MEDIA_MSGPACK = "application/msgpack"
+MSGPACK_ALIASES = {MEDIA_MSGPACK, "application/x-msgpack", "application/vnd.msgpack"}
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Pick the best supported media type from an Accept header, by q-value then order."""
+    if not accept:
+        return MEDIA_JSON
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        media, _, params = part.strip().partition(";")
+        media = media.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, val = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(val)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, media))
+    for _, _, media in sorted(candidates):
+        if media in MSGPACK_ALIASES:
+            if msgpack is not None:
+                return MEDIA_MSGPACK
+        elif media == MEDIA_COLUMNAR:
+            return MEDIA_COLUMNAR
+        elif media in {MEDIA_JSON, "application/*", "*/*"}:
+            return MEDIA_JSON
+    raise HTTPException(status_code=406, detail=f"Unsupported Accept header: {accept}")
+
+
+def _default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def encode_json(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+def encode_msgpack(content) -> bytes:
+    return msgpack.packb(content, default=_default, use_single_float=False)
+
+
+def render(content, media_type: str) -> Response:
+    if media_type == MEDIA_MSGPACK:
+        return Response(encode_msgpack(content), media_type=MEDIA_MSGPACK)
+    return Response(encode_json(content), media_type=media_type)
@@ -0,0 +1,193 @@
+"""
+Content-addressed cache for training pipeline stages.
+
+A stage is a function of its inputs and parameters. Its cache key hashes:
+
+- the stage name and the source of the stage function (plus any helpers passed
+  as `code`), so editing a stage invalidates it,
+- the parameters,
+- each input: the key of the upstream stage that produced it (so a change
+  anywhere upstream propagates down), the contents of input files, or a
+  `joblib.hash` of plain values,
+- the Python and library versions the result was computed with.
+
+Outputs are stored as `<name>-<key>.joblib` under the cache directory. A hit
+loads the stored output instead of running the stage. When the directory grows
+past `max_bytes`, the least recently used entries are removed.
+"""
+import hashlib
+import inspect
+import os
+import platform
+import tempfile
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import joblib
+
+_LIBRARIES = ("numpy", "pandas", "sklearn", "imblearn", "xgboost", "lightgbm", "catboost", "shap")
+_environment: Optional[str] = None
+
+
+def environment() -> str:
+    """Python and library versions that stage outputs depend on."""
+    global _environment
+    if _environment is None:
+        from importlib import import_module
+        versions = [f"python={platform.python_version()}"]
+        for name in _LIBRARIES:
+            try:
+                versions.append(f"{name}={import_module(name).__version__}")
+            except ImportError:
+                versions.append(f"{name}=missing")
+        _environment = ";".join(versions)
+    return _environment
+
+
+def code_version(obj) -> str:
+    """Hash of a function's or module's source (bytecode when the source is unavailable)."""
+    try:
+        source = inspect.getsource(obj).encode()
+    except (OSError, TypeError):
+        code = getattr(obj, "__code__", None)
+        source = code.co_code + repr(code.co_consts).encode() if code else repr(obj).encode()
+    return hashlib.blake2b(source, digest_size=16).hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Artifact:
+    """A stage output together with the key that identifies it."""
+
+    def __init__(self, key: str, value: Any, cached: bool = False):
+        self.key = key
+        self.value = value
+        self.cached = cached
+
+    def __getitem__(self, index: int) -> "Artifact":
+        return Artifact(f"{self.key}/{index}", self.value[index], self.cached)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self.value)))
+
+
+def fingerprint(value) -> str:
+    if isinstance(value, Artifact):
+        return value.key
+    if isinstance(value, Path):
+        return f"file:{file_digest(value)}"
+    return joblib.hash(value)
+
+
+class StageCache:
+    def __init__(self, directory: Optional[Path], max_bytes: int = 2 * 1024 ** 3):
+        """`directory=None` disables caching: every stage runs."""
+        self.directory = Path(directory) if directory is not None else None
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, name: str, fn, inputs: Iterable, params: Optional[Dict] = None, code: Iterable = ()) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (name, code_version(fn), *map(code_version, code), joblib.hash(params or {}),
+                     *map(fingerprint, inputs), environment()):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def run(self, name: str, fn, *inputs, params: Optional[Dict] = None, code: Iterable = (),
+            report=None) -> Artifact:
+        """Output of `fn(*inputs, **params)`, loaded from the cache when the key is already stored.
+
+        Artifact inputs are passed to `fn` as their values. With a `RunReport`,
+        the stage is timed under `name` and marked as cached or not.
+        """
+        code = tuple(code)
+        key = self.key(name, fn, inputs, params, code)
+        path = self.directory / f"{name}-{key}.joblib" if self.directory is not None else None
+        with report.stage(name) if report is not None else nullcontext({}) as notes:
+            value, cached = self._load(path), True
+            if value is _MISSING:
+                cached = False
+                args = [item.value if isinstance(item, Artifact) else item for item in inputs]
+                value = fn(*args, **(params or {}))
+                self._store(path, value)
+            notes["cached"] = cached
+        return Artifact(key, value, cached)
+
+    def _load(self, path: Optional[Path]):
+        if path is None or not path.exists():
+            self.misses += 1
+            return _MISSING
+        try:
+            value = joblib.load(path)
+        except Exception:
+            # Truncated or unreadable entry: recompute it
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return _MISSING
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def _store(self, path: Optional[Path], value):
+        if path is None:
+            return
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(handle)
+        try:
+            joblib.dump(value, temporary)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+        self.evict(keep=path)
+
+    def entries(self):
+        """Stored entries, least recently used first."""
+        if self.directory is None:
+            return []
+        paths = [(path, path.stat()) for path in self.directory.glob("*.joblib")]
+        return sorted(paths, key=lambda item: item[1].st_mtime)
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """Remove least recently used entries until the cache fits `max_bytes`; returns bytes freed."""
+        entries = self.entries()
+        total = sum(stat.st_size for _, stat in entries)
+        freed = 0
+        for path, stat in entries:
+            if total - freed <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            freed += stat.st_size
+        return freed
+
+    def clear(self):
+        for path, _ in self.entries():
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict:
+        entries = self.entries()
+        return {
+            "enabled": self.directory is not None,
+            "directory": str(self.directory) if self.directory is not None else None,
+            "entries": len(entries),
+            "bytes": sum(stat.st_size for _, stat in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_MISSING = object()
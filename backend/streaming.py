@@ -0,0 +1,118 @@
+"""
+Per-vessel rolling state for the telemetry WebSocket.
+
+Vessels stream sensor readings as deltas (only the sensors that changed). Each
+vessel keeps its last known feature vector and a fixed-size ring buffer of the
+merged vectors, with running sums so the window mean and RMS are updated in
+O(features) per reading instead of rescanning the window.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class RollingWindow:
+    """Fixed-size ring buffer with incrementally maintained mean and RMS."""
+
+    # Running sums drift slightly as values are added and subtracted; rebuild them periodically
+    RESYNC_EVERY = 4096
+
+    def __init__(self, n_features: int, size: int):
+        self.buffer = np.zeros((size, n_features), dtype=np.float64)
+        self.size = size
+        self.count = 0
+        self.pos = 0
+        self.total = np.zeros(n_features, dtype=np.float64)
+        self.total_sq = np.zeros(n_features, dtype=np.float64)
+        self._pushes = 0
+
+    def push(self, row: np.ndarray):
+        if self.count == self.size:
+            old = self.buffer[self.pos]
+            self.total -= old
+            self.total_sq -= old * old
+        else:
+            self.count += 1
+        self.buffer[self.pos] = row
+        self.total += row
+        self.total_sq += row * row
+        self.pos = (self.pos + 1) % self.size
+        self._pushes += 1
+        if self._pushes % self.RESYNC_EVERY == 0:
+            filled = self.buffer[: self.count]
+            self.total = filled.sum(axis=0)
+            self.total_sq = (filled * filled).sum(axis=0)
+
+    def mean(self) -> np.ndarray:
+        return self.total / self.count
+
+    def rms(self) -> np.ndarray:
+        return np.sqrt(np.maximum(self.total_sq / self.count, 0.0))
+
+
+class VesselState:
+    def __init__(self, n_features: int, window_size: int):
+        self.latest = np.full(n_features, np.nan, dtype=np.float64)
+        self.window = RollingWindow(n_features, window_size)
+        self.condition = None
+
+
+class TelemetryHub:
+    """Rolling state for every vessel streaming into one model, evicting the least recently seen."""
+
+    def __init__(self, field_names: List[str], window_size: int = 60, max_vessels: int = 10000):
+        if window_size < 1:
+            raise ValueError(f"Telemetry window must hold at least one reading, got {window_size}")
+        self.field_names = list(field_names)
+        self.index = {name: i for i, name in enumerate(self.field_names)}
+        self.window_size = window_size
+        self.max_vessels = max_vessels
+        self.vessels: "OrderedDict[str, VesselState]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def update(self, vessel_id: str, readings: Dict[str, float]) -> Optional[Dict[str, np.ndarray]]:
+        """Merge a delta into the vessel's state; returns window aggregates once every sensor is known."""
+        unknown = [name for name in readings if name not in self.index]
+        if unknown:
+            raise ValueError(f"Unknown sensors: {unknown}")
+        columns = [self.index[name] for name in readings]
+        values = np.asarray(list(readings.values()), dtype=np.float64)
+        if not np.isfinite(values).all():
+            raise ValueError("Readings must be finite numbers")
+
+        with self.lock:
+            state = self.vessels.get(vessel_id)
+            if state is None:
+                state = self.vessels[vessel_id] = VesselState(len(self.field_names), self.window_size)
+                if len(self.vessels) > self.max_vessels:
+                    self.vessels.popitem(last=False)
+            else:
+                self.vessels.move_to_end(vessel_id)
+            state.latest[columns] = values
+            if np.isnan(state.latest).any():
+                return None
+            state.window.push(state.latest)
+            return {
+                "latest": state.latest.copy(),
+                "mean": state.window.mean(),
+                "rms": state.window.rms(),
+                "samples": state.window.count,
+            }
+
+    def missing(self, vessel_id: str) -> List[str]:
+        with self.lock:
+            state = self.vessels.get(vessel_id)
+            if state is None:
+                return list(self.field_names)
+            return [self.field_names[i] for i in np.flatnonzero(np.isnan(state.latest))]
+
+    def swap_condition(self, vessel_id: str, condition) -> bool:
+        """Record the vessel's latest condition; True when it differs from the previous one."""
+        with self.lock:
+            state = self.vessels.get(vessel_id)
+            if state is None or state.condition == condition:
+                return False
+            state.condition = condition
+            return True
@@ -0,0 +1,93 @@
+from pathlib import Path
+import asyncio
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from admission import AdmissionController
+
+
+def test_predict_only_requests_are_served_before_explanations():
+    async def scenario():
+        controller = AdmissionController("test", max_concurrency=1)
+        running = await controller.acquire(explain=True)
+        order = []
+
+        async def request(label, explain):
+            ticket = await controller.acquire(explain=explain)
+            order.append(label)
+            controller.release(ticket)
+
+        waiters = [
+            asyncio.ensure_future(request("explain", True)),
+            asyncio.ensure_future(request("predict", False)),
+        ]
+        await asyncio.sleep(0)
+        controller.release(running)
+        await asyncio.gather(*waiters)
+        return order, controller.in_flight
+
+    order, in_flight = asyncio.run(scenario())
+    assert order == ["predict", "explain"]
+    assert in_flight == 0
+
+
+def test_explanations_degrade_when_they_would_miss_the_deadline():
+    async def scenario():
+        controller = AdmissionController("test", max_concurrency=1)
+        controller.service_time = {0: 0.01, 1: 1.0}
+        running = await controller.acquire(explain=False)
+
+        pending = asyncio.ensure_future(controller.acquire(explain=True, timeout=0.6))
+        await asyncio.sleep(0)
+        controller.release(running)
+        return await pending
+
+    ticket = asyncio.run(scenario())
+    assert ticket.degraded
+    assert not ticket.explain
+
+
+def test_requests_that_cannot_meet_their_deadline_are_rejected():
+    async def scenario():
+        controller = AdmissionController("test", max_concurrency=1)
+        await controller.acquire(explain=True)
+        with pytest.raises(HTTPException) as exc:
+            await controller.acquire(explain=False, timeout=0.001)
+        return exc.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 429
+    assert "Retry-After" in error.headers
+
+
+@pytest.mark.parametrize("handed_over", [False, True])
+def test_cancelled_waiters_do_not_leak_slots(handed_over):
+    async def scenario():
+        controller = AdmissionController("test", max_concurrency=1)
+        running = await controller.acquire(explain=False)
+        waiter = asyncio.ensure_future(controller.acquire(explain=False))
+        await asyncio.sleep(0)
+        if handed_over:
+            # The slot reaches the waiter, which is cancelled before it resumes
+            controller.release(running)
+            waiter.cancel()
+        else:
+            waiter.cancel()
+            await asyncio.sleep(0.01)
+            controller.release(running)
+        outcome, = await asyncio.gather(waiter, return_exceptions=True)
+        if not isinstance(outcome, asyncio.CancelledError):
+            # Python may let a wait that already completed win over the cancellation
+            controller.release(outcome)
+        in_flight = controller.in_flight
+        ticket = await asyncio.wait_for(controller.acquire(explain=False), timeout=1)
+        controller.release(ticket)
+        return in_flight, controller.in_flight
+
+    assert asyncio.run(scenario()) == (0, 0)
@@ -0,0 +1,55 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import shap
+from xgboost import XGBClassifier
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from cascade import Cascade, calibrate, evaluate, fit_cascade
+
+
+rng = np.random.default_rng(0)
+X = pd.DataFrame(rng.normal(size=(3000, 4)), columns=["a", "b", "c", "d"])
+y = np.digitize(X["a"] + 0.5 * X["b"] + rng.normal(scale=0.3, size=len(X)), [-0.5, 0.8])
+full = XGBClassifier(n_estimators=100, max_depth=4).fit(X[:2000], y[:2000])
+stage1 = XGBClassifier(objective="multi:softmax", n_estimators=10, max_depth=2).fit(X[:2000], y[:2000])
+
+
+def test_calibrated_threshold_respects_accuracy_budget():
+    X_cal, y_cal = X[2000:], y[2000:]
+    proba = stage1.predict_proba(X_cal)
+    calibration = calibrate(proba, full.predict(X_cal), y_cal, max_accuracy_loss=0.01)
+    assert calibration["cascade_accuracy"] >= calibration["full_accuracy"] - 0.01
+    assert 0.0 <= calibration["escalation_rate"] < 1.0
+
+    check = evaluate(proba, full.predict(X_cal), y_cal, calibration["threshold"])
+    assert check["escalation_rate"] == calibration["escalation_rate"]
+    assert check["cascade_accuracy"] == calibration["cascade_accuracy"]
+
+    strict = calibrate(proba, full.predict(X_cal), y_cal, max_accuracy_loss=0.0)
+    assert strict["escalation_rate"] >= calibration["escalation_rate"]
+
+
+def test_cascade_screens_and_explains_like_tree_explainer():
+    cascade = Cascade({"model": stage1, "threshold": 0.8})
+    features = X[2000:2100].to_numpy(dtype=np.float32)
+    proba, escalated = cascade.screen(features)
+    assert cascade.stats()["backend"] == "compiled"
+    np.testing.assert_array_equal(proba, stage1.predict_proba(features))
+    assert escalated.tolist() == (proba.max(axis=1) < 0.8).tolist()
+    assert cascade.stats()["rows"] == 100
+
+    values = cascade.explain(features)
+    expected = shap.TreeExplainer(stage1)(features).values
+    np.testing.assert_allclose(values, expected, rtol=1e-4, atol=1e-5)
+
+
+def test_trained_first_stage_is_served_compiled():
+    artifact = fit_cascade(X[:2000], y[:2000], full, X[2000:], y[2000:])
+    assert artifact["calibration"]["max_accuracy_loss"] == 0.01
+    assert Cascade(artifact).stats()["backend"] == "compiled"
@@ -0,0 +1,46 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from compaction import compact, pareto_frontier, truncate
+
+
+rng = np.random.default_rng(0)
+X = pd.DataFrame(rng.normal(size=(1500, 4)), columns=["a", "b", "c", "noise"])
+y = 3 * X["a"] + X["b"] ** 2 + 0.5 * X["c"]
+X["noise"] = 0.0
+model = XGBRegressor(n_estimators=60, max_depth=4, random_state=0).fit(X[:1000], y[:1000])
+
+
+def test_truncated_model_matches_iteration_range():
+    short = truncate(model, 20)
+    assert short.get_booster().num_boosted_rounds() == 20
+    np.testing.assert_allclose(short.predict(X[:50]), model.predict(X[:50], iteration_range=(0, 20)))
+
+
+def test_compact_drops_dead_features_and_reports_frontier():
+    report = compact(model, X[:1000], y[:1000], X[1000:1250], y[1000:1250], X[1250:], y[1250:],
+                     tolerance=0.01, student={"n_estimators": 20, "max_depth": 3})
+    variants = {result["variant"]: result for result in report["results"]}
+    assert report["dropped_features"] == ["noise"]
+    assert variants["reduced"]["features"] == 3
+    assert variants["pruned"]["rounds"] <= variants["full"]["rounds"]
+    assert variants["distilled"]["trees"] == 20
+    assert set(report["frontier"]) <= set(variants)
+    assert variants[report["recommended"]]["quality"] >= variants["full"]["quality"] - 0.01
+
+
+def test_frontier_excludes_dominated_variants():
+    results = [
+        {"variant": "full", "quality": 0.9, "predict_us": 100, "shap_us": 900},
+        {"variant": "slow", "quality": 0.8, "predict_us": 200, "shap_us": 900},
+        {"variant": "small", "quality": 0.85, "predict_us": 50, "shap_us": 200},
+    ]
+    assert pareto_frontier(results) == ["full", "small"]
@@ -0,0 +1,75 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+import distributed
+
+
+def toy_data(rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(rows, 4)), columns=["a", "b", "c", "d"])
+    y = pd.Series((X["a"] > 0).astype(int) + (X["b"] > 1).astype(int))
+    return X, y
+
+
+def test_shards_partition_the_rows():
+    _, y = toy_data()
+    shards = [distributed.shard(y, 3, rank) for rank in range(3)]
+    assert sorted(np.concatenate(shards).tolist()) == list(range(len(y)))
+
+    stratified = [distributed.shard(y, 3, rank, stratify=True) for rank in range(3)]
+    assert sorted(np.concatenate(stratified).tolist()) == list(range(len(y)))
+    assert all(set(y.iloc[rows]) == set(y) for rows in stratified)
+
+    with pytest.raises(ValueError):
+        distributed.shard(pd.Series([0, 0, 0, 1]), 2, 0, stratify=True)
+
+
+def test_file_shards_match_the_rows_each_rank_reads(tmp_path):
+    X, _ = toy_data(rows=103)
+    X.to_csv(tmp_path / "data.csv", index=False)
+    outputs = distributed.write_shards(tmp_path / "data.csv", 3, tmp_path / "shards", chunk_size=10)
+
+    shards = [distributed.read_shard(tmp_path / "data.csv", 3, rank) for rank in range(3)]
+    for shard, output in zip(shards, outputs):
+        pd.testing.assert_frame_equal(pd.read_csv(output), shard)
+    assert sorted(pd.concat(shards)["a"]) == sorted(pd.read_csv(tmp_path / "data.csv")["a"])
+
+
+def test_workers_train_one_model_together():
+    X, y = toy_data()
+    model, report = distributed.train(lambda: xgb.XGBClassifier(n_estimators=20), X, y, workers=2,
+                                      stratify=True, nthread=1)
+    assert isinstance(model, xgb.XGBClassifier)
+    assert model.get_booster().num_boosted_rounds() == 20
+    assert (model.predict(X) == y).mean() > 0.9
+    assert model.get_params()["n_jobs"] is None
+    assert [worker["rank"] for worker in report["per_worker"]] == [0, 1]
+    assert sum(worker["rows"] for worker in report["per_worker"]) == len(X)
+    assert all(worker["fit_s"] > 0 for worker in report["per_worker"])
+
+
+def test_worker_failure_is_reported():
+    X, y = toy_data(rows=200)
+
+    def broken():
+        raise RuntimeError("no estimator")
+
+    with pytest.raises(RuntimeError, match="no estimator"):
+        distributed.train(broken, X, y, workers=2, timeout=30)
+
+
+def test_scaling_reports_speedup_relative_to_one_worker():
+    X, y = toy_data(rows=500)
+    rows = distributed.scaling(lambda: xgb.XGBRegressor(n_estimators=5), X, y.astype(float), [1, 2], nthread=1)
+    assert [row["workers"] for row in rows] == [1, 2]
+    assert rows[0]["speedup"] == pytest.approx(1.0)
+    assert rows[1]["efficiency"] == pytest.approx(rows[1]["speedup"] / 2)
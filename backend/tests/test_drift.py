@@ -0,0 +1,40 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from drift import DriftMonitor, build_reference, create_monitor
+
+
+rng = np.random.default_rng(0)
+train = pd.DataFrame({"a": rng.normal(size=5000), "b": rng.uniform(size=5000)})
+
+
+def test_same_distribution_is_stable_and_shift_is_flagged():
+    reference = build_reference(train)
+    assert reference["proportions"].shape == (2, 10)
+
+    monitor = DriftMonitor(reference, ["a", "b"])
+    monitor.update(rng.normal(size=(2000, 2)) * [1, 0] + [0, 0.5])
+    report = monitor.report()
+    assert report["rows_observed"] == 2000
+    assert report["features"]["a"]["psi"] < 0.1
+    assert report["features"]["b"]["psi"] > 0.25
+
+
+def test_monitor_memory_is_fixed():
+    monitor = DriftMonitor(build_reference(train), ["a", "b"])
+    for _ in range(5):
+        monitor.update(rng.normal(size=(1000, 2)))
+    assert monitor.counts.shape == (2, 10)
+    assert monitor.counts.sum() == 10000
+
+
+def test_reference_for_other_features_is_rejected():
+    reference = build_reference(train)
+    assert create_monitor(reference, ["x", "y"], ["x", "y"], "test") is None
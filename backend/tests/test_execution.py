@@ -0,0 +1,40 @@
+from pathlib import Path
+import json
+import sys
+
+import numpy as np
+from xgboost import XGBRegressor
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from execution import ExecutionPolicy, limit_threads
+
+
+rng = np.random.default_rng(0)
+X = rng.normal(size=(1000, 4)).astype(np.float32)
+model = XGBRegressor(n_estimators=20, max_depth=3).fit(X, X[:, 0] * 2 + X[:, 1])
+
+
+def test_chunked_batches_match_single_call():
+    policy = ExecutionPolicy(cores=4, min_chunk_rows=100)
+    assert policy.parallelism(1) == 1
+    assert policy.parallelism(1000) == 4
+    np.testing.assert_array_equal(policy.map_rows(model.predict, X), model.predict(X))
+    assert policy.parallel_calls == 1
+
+
+def test_concurrent_requests_share_the_core_budget():
+    policy = ExecutionPolicy(cores=4, min_chunk_rows=100)
+    with policy.request(), policy.request():
+        assert policy.parallelism(1000) == 2
+        with policy.request(), policy.request(), policy.request():
+            assert policy.parallelism(1000) == 1
+    assert policy.active == 0
+
+
+def test_limit_threads_pins_booster():
+    limit_threads(model)
+    config = json.loads(model.get_booster().save_config())
+    assert config["learner"]["generic_param"]["nthread"] == "1"
@@ -0,0 +1,57 @@
+from pathlib import Path
+import json
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import shap
+from xgboost import XGBRegressor
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+import gbm_backends
+from utils.explain_dataset import explain_dataset
+
+
+def test_chunked_parallel_values_match_single_call(tmp_path):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(1050, 3)), columns=["Lever position ", "Ship speed (v) ", "c"])
+    frame["target"] = frame["c"] * 2
+    features = frame.drop(columns="target").set_axis(["Lever_position", "Ship_speed_v", "c"], axis=1)
+    model = XGBRegressor(n_estimators=10, max_depth=3).fit(features, frame["target"])
+    explainer = shap.TreeExplainer(model)
+    joblib.dump(model, tmp_path / "model.pkl")
+    joblib.dump(explainer, tmp_path / "explainer.pkl")
+    frame.to_csv(tmp_path / "data.csv", index=False)
+
+    metadata = explain_dataset(tmp_path / "model.pkl", tmp_path / "explainer.pkl", tmp_path / "data.csv", tmp_path / "out.npy",
+                               chunk_size=100, workers=2)
+
+    values = np.load(tmp_path / "out.npy", mmap_mode="r")
+    assert values.shape == (1050, 3)
+    np.testing.assert_allclose(values, explainer(features.to_numpy(dtype=np.float32)).values, rtol=1e-5, atol=1e-6)
+    assert metadata["feature_names"] == ["Lever_position", "Ship_speed_v", "c"]
+    assert json.loads((tmp_path / "out.json").read_text())["rows"] == 1050
+
+
+def test_per_target_explainers_of_other_backends(tmp_path):
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame(rng.normal(size=(230, 3)), columns=["a", "b", "c"])
+    targets = pd.DataFrame({"first": features["a"] * 2, "second": features["b"] - features["c"]})
+    model = gbm_backends.get("sklearn").fit(features, targets, "regressor", random_state=0)
+    explainer = gbm_backends.explainer(model)
+    joblib.dump(model, tmp_path / "model.pkl")
+    joblib.dump(explainer, tmp_path / "explainer.pkl")
+    features.to_csv(tmp_path / "data.csv", index=False)
+
+    metadata = explain_dataset(tmp_path / "model.pkl", tmp_path / "explainer.pkl", tmp_path / "data.csv",
+                               tmp_path / "out.npy", chunk_size=50, workers=2)
+
+    values = np.load(tmp_path / "out.npy", mmap_mode="r")
+    expected = explainer(features.to_numpy(dtype=np.float32))
+    np.testing.assert_allclose(values, expected.values, rtol=1e-5, atol=1e-6)
+    assert metadata["feature_names"] == ["a", "b", "c"]
+    np.testing.assert_allclose(metadata["base_values"], expected.base_values[0], rtol=1e-6)
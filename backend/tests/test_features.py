@@ -0,0 +1,34 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+from pydantic import ValidationError
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from features import FeatureSchema
+
+
+def test_extractor_follows_trained_order():
+    schema = FeatureSchema("Request", ["speed_v", "torque_kN"], {"torque_kN": "torque", "speed_v": "speed"})
+    request = schema.request_model(torque=2.0, speed=1.0)
+
+    row = schema.extract(request)
+    assert schema.field_names == ["speed", "torque"]
+    assert row.dtype == np.float32 and row.flags.c_contiguous
+    assert row.tolist() == [[1.0, 2.0]]
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_non_finite_fields_are_rejected(value):
+    schema = FeatureSchema("Request", ["speed", "torque"])
+    with pytest.raises(ValidationError, match="finite number"):
+        schema.request_model(speed=value, torque=1.0)
+
+
+def test_unmatched_model_feature_fails_at_load():
+    with pytest.raises(RuntimeError):
+        FeatureSchema("Request", ["speed_v", "fuel_kg/s"], {"speed_v": "speed"})
@@ -0,0 +1,78 @@
+from pathlib import Path
+import sys
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+import gbm_backends
+from main import score
+from model_store import ModelSpec, ModelStore
+
+
+def toy_data(rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(rows, 4)), columns=["a", "b", "c", "d"])
+    labels = pd.Series((X["a"] > 0).astype(int) + (X["b"] > 1).astype(int))
+    targets = pd.DataFrame({"first": X["a"] * 2 + X["c"], "second": X["b"] - X["d"] ** 2})
+    return X, labels, targets
+
+
+@pytest.mark.parametrize("backend", gbm_backends.available())
+def test_backends_train_and_explain_both_tasks(backend):
+    X, labels, targets = toy_data()
+    rows = X.to_numpy(dtype=np.float32)[:5]
+
+    classifier = gbm_backends.get(backend).fit(X, labels, "classifier", random_state=0)
+    assert gbm_backends.feature_names(classifier) == ["a", "b", "c", "d"]
+    assert (classifier.predict(X) == labels).mean() > 0.9
+    assert gbm_backends.explainer(classifier)(rows).values.shape == (5, 4, 3)
+
+    regressor = gbm_backends.get(backend).fit(X, targets, "regressor", random_state=0)
+    assert gbm_backends.feature_names(regressor) == ["a", "b", "c", "d"]
+    assert gbm_backends.num_targets(regressor) == 2
+    explanation = gbm_backends.explainer(regressor)(rows)
+    assert explanation.values.shape == (5, 4, 2)
+    # SHAP values add up to the prediction of each target
+    np.testing.assert_allclose(explanation.values.sum(axis=1) + explanation.base_values, regressor.predict(rows),
+                               rtol=1e-4, atol=1e-4)
+
+
+def test_unknown_backend_lists_the_available_ones():
+    with pytest.raises(ValueError, match="xgboost"):
+        gbm_backends.get("ranger")
+
+
+def test_non_xgboost_models_are_served(tmp_path):
+    X, _, targets = toy_data()
+    model = gbm_backends.get("sklearn").fit(X, targets, "regressor", random_state=0)
+    joblib.dump(model, tmp_path / "sk.pkl")
+    joblib.dump(gbm_backends.explainer(model), tmp_path / "sk_shap.pkl")
+    spec = ModelSpec("sk", "regressor", tmp_path / "sk.pkl", tmp_path / "sk_shap.pkl", backend="compiled")
+
+    entry = ModelStore({"sk": spec}).get("sk")
+    assert entry.backend == "native"
+    assert entry.schema.field_names == ["a", "b", "c", "d"]
+    assert entry.labels == ["target_0", "target_1"]
+
+    # Served float32 rows land on the same side of every split as the training rows
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        result = score(entry, X.to_numpy(dtype=np.float32), track_drift=False)
+    assert not [warning for warning in caught if "valid feature names" in str(warning.message)]
+    np.testing.assert_array_equal(result["predictions"], model.predict(X.astype(np.float32)))
+    assert result["feature_importance"].shape == (len(X), 2, 4)
+
+
+def test_feature_name_warning_is_only_silenced_for_served_calls():
+    X, labels, _ = toy_data()
+    model = gbm_backends.get("sklearn").fit(X, labels, "classifier", random_state=0)
+    gbm_backends.serving_predictor(model).predict(X.to_numpy(dtype=np.float32))
+    assert not [entry for entry in warnings.filters
+                if entry[1] is not None and "valid feature names" in entry[1].pattern]
@@ -0,0 +1,39 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from ingest import MEDIA_FLOAT32, decode_batch
+
+
+COLUMNS = ["a", "b", "c"]
+
+
+def test_float32_buffer_is_viewed_without_copy():
+    body = np.arange(6, dtype=np.float32).tobytes()
+    features = decode_batch(body, MEDIA_FLOAT32, "a,b,c", "float32", COLUMNS)
+    assert features.shape == (2, 3)
+    assert not features.flags.owndata
+
+
+@pytest.mark.parametrize("names, body", [
+    ("b,a,c", np.zeros(3, dtype=np.float32).tobytes()),
+    ("a,b,c", np.zeros(4, dtype=np.float32).tobytes()),
+    ("a,b,c", np.array([0, np.inf, 0], dtype=np.float32).tobytes()),
+])
+def test_float32_buffer_rejects_bad_batches(names, body):
+    with pytest.raises(HTTPException) as exc:
+        decode_batch(body, MEDIA_FLOAT32, names, None, COLUMNS)
+    assert exc.value.status_code == 400
+
+
+def test_unknown_content_type_is_unsupported():
+    with pytest.raises(HTTPException) as exc:
+        decode_batch(b"", "text/csv", None, None, COLUMNS)
+    assert exc.value.status_code == 415
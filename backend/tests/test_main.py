@@ -2,17 +2,29 @@ from pathlib import Path
 import sys
 
 from fastapi.testclient import TestClient
+import numpy as np
+import pytest
 
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
+import main
 from main import app
+from prediction_log import PredictionLog
 
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def prediction_log(tmp_path, monkeypatch):
+    """Scored requests are logged under tmp_path, never into backend/logs."""
+    if main.prediction_log is not None:
+        monkeypatch.setattr(main, "prediction_log", PredictionLog(tmp_path / "predictions"))
+    return main.prediction_log
+
+
 def test_read_root():
     response = client.get("/")
     assert response.status_code == 200
@@ -32,17 +44,17 @@ def test_health_returns_status():
 
 def test_engine_prediction_unavailable_without_models():
     payload = {
-        "Lever_position": 0.5,
-        "Ship_speed": 10,
-        "Gas_Turbine_shaft_torque": 100,
-        "Gas_Turbine_rate_of_revolutions": 100,
-        "Gas_Generator_rate_of_revolutions": 100,
-        "Starboard_Propeller_Torque": 100,
-        "Port_Propeller_Torque": 100,
-        "HP_Turbine_exit_temperature": 100,
-        "GT_Compressor_inlet_air_temperature": 100,
-        "GT_Compressor_outlet_air_temperature": 100,
-        "HP_Turbine_exit_pressure": 100,
+        "Vibration_Amplitude": 5.0,
+        "RMS_Vibration": 2.5,
+        "Vibration_Frequency": 1000,
+        "Surface_Temperature": 90,
+        "Exhaust_Temperature": 400,
+        "Acoustic_dB": 90,
+        "Acoustic_Frequency": 2500,
+        "Intake_Pressure": 105,
+        "Exhaust_Pressure": 95,
+        "Frequency_Band_Energy": 0.5,
+        "Amplitude_Mean": 0.25,
     }
     response = client.post("/predict/engine", json=payload)
     assert response.status_code in {200, 503}
@@ -71,3 +83,128 @@ def test_naval_prediction_unavailable_without_models():
     }
     response = client.post("/predict/naval", json=payload)
     assert response.status_code in {200, 503}
+
+
+def test_naval_batch_accepts_float32_buffer():
+    from main import NAVAL_FEATURES
+    import numpy as np
+
+    body = np.ones((3, len(NAVAL_FEATURES)), dtype=np.float32).tobytes()
+    headers = {
+        "Content-Type": "application/octet-stream",
+        "X-Feature-Names": ",".join(NAVAL_FEATURES),
+    }
+    response = client.post("/predict/naval/batch?explain=false", content=body, headers=headers)
+    assert response.status_code in {200, 503}
+    # Batches are admitted apart from single-row requests
+    assert "naval/bulk" in client.get("/health").json()["admission"]
+    if response.status_code == 200:
+        assert len(response.json()["predictions"]) == 3
+
+
+def test_telemetry_stream_reports_missing_sensors_or_models():
+    with client.websocket_connect("/ws/telemetry") as websocket:
+        websocket.send_json({"vessel_id": "v1", "model": "naval", "readings": {"Lever_position": 1.0}})
+        reply = websocket.receive_json()
+        assert reply["type"] in {"pending", "error"}
+
+
+def test_malformed_telemetry_frames_keep_the_socket_open():
+    with client.websocket_connect("/ws/telemetry") as websocket:
+        for frame in ("not json", "[1, 2]"):
+            websocket.send_text(frame)
+            assert websocket.receive_json()["type"] == "error"
+        websocket.send_json({"vessel_id": "v1", "model": "ghost", "readings": {}})
+        assert websocket.receive_json()["type"] == "error"
+
+
+def test_models_listing_and_unknown_model():
+    response = client.get("/models")
+    assert response.status_code == 200
+    assert {"engine", "naval"} <= set(response.json()["available"])
+    assert set(response.json()["models"]["naval"]) >= {"model_loaded", "load_errors"}
+
+    response = client.post("/predict/unknown_model", json={})
+    assert response.status_code == 404
+
+
+def test_whatif_sweep_returns_surface_or_unavailable():
+    from main import NAVAL_FEATURES
+
+    body = {
+        "base": {name: 1.0 for name in NAVAL_FEATURES},
+        "grid": [{"feature": "Fuel_flow_lg_s", "start": 0.1, "stop": 1.8, "steps": 20}],
+    }
+    response = client.post("/whatif/naval", json=body)
+    assert response.status_code in {200, 503}
+    if response.status_code == 200:
+        assert response.json()["shape"] == [20]
+        assert len(response.json()["predictions"]) == 20
+
+
+def test_non_finite_features_are_rejected():
+    from main import ENGINE_FEATURES
+
+    body = ", ".join(f'"{name}": {"NaN" if i == 0 else 1.0}' for i, name in enumerate(ENGINE_FEATURES))
+    response = client.post("/predict/engine", content="{" + body + "}",
+                           headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["input"] == "nan"
+
+
+def test_prediction_history_is_logged_by_vessel(prediction_log, tmp_path):
+    from main import ENGINE_FEATURES
+
+    payload = {name: 1.0 for name in ENGINE_FEATURES}
+    response = client.post("/predict/engine", json=payload, headers={"X-Vessel-Id": "test-vessel-7"})
+    assert response.status_code in {200, 503}
+    assert client.get("/predictions/unknown").status_code == 404
+    if response.status_code == 200 and prediction_log is not None:
+        prediction_log.flush()
+        assert prediction_log.segments("engine")[0].is_relative_to(tmp_path)
+        history = client.get("/predictions/engine", params={"vessel_id": "test-vessel-7", "limit": 1}).json()
+        assert history["rows"] == 1
+        assert history["vessel"] == ["test-vessel-7"]
+        assert history["feature_names"] == ENGINE_FEATURES
+        assert history["prediction"][0] == response.json()["prediction"]
+        entry = main.model_store.get("engine")
+        if entry.cascade is not None:
+            assert history["version"] == [f"{entry.version}+{entry.cascade_version}"]
+            assert history["escalated"] in ([0], [1])
+
+
+def test_whatif_surfaces_come_from_the_full_model():
+    from main import ENGINE_FEATURES
+
+    entry = main.model_store.get("engine")
+    if entry is None or entry.cascade is None:
+        pytest.skip("engine cascade not loaded")
+    points = np.linspace(0.0, 5.0, 25)
+    body = {"base": {name: 1.0 for name in ENGINE_FEATURES},
+            "grid": [{"feature": ENGINE_FEATURES[0], "values": points.tolist()}]}
+    response = client.post("/whatif/engine", json=body)
+    assert response.status_code == 200
+
+    rows = np.ones((len(points), len(ENGINE_FEATURES)), dtype=np.float32)
+    rows[:, 0] = points
+    np.testing.assert_allclose(response.json()["probabilities"], entry.predictor.predict_proba(rows), rtol=1e-6)
+
+
+def test_whatif_is_admitted_with_the_body_explain_flag():
+    from main import NAVAL_FEATURES
+
+    body = {
+        "base": {name: 1.0 for name in NAVAL_FEATURES},
+        "grid": [{"feature": "Fuel_flow_lg_s", "start": 0.1, "stop": 1.8, "steps": 5}],
+        "explain": False,
+    }
+    client.post("/whatif/naval", json=body)
+    before = main.admission_for("naval", bulk=True).stats()["service_time_s"]
+    response = client.post("/whatif/naval", json=body)
+    after = main.admission_for("naval", bulk=True).stats()["service_time_s"]
+
+    assert response.status_code in {200, 503}
+    assert "X-Explanation" not in response.headers
+    # Timed as a prediction-only request, not as an explanation
+    assert after["explain"] == before["explain"]
+    assert after["predict"] != before["predict"]
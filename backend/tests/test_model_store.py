@@ -0,0 +1,142 @@
+from pathlib import Path
+import json
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBClassifier, XGBRegressor
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from features import NAVAL_FIELD_ALIASES
+import model_store
+from model_store import ModelSpec, ModelStore, load_registry, registry_entry
+
+
+def save_model(tmp_path, name):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 3)), columns=["a", "b", "c"])
+    y = (X["a"] > 0).astype(int)
+    model = XGBClassifier(n_estimators=20, max_depth=3).fit(X, y)
+    joblib.dump(model, tmp_path / f"{name}.pkl")
+    return ModelSpec(name, "classifier", tmp_path / f"{name}.pkl", labels=["Normal", "Fault"])
+
+
+def test_models_load_lazily_and_expose_schema(tmp_path):
+    store = ModelStore({"alpha": save_model(tmp_path, "alpha")})
+    assert store.stats()["resident"] == {}
+
+    entry = store.get("alpha")
+    assert entry.schema.field_names == ["a", "b", "c"]
+    assert entry.output_keys == ["normal", "fault"]
+    assert store.get("alpha") is entry
+    assert store.loads == 1
+
+
+def test_least_recently_used_model_is_evicted_over_budget(tmp_path):
+    specs = {name: save_model(tmp_path, name) for name in ("alpha", "beta", "gamma")}
+    store = ModelStore(specs, memory_budget=1)
+
+    store.get("alpha")
+    store.get("beta")
+    assert list(store.stats()["resident"]) == ["beta"]
+
+    # A budget fitting two models keeps the two most recently used
+    store.memory_budget = sum(entry.nbytes for entry in store._resident.values()) * 2 + 1
+    store.get("alpha")
+    store.get("beta")
+    store.get("gamma")
+    assert list(store.stats()["resident"]) == ["beta", "gamma"]
+    assert store.evictions >= 2
+
+
+def test_missing_artifacts_and_unknown_models(tmp_path):
+    store = ModelStore({"ghost": ModelSpec("ghost", "regressor", tmp_path / "ghost.pkl")})
+    assert store.get("ghost") is None
+    assert store.status("ghost")["model_loaded"] is False
+    with pytest.raises(KeyError):
+        store.get("unknown")
+
+
+def test_registry_entries_resolve_paths(tmp_path):
+    (tmp_path / "registry.json").write_text(
+        '[{"name": "lm2500", "task": "regressor", "model": "lm2500.pkl", "explainer": "lm2500_shap.pkl"}]'
+    )
+    specs = load_registry(tmp_path / "registry.json", tmp_path / "models", tmp_path / "explainers")
+    assert specs["lm2500"].model_path == tmp_path / "models" / "lm2500.pkl"
+    assert specs["lm2500"].explainer_path == tmp_path / "explainers" / "lm2500_shap.pkl"
+    assert specs["lm2500"].reference_path is None
+
+
+def test_status_reports_loads_not_files(tmp_path):
+    spec = save_model(tmp_path, "alpha")
+    spec.explainer_path = tmp_path / "alpha_shap.pkl"
+    spec.explainer_path.write_bytes(b"not a pickle")
+    store = ModelStore({"alpha": spec, "broken": ModelSpec("broken", "classifier", spec.explainer_path)})
+    assert store.status("alpha")["model_loaded"] is False
+
+    store.get("alpha")
+    status = store.status("alpha")
+    assert status["model_loaded"] is True and status["explainer_loaded"] is False
+    assert "alpha explainer" in status["load_errors"][0]
+
+    # A corrupt model file exists but never loads
+    assert store.get("broken") is None
+    status = store.status("broken")
+    assert status["model_loaded"] is False
+    assert "Failed to load broken model" in status["load_errors"][0]
+
+
+def test_schema_mismatch_fails_strict_loads_and_is_not_retried(tmp_path, monkeypatch):
+    spec = save_model(tmp_path, "alpha")
+    spec.declared_features = ["a", "b", "z"]
+    store = ModelStore({"alpha": spec})
+    with pytest.raises(RuntimeError, match="do not match the declared request schema"):
+        store.get("alpha", strict=True)
+
+    loads = []
+    real_load = model_store.load_artifact
+    monkeypatch.setattr(model_store, "load_artifact", lambda *args: loads.append(args) or real_load(*args))
+    assert store.get("alpha") is None
+    assert store.get("alpha") is None
+    assert len(loads) == 0
+    status = store.status("alpha")
+    assert status["model_loaded"] is False
+    assert "do not match the declared request schema" in status["load_errors"][0]
+
+    # Replacing the artifact retries the load
+    stat = spec.model_path.stat()
+    os.utime(spec.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert store.get("alpha") is None
+    assert len(loads) == 1
+
+
+def test_registry_entry_aliases_only_the_kept_features(tmp_path):
+    # A reduced naval model keeps a few of the CSV columns, some of them not identifiers
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 3)), columns=["Lever_position", "Fuel_flow_mf_kg/s",
+                                                          "Turbine_Injecton_Control_TIC_%"])
+    model = XGBRegressor(n_estimators=5).fit(X, pd.DataFrame({"c": X.iloc[:, 0], "t": X.iloc[:, 1]}))
+    joblib.dump(model, tmp_path / "naval_model_compact.pkl")
+    entry = registry_entry("naval_compact", "regressor", model, "naval_model_compact.pkl",
+                           field_aliases=NAVAL_FIELD_ALIASES, labels=["compressor_decay", "turbine_decay"])
+    (tmp_path / "registry.json").write_text(json.dumps([entry]))
+
+    store = ModelStore(load_registry(tmp_path / "registry.json", tmp_path, tmp_path))
+    served = store.get("naval_compact")
+    assert served.schema.field_names == ["Lever_position", "Fuel_flow_lg_s", "Turbine_Injecton_Control"]
+    assert served.labels == ["compressor_decay", "turbine_decay"]
+
+
+def test_unaliased_csv_features_point_at_field_aliases(tmp_path):
+    X = pd.DataFrame(np.random.default_rng(0).normal(size=(100, 2)), columns=["Lever_position", "Fuel_flow_mf_kg/s"])
+    joblib.dump(XGBRegressor(n_estimators=5).fit(X, X.iloc[:, 0]), tmp_path / "raw.pkl")
+    store = ModelStore({"raw": ModelSpec("raw", "regressor", tmp_path / "raw.pkl")})
+    assert store.get("raw") is None
+    errors = store.stats()["models"]["raw"]["load_errors"]
+    assert "Fuel_flow_mf_kg/s" in errors[0] and "field_aliases" in errors[0]
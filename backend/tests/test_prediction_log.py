@@ -0,0 +1,95 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from prediction_log import PredictionLog, read_meta
+
+FEATURES = ["a", "b", "c"]
+
+
+def record(log, value, vessel=None, rows=1, version="v1", model="engine"):
+    features = np.full((rows, 3), value, dtype=np.float32)
+    outputs = {"prediction": np.full(rows, int(value) % 3), "probabilities": np.full((rows, 3), 1 / 3)}
+    log.record(model, version, features, outputs, 0.002, vessel, FEATURES, ["x", "y", "z"])
+
+
+def test_rows_round_trip_with_vessel_and_version(tmp_path):
+    log = PredictionLog(tmp_path, flush_interval=60)
+    record(log, 1, "V1")
+    record(log, 2, "V2", rows=3, version="v2")
+    record(log, 3)
+    log.flush()
+
+    history = log.query("engine")
+    assert history["rows"] == 5
+    assert history["vessel"] == ["V1", "V2", "V2", "V2", None]
+    assert history["version"] == ["v1", "v2", "v2", "v2", "v1"]
+    assert history["features"][:, 0].tolist() == [1, 2, 2, 2, 3]
+    assert history["probabilities"].shape == (5, 3)
+    assert history["latency_us"][0] == np.float32(2000)
+    assert history["feature_names"] == FEATURES
+
+    only_v2 = log.query("engine", vessel_id="V2")
+    assert only_v2["rows"] == 3 and set(only_v2["vessel"]) == {"V2"}
+    assert log.query("engine", vessel_id="missing")["rows"] == 0
+    assert log.query("naval")["rows"] == 0
+
+
+def test_segments_rotate_and_index_skips_them(tmp_path):
+    log = PredictionLog(tmp_path, segment_rows=4, flush_interval=60)
+    for value in range(10):
+        record(log, value, f"V{value // 4}")
+        log.flush()
+    segments = log.segments("engine")
+    assert len(segments) == 3
+    metas = [read_meta(path) for path in segments]
+    assert [meta["rows"] for meta in metas] == [4, 4, 2]
+    assert [meta["sealed"] for meta in metas] == [True, True, False]
+    assert list(metas[1]["vessels"]) == ["V1"]
+
+    # Time range and limit
+    middle = metas[1]
+    window = log.query("engine", start=middle["start"], end=middle["end"])
+    assert window["features"][:, 0].tolist() == [4, 5, 6, 7]
+    assert log.query("engine", limit=3)["features"][:, 0].tolist() == [7, 8, 9]
+    assert log.query("engine", vessel_id="V2")["features"][:, 0].tolist() == [8, 9]
+
+
+def test_retention_and_layout_changes(tmp_path):
+    log = PredictionLog(tmp_path, segment_rows=2, max_segments=1, flush_interval=60)
+    for value in range(6):
+        record(log, value)
+    log.flush()
+    # Only the newest sealed segment is kept next to the open one
+    assert log.query("engine")["features"][:, 0].tolist() == [2, 3, 4, 5]
+
+    # A model with a different number of features gets a fresh segment
+    log.record("engine", "v3", np.zeros((1, 5), dtype=np.float32), {"prediction": np.array([0])}, 0.001)
+    log.flush()
+    assert read_meta(log.segments("engine")[-1])["columns"]["features"]["shape"] == [5]
+
+
+def test_background_writer_drains_the_queue(tmp_path):
+    import time
+
+    log = PredictionLog(tmp_path, flush_interval=0.01)
+    record(log, 1, "V1", rows=2)
+    deadline = time.monotonic() + 5
+    while log.stats()["written"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert log.stats()["written"] == 2
+    assert log.query("engine", vessel_id="V1")["rows"] == 2
+
+
+def test_full_queue_drops_rows(tmp_path):
+    log = PredictionLog(tmp_path, flush_interval=60, max_pending=1)
+    record(log, 1)
+    record(log, 2, rows=4)
+    assert log.stats()["dropped"] == 4
+    log.flush()
+    assert log.query("engine")["rows"] == 1
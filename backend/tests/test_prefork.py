@@ -0,0 +1,35 @@
+from pathlib import Path
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from drift import DriftMonitor, build_reference
+from prefork import memory_report, memory_usage
+
+pytestmark = pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs /proc")
+
+
+def test_single_process_report_counts_itself():
+    usage = memory_usage(os.getpid())
+    assert usage["rss"] >= usage["uss"] > 0
+
+    report = memory_report()
+    assert [worker["pid"] for worker in report["workers"]] == [os.getpid()]
+    assert report["parent"] is None
+
+
+def test_drift_worker_restarts_in_forked_child():
+    reference = build_reference(pd.DataFrame({"a": np.arange(100.0)}))
+    monitor = DriftMonitor(reference, ["a"])
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if monitor._worker.is_alive() else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
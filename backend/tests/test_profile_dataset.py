@@ -0,0 +1,99 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from utils.profile_dataset import QuantileSketch, profile_csv, render_html
+
+
+@pytest.fixture
+def export(tmp_path):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        "vibration": rng.gamma(2.0, 3.0, size=3000),
+        "temperature": 300 + rng.normal(size=3000) * 5,
+        "pressure": rng.normal(size=3000),
+        "constant": np.full(3000, 0.98),
+        "status": rng.choice(["ok", "warn"], size=3000),
+    })
+    frame["pressure"] += frame["vibration"] * 0.3
+    frame.loc[rng.random(3000) < 0.1, "temperature"] = np.nan
+    frame.loc[rng.random(3000) < 0.2, "pressure"] = np.nan
+    frame["vibration"] = frame["vibration"].astype(object)
+    frame.loc[5, "vibration"] = "sensor fault"
+    path = tmp_path / "export.csv"
+    frame.to_csv(path, index=False)
+    return path
+
+
+def test_single_pass_statistics_match_pandas(export):
+    report = profile_csv(export, chunk_size=256)
+    frame = pd.read_csv(export)
+    frame["vibration"] = pd.to_numeric(frame["vibration"], errors="coerce")
+    numeric = frame.drop(columns="status")
+
+    assert report["rows"] == 3000 and report["chunks"] == 12
+    vibration = report["columns"]["vibration"]
+    assert vibration["missing"] == 0 and vibration["non_numeric"] == 1 and vibration["count"] == 3000
+    assert report["columns"]["status"]["type"] == "text"
+    assert report["columns"]["temperature"]["missing"] == frame["temperature"].isna().sum()
+
+    for name in ["vibration", "temperature", "pressure"]:
+        column = report["columns"][name]
+        assert column["mean"] == pytest.approx(numeric[name].mean(), rel=1e-9)
+        assert column["std"] == pytest.approx(numeric[name].std(), rel=1e-9)
+        assert column["skewness"] == pytest.approx(numeric[name].skew(), rel=1e-6, abs=1e-9)
+        assert column["kurtosis"] == pytest.approx(numeric[name].kurt(), rel=1e-6, abs=1e-9)
+        assert column["min"] == numeric[name].min() and column["max"] == numeric[name].max()
+        assert sum(column["histogram"]["counts"]) == numeric[name].notna().sum()
+    assert report["columns"]["constant"]["std"] == 0.0
+
+    expected = numeric.corr()
+    assert report["correlation"]["columns"] == list(numeric.columns)
+    matrix = np.array([[np.nan if v is None else v for v in row] for row in report["correlation"]["matrix"]])
+    np.testing.assert_allclose(matrix, expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def test_chunk_size_does_not_change_the_moments(export):
+    whole = profile_csv(export, chunk_size=10000)
+    chunked = profile_csv(export, chunk_size=7)
+    for name in ["vibration", "temperature", "pressure"]:
+        for key in ["mean", "std", "skewness", "kurtosis"]:
+            assert chunked["columns"][name][key] == pytest.approx(whole["columns"][name][key], rel=1e-9)
+
+
+def test_quantile_sketch_is_bounded_and_accurate():
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(size=200000)
+    sketch = QuantileSketch(k=128)
+    for chunk in np.array_split(values, 97):
+        sketch.update(chunk)
+    assert sketch.n == len(values)
+    assert sketch.size < 3 * 128 + 64
+    assert sketch.weighted()[1].sum() == len(values)
+
+    ordered = np.sort(values)
+    qs = [0.01, 0.25, 0.5, 0.75, 0.99]
+    ranks = np.searchsorted(ordered, sketch.quantiles(qs)) / len(values)
+    assert np.max(np.abs(ranks - qs)) < 0.02
+
+    # Merging sketches of two halves answers like one sketch of everything
+    left, right = QuantileSketch(k=128), QuantileSketch(k=128, seed=1)
+    left.update(values[:100000])
+    right.update(values[100000:])
+    left.merge(right)
+    merged_ranks = np.searchsorted(ordered, left.quantiles(qs)) / len(values)
+    assert np.max(np.abs(merged_ranks - qs)) < 0.02
+
+
+def test_html_report_renders(export):
+    report = profile_csv(export, chunk_size=1000)
+    page = render_html(report)
+    assert page.startswith("<!DOCTYPE html>")
+    assert "vibration" in page and "<svg" in page and "Correlation" in page
@@ -0,0 +1,41 @@
+from pathlib import Path
+import json
+import sys
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from run_report import RunReport, compare, history
+
+
+def test_stages_are_recorded_and_saved(tmp_path):
+    run = RunReport("engine")
+    with run.stage("load"):
+        sum(range(10000))
+    with run.stage("fit"):
+        buffer = bytearray(8 * 1024 * 1024)
+    del buffer
+    run.metrics["accuracy"] = 0.5
+
+    path = run.save(tmp_path)
+    report = json.loads(path.read_text())
+    assert [stage["stage"] for stage in report["stages"]] == ["load", "fit"]
+    assert all(stage["wall_s"] >= 0 and stage["peak_rss_bytes"] > 0 for stage in report["stages"])
+    assert report["metrics"] == {"accuracy": 0.5}
+    assert len(history(tmp_path, "engine")) == 1
+
+
+def stage(name, wall, peak=100 * 2 ** 20):
+    return {"stage": name, "wall_s": wall, "cpu_s": wall, "peak_rss_bytes": peak}
+
+
+def test_compare_flags_only_material_regressions():
+    baseline = {"stages": [stage("load", 0.01), stage("fit", 2.0), stage("dump", 1.0)]}
+    current = {"stages": [stage("load", 0.05), stage("fit", 3.0), stage("dump", 1.0, peak=400 * 2 ** 20),
+                          stage("cascade", 0.3)]}
+    rows = {row["stage"]: row["regressions"] for row in compare(baseline, current)}
+    assert rows["load"] == []  # 5x but below the absolute floor
+    assert rows["fit"] == ["wall_s", "cpu_s"]
+    assert rows["dump"] == ["peak_rss_bytes"]
+    assert rows["cascade"] == []
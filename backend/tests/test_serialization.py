@@ -0,0 +1,34 @@
+from pathlib import Path
+import json
+import sys
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from serialization import MEDIA_COLUMNAR, MEDIA_JSON, encode_json, negotiate
+
+
+def test_negotiate_defaults_to_json():
+    assert negotiate(None) == MEDIA_JSON
+    assert negotiate("*/*") == MEDIA_JSON
+
+
+def test_negotiate_respects_quality_values():
+    accept = f"application/json;q=0.5, {MEDIA_COLUMNAR}"
+    assert negotiate(accept) == MEDIA_COLUMNAR
+
+
+def test_negotiate_rejects_unsupported_media():
+    with pytest.raises(HTTPException) as exc:
+        negotiate("text/html")
+    assert exc.value.status_code == 406
+
+
+def test_encode_json_handles_numpy_arrays():
+    payload = {"values": np.arange(3, dtype=np.float32), "label": np.int32(2)}
+    assert json.loads(encode_json(payload)) == {"values": [0.0, 1.0, 2.0], "label": 2}
@@ -0,0 +1,115 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from run_report import RunReport, compare
+from stage_cache import StageCache
+
+calls = []
+
+
+def load(path):
+    calls.append("load")
+    return np.loadtxt(path)
+
+
+def double(values, factor=2):
+    calls.append("double")
+    return values * factor
+
+
+def total(values):
+    calls.append("total")
+    return values.sum()
+
+
+def pipeline(cache, path, factor=2, report=None):
+    values = cache.run("load", load, path, report=report)
+    doubled = cache.run("double", double, values, params={"factor": factor}, report=report)
+    return cache.run("total", total, doubled, report=report)
+
+
+def test_unchanged_stages_are_reused(tmp_path):
+    data = tmp_path / "data.txt"
+    data.write_text("1\n2\n3\n")
+    cache = StageCache(tmp_path / "cache")
+    calls.clear()
+
+    first = pipeline(cache, data)
+    assert first.value == 12 and not first.cached
+    assert calls == ["load", "double", "total"]
+
+    calls.clear()
+    again = pipeline(StageCache(tmp_path / "cache"), data)
+    assert again.value == 12 and again.cached and again.key == first.key
+    assert calls == []
+
+    # A parameter change recomputes that stage and everything downstream of it
+    calls.clear()
+    assert pipeline(cache, data, factor=3).value == 18
+    assert calls == ["double", "total"]
+
+    # So does a change to an input file
+    calls.clear()
+    data.write_text("1\n2\n4\n")
+    assert pipeline(cache, data).value == 14
+    assert calls == ["load", "double", "total"]
+
+
+def test_stage_source_is_part_of_the_key(tmp_path):
+    cache = StageCache(tmp_path)
+    values = np.arange(3)
+
+    def scaled(values):
+        return values * 2
+
+    original = cache.key("scale", scaled, [values])
+
+    def scaled(values):  # noqa: F811 - same name, edited body
+        return values * 4
+
+    assert cache.key("scale", scaled, [values]) != original
+    assert cache.key("scale", scaled, [values], params={"a": 1}) != cache.key("scale", scaled, [values])
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = StageCache(tmp_path, max_bytes=2500)
+    for seed in range(3):
+        cache.run("block", np.ones, 1000 - seed)  # ~8 KB each, over budget
+    entries = cache.entries()
+    assert len(entries) == 1
+    assert cache.stats()["bytes"] <= entries[0][1].st_size
+
+
+def test_disabled_cache_always_runs(tmp_path):
+    cache = StageCache(None)
+    calls.clear()
+    data = tmp_path / "data.txt"
+    data.write_text("1\n")
+    pipeline(cache, data)
+    pipeline(cache, data)
+    assert calls == ["load", "double", "total"] * 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_run_report_marks_cached_stages(tmp_path):
+    data = tmp_path / "data.txt"
+    data.write_text("1\n2\n")
+    cache = StageCache(tmp_path / "cache")
+    first, second = RunReport("toy"), RunReport("toy")
+    pipeline(cache, data, report=first)
+    pipeline(cache, data, report=second)
+    assert [stage["cached"] for stage in first.stages] == [False, False, False]
+    assert [stage["cached"] for stage in second.stages] == [True, True, True]
+
+    # Recomputing after a cached run is not reported as a regression
+    baseline = second.to_dict()
+    current = first.to_dict()
+    for stage in current["stages"]:
+        stage["wall_s"] = stage["cpu_s"] = 10.0
+    assert all(not row["regressions"] for row in compare(baseline, current))
@@ -0,0 +1,50 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from streaming import RollingWindow, TelemetryHub
+
+
+def test_rolling_window_matches_full_recompute():
+    rng = np.random.default_rng(0)
+    rows = rng.normal(size=(50, 3))
+    window = RollingWindow(3, size=8)
+    for row in rows:
+        window.push(row)
+
+    tail = rows[-8:]
+    assert window.count == 8
+    np.testing.assert_allclose(window.mean(), tail.mean(axis=0))
+    np.testing.assert_allclose(window.rms(), np.sqrt((tail ** 2).mean(axis=0)))
+
+
+def test_hub_merges_deltas_and_reports_condition_changes():
+    hub = TelemetryHub(["a", "b"], window_size=4)
+    assert hub.update("v1", {"a": 1.0}) is None
+    assert hub.missing("v1") == ["b"]
+
+    aggregates = hub.update("v1", {"b": 3.0})
+    aggregates = hub.update("v1", {"a": 3.0})
+    np.testing.assert_allclose(aggregates["latest"], [3.0, 3.0])
+    np.testing.assert_allclose(aggregates["mean"], [2.0, 3.0])
+
+    assert hub.swap_condition("v1", "Normal")
+    assert not hub.swap_condition("v1", "Normal")
+    assert hub.swap_condition("v1", "Minor Fault")
+
+
+def test_hub_rejects_unknown_sensors():
+    hub = TelemetryHub(["a"])
+    with pytest.raises(ValueError):
+        hub.update("v1", {"z": 1.0})
+
+
+def test_hub_rejects_empty_windows():
+    with pytest.raises(ValueError, match="at least one reading"):
+        TelemetryHub(["a"], window_size=0)
@@ -0,0 +1,64 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+import xgboost as xgb
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from model_store import select_backend
+from tree_compiler import CompiledForest, probe_rows, verify
+
+
+rng = np.random.default_rng(0)
+X = rng.normal(size=(400, 5)).astype(np.float32)
+X[rng.random(X.shape) < 0.05] = np.nan
+
+
+def test_compiled_classifier_matches_native():
+    y = (np.nan_to_num(X[:, 0]) > 0).astype(int) + (np.nan_to_num(X[:, 1]) > 1).astype(int)
+    model = xgb.XGBClassifier(objective="multi:softmax", num_class=3, n_estimators=20, max_depth=4)
+    model.fit(X, y)
+    compiled = CompiledForest.from_model(model)
+
+    assert verify(model, compiled, X)
+    assert verify(model, compiled, probe_rows(compiled))
+    assert np.array_equal(compiled.predict(X[:1]), model.predict(X[:1]))
+
+
+def test_compiled_multi_target_regressor_matches_native():
+    y = np.column_stack([np.nan_to_num(X[:, 2]) * 2, np.nan_to_num(X[:, 3]) - 1])
+    model = xgb.XGBRegressor(objective="reg:squarederror", n_estimators=20, max_depth=3)
+    model.fit(X, y)
+    compiled = CompiledForest.from_model(model)
+
+    assert compiled.predict(X).shape == (len(X), 2)
+    assert verify(model, compiled, X)
+
+
+def test_unused_trailing_features_keep_the_input_width():
+    y = (np.nan_to_num(X[:, 0]) > 0).astype(int) + (np.nan_to_num(X[:, 1]) > 1).astype(int)
+    model = xgb.XGBClassifier(objective="multi:softmax", num_class=3, n_estimators=10, max_depth=2)
+    model.fit(X, y)
+    compiled = CompiledForest.from_model(model)
+
+    assert compiled.feature.max() < X.shape[1] - 1
+    assert compiled.n_features == X.shape[1]
+    assert verify(model, compiled)
+
+
+@pytest.mark.parametrize("objective, y", [
+    ("multi:softprob", (np.nan_to_num(X[:, 0]) > 0).astype(int) + (np.nan_to_num(X[:, 1]) > 1).astype(int)),
+    ("binary:logistic", (np.nan_to_num(X[:, 0]) > 0).astype(int)),
+])
+def test_probability_objectives_are_served_natively(objective, y):
+    # XGBoost applies these transforms with the C library's expf, which NumPy does not reproduce exactly
+    model = xgb.XGBClassifier(objective=objective, n_estimators=10, max_depth=3).fit(X, y)
+    with pytest.raises(ValueError, match="Unsupported objective"):
+        CompiledForest.from_model(model)
+
+    predictor, backend = select_backend(model, "probe model", "compiled")
+    assert predictor is model and backend == "native"
@@ -0,0 +1,50 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from whatif import SurfaceCache, WhatIfRequest, build_grid, cache_key
+
+
+def test_grid_varies_swept_columns_over_base():
+    base = np.array([[1.0, 2.0, 3.0]], dtype=np.float32)
+    axes = [np.array([10, 20], dtype=np.float32), np.array([7, 8, 9], dtype=np.float32)]
+    X = build_grid(base, [2, 0], axes)
+    assert X.shape == (6, 3)
+    assert (X[:, 1] == 2.0).all()
+    assert X[:, 2].tolist() == [10, 10, 10, 20, 20, 20]
+    assert X[:, 0].tolist() == [7, 8, 9, 7, 8, 9]
+
+
+def test_request_limits_surface_size_and_duplicates():
+    grid = {"feature": "a", "start": 0, "stop": 1, "steps": 200}
+    with pytest.raises(ValidationError):
+        WhatIfRequest(base={}, grid=[grid, {**grid, "feature": "b"}])
+    with pytest.raises(ValidationError):
+        WhatIfRequest(base={}, grid=[grid, grid])
+    with pytest.raises(ValidationError):
+        WhatIfRequest(base={}, grid=[{"feature": "a"}])
+    with pytest.raises(ValidationError, match="finite number"):
+        WhatIfRequest(base={}, grid=[{"feature": "a", "values": [0.0, float("nan")]}])
+    assert len(WhatIfRequest(base={}, grid=[grid]).grid[0].points()) == 200
+
+
+def test_cache_is_keyed_by_base_vector_and_evicts_oldest():
+    axes = [np.linspace(0, 1, 5, dtype=np.float32)]
+    first = cache_key("m", np.zeros(3), [0], axes, False)
+    assert first == cache_key("m", np.zeros(3), [0], axes, False)
+    assert first != cache_key("m", np.ones(3), [0], axes, False)
+    assert first != cache_key("m", np.zeros(3), [0], axes, True)
+
+    cache = SurfaceCache(max_entries=1)
+    cache.put(first, {"v": 1})
+    assert cache.get(first) == {"v": 1}
+    cache.put("other", {"v": 2})
+    assert cache.get(first) is None
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
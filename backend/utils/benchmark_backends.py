@@ -0,0 +1,187 @@
+"""
+Train/serve benchmark of the gradient-boosting backends (gbm_backends).
+
+Each backend is trained on the bundled engine and naval datasets with the rows
+and parameters `utils/train_models.py` uses (the tuned XGBoost parameters, the
+other backends at the same boosting budget), and measured on the test split:
+
+- training wall and CPU time, and memory (peak RSS above the process's RSS
+  at the start of the fit; Linux measures per stage, elsewhere the process peak),
+- serialized model size,
+- batch-1 predict latency (median over single rows, as served) and batch
+  predict throughput on `--batch-rows` rows (10,000 by default),
+- explanation cost: building the explainer, batch-1 SHAP latency and SHAP
+  time per row over a 1,000-row batch,
+- accuracy (engine) or mean R² (naval).
+
+Every backend and dataset is measured in a fresh interpreter, one after
+another, so a fit cannot reuse memory an earlier fit freed. Kernels use all
+cores unless `--threads` pins them. Results are printed and written to
+`reports/backend_benchmark.json`.
+
+    python utils/benchmark_backends.py
+    python utils/benchmark_backends.py --backends xgboost,sklearn --datasets naval --threads 1
+"""
+from pathlib import Path
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+from sklearn.metrics import accuracy_score, r2_score
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+REPORTS_DIR = BACKEND_ROOT / "reports"
+
+for path in (BACKEND_ROOT, Path(__file__).resolve().parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from compaction import latency_us
+import gbm_backends
+from run_report import RunReport
+from train_models import engine_data, model_params, naval_data, stage_cache
+
+SHAP_BATCH_ROWS = 1000
+
+
+def datasets(names: List[str]) -> Dict[str, tuple]:
+    """Training and test rows per dataset, with the estimator kind."""
+    cache = stage_cache()
+    rows = {}
+    if "engine" in names:
+        _, _, X_test, _, y_test, X_train, y_train = engine_data(cache)
+        rows["engine"] = ("classifier", X_train.value, y_train.value, X_test.value, y_test.value)
+    if "naval" in names:
+        _, X_train, X_test, y_train, y_test = naval_data(cache)
+        rows["naval"] = ("regressor", X_train.value, y_train.value, X_test.value, y_test.value)
+    return rows
+
+
+def batch(X, rows: int) -> np.ndarray:
+    """`rows` float32 rows cycled from X, laid out like a served batch."""
+    values = X.to_numpy(dtype=np.float32)
+    return values[np.arange(rows) % len(values)]
+
+
+def best_seconds(fn, X, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def stage_memory(stage: Dict) -> int:
+    if stage["peak_scope"] == "stage" and stage["rss_before_bytes"] is not None:
+        return max(stage["peak_rss_bytes"] - stage["rss_before_bytes"], 0)
+    return stage["peak_rss_bytes"]
+
+
+def benchmark(backend: str, kind: str, X_train, y_train, X_test, y_test, batch_rows: int = 10000,
+              repeats: int = 3) -> Dict:
+    run = RunReport(f"{backend}-{kind}")
+    with run.stage("fit"):
+        model = gbm_backends.get(backend).fit(X_train, y_train, kind, **model_params(kind, backend))
+    with run.stage("explainer"):
+        explainer = gbm_backends.explainer(model)
+    fit, build = run.stages
+
+    # Served the way the API serves it: bare float32 arrays
+    predictor = gbm_backends.serving_predictor(model)
+    test = X_test.to_numpy(dtype=np.float32)
+    predictions = predictor.predict(test)
+    if kind == "classifier":
+        metric, score = "accuracy", accuracy_score(y_test, predictions)
+    else:
+        metric, score = "mean_r2", r2_score(y_test, predictions)
+
+    rows = batch(X_test, batch_rows)
+    shap_rows = batch(X_test, SHAP_BATCH_ROWS)
+    return {
+        "backend": backend,
+        "task": kind,
+        metric: float(score),
+        "fit_s": fit["wall_s"],
+        "fit_cpu_s": fit["cpu_s"],
+        "fit_memory_bytes": stage_memory(fit),
+        "memory_scope": fit["peak_scope"],
+        "model_bytes": len(pickle.dumps(model)),
+        "predict_1_us": latency_us(predictor.predict, X_test),
+        "predict_batch_rows": batch_rows,
+        "predict_batch_ms": best_seconds(predictor.predict, rows, repeats) * 1e3,
+        "explainer_build_s": build["wall_s"],
+        "shap_1_us": latency_us(lambda row: explainer(row), X_test, repeats=50),
+        "shap_row_us": best_seconds(lambda X: explainer(X), shap_rows, 1) / SHAP_BATCH_ROWS * 1e6,
+    }
+
+
+def measure(dataset: str, backend: str, batch_rows: int, repeats: int, threads: int) -> Dict:
+    """One benchmark run; the entry point of each fresh interpreter."""
+    if threads:
+        # OpenMP and BLAS pools of every library in the process
+        threadpool_limits(threads)
+    kind, X_train, y_train, X_test, y_test = datasets([dataset])[dataset]
+    result = benchmark(backend, kind, X_train, y_train, X_test, y_test, batch_rows, repeats)
+    result.update(train_rows=len(X_train), test_rows=len(X_test))
+    return result
+
+
+def table(dataset: str, results: List[Dict]) -> str:
+    metric = "accuracy" if results[0]["task"] == "classifier" else "mean_r2"
+    batch_rows = results[0]["predict_batch_rows"]
+    lines = [f"\n{dataset}: {results[0]['train_rows']:,} training rows, {results[0]['test_rows']:,} test rows, "
+             f"batch of {batch_rows:,}",
+             f"{'backend':<9} {metric:>9} {'fit s':>7} {'fit MiB':>8} {'size KB':>8} {'pred-1 µs':>10} "
+             f"{'batch ms':>9} {'shap-1 µs':>10} {'shap µs/row':>11}"]
+    for result in results:
+        lines.append(f"{result['backend']:<9} {result[metric]:>9.4f} {result['fit_s']:>7.2f} "
+                     f"{result['fit_memory_bytes'] / 2 ** 20:>8.0f} {result['model_bytes'] / 1024:>8.0f} "
+                     f"{result['predict_1_us']:>10.0f} {result['predict_batch_ms']:>9.1f} "
+                     f"{result['shap_1_us']:>10.0f} {result['shap_row_us']:>11.1f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default=",".join(gbm_backends.available()),
+                        help=f"comma-separated (available: {', '.join(gbm_backends.available())})")
+    parser.add_argument("--datasets", default="engine,naval")
+    parser.add_argument("--batch-rows", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs of the batch predict (best is kept)")
+    parser.add_argument("--threads", type=int, default=0, help="pin kernel threads (0: library default)")
+    parser.add_argument("-o", "--output", type=Path, default=REPORTS_DIR / "backend_benchmark.json")
+    args = parser.parse_args()
+
+    backends = [gbm_backends.get(name).name for name in args.backends.split(",")]
+    # Prepare the stage cache once so the fresh interpreters only load it
+    datasets(args.datasets.split(","))
+    report = {"cpu_count": os.cpu_count(), "threads": args.threads or None, "datasets": {}}
+    context = multiprocessing.get_context("spawn")
+    for dataset in args.datasets.split(","):
+        print(f"Benchmarking {dataset}")
+        results = []
+        for backend in backends:
+            print(f"  {backend}...", flush=True)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results.append(pool.submit(measure, dataset, backend, args.batch_rows, args.repeats,
+                                           args.threads).result())
+        report["datasets"][dataset] = results
+        print(table(dataset, results))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\n✓ Benchmark saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Concurrency benchmark for the prediction API.
+
+Starts the API once per thread policy (`managed`: the default KERNEL_THREADS
+budget; `unmanaged`: KERNEL_THREADS=0, XGBoost/SHAP pick their own thread
+counts), then drives it with 1..N concurrent clients and prints throughput and
+latency for single-row explained engine predictions and for large naval
+batches. Requires trained artifacts.
+
+    python utils/benchmark_concurrency.py --max-clients 16 --duration 5
+"""
+from pathlib import Path
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import numpy as np
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+ENGINE_PAYLOAD = {
+    "Vibration_Amplitude": 5.0,
+    "RMS_Vibration": 2.5,
+    "Vibration_Frequency": 1000,
+    "Surface_Temperature": 90,
+    "Exhaust_Temperature": 400,
+    "Acoustic_dB": 90,
+    "Acoustic_Frequency": 2500,
+    "Intake_Pressure": 105,
+    "Exhaust_Pressure": 95,
+    "Frequency_Band_Energy": 0.5,
+    "Amplitude_Mean": 0.25,
+}
+
+POLICIES = {"managed": {}, "unmanaged": {"KERNEL_THREADS": "0"}}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(policy: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, **POLICIES[policy], "MAX_CONCURRENCY": "64", "REQUEST_TIMEOUT": "60"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_ROOT, env=env,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            health = httpx.get(f"http://127.0.0.1:{port}/health").json()
+            if not (health["engine_model_loaded"] and health["naval_model_loaded"]):
+                server.terminate()
+                raise SystemExit("Models are not trained; run utils/train_models.py first")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("API did not start")
+
+
+def naval_batch(port: int, rows: int):
+    schema = httpx.get(f"http://127.0.0.1:{port}/openapi.json").json()["components"]["schemas"]
+    feature_names = list(schema["NavalPredictionRequest"]["properties"])
+    body = np.random.default_rng(0).uniform(0, 1, size=(rows, len(feature_names))).astype(np.float32)
+    headers = {"Content-Type": "application/octet-stream", "X-Feature-Names": ",".join(feature_names)}
+    return body.tobytes(), headers
+
+
+def run_load(send, clients: int, duration: float):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client():
+        nonlocal errors
+        with httpx.Client(timeout=120) as http:
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                ok = send(http).status_code == 200
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors += 1
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-clients", type=int, default=2 * (os.cpu_count() or 1))
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per measurement")
+    parser.add_argument("--batch-rows", type=int, default=4096)
+    parser.add_argument("--policy", choices=[*POLICIES, "both"], default="both")
+    args = parser.parse_args()
+
+    levels = sorted({1, *(2 ** i for i in range(1, args.max_clients.bit_length())), args.max_clients})
+    policies = list(POLICIES) if args.policy == "both" else [args.policy]
+    print(f"{os.cpu_count()} cores, {args.duration:.0f}s per level")
+    print(f"{'policy':<10} {'workload':<14} {'clients':>7} {'req/s':>9} {'rows/s':>10} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'errors':>6}")
+    for policy in policies:
+        port = free_port()
+        server = start_server(policy, port)
+        try:
+            url = f"http://127.0.0.1:{port}"
+            body, headers = naval_batch(port, args.batch_rows)
+            workloads = {
+                "engine+shap": (1, lambda http: http.post(f"{url}/predict/engine", json=ENGINE_PAYLOAD)),
+                "naval batch": (args.batch_rows, lambda http: http.post(
+                    f"{url}/predict/naval/batch?explain=false", content=body, headers=headers)),
+            }
+            for workload, (rows, send) in workloads.items():
+                run_load(send, 1, 1.0)  # warm-up
+                for clients in levels:
+                    latencies, errors = run_load(send, clients, args.duration)
+                    rate = len(latencies) / args.duration
+                    p50, p95 = (np.percentile(latencies, [50, 95]) * 1000) if len(latencies) else (0, 0)
+                    print(f"{policy:<10} {workload:<14} {clients:>7} {rate:>9.1f} {rate * rows:>10.0f} "
+                          f"{p50:>8.1f} {p95:>8.1f} {errors:>6}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare training run reports and flag stages that regressed.
+
+With no files, compares the two most recent runs of each model saved under
+`models/runs/` by the training scripts. A stage is flagged when wall time, CPU
+time or peak RSS grew by more than the threshold (default 20%) and by more than
+a small absolute floor, so sub-second noise is ignored. Exits with status 1 when
+anything regressed.
+
+    python utils/compare_runs.py
+    python utils/compare_runs.py engine --threshold 0.1
+    python utils/compare_runs.py --baseline old.json --current new.json
+"""
+from pathlib import Path
+import argparse
+import json
+import sys
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+MODELS_DIR = BACKEND_ROOT / "models"
+
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from run_report import DEFAULT_THRESHOLD, compare, history
+
+
+def load(path: Path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def change(old, new, scale: float = 1.0) -> str:
+    if old is None:
+        return f"{'-':>8} {new / scale:>8.2f} {'new':>7}"
+    pct = (new - old) / old * 100 if old else 0.0
+    return f"{old / scale:>8.2f} {new / scale:>8.2f} {pct:>+6.0f}%"
+
+
+def report(baseline_path: Path, current_path: Path, threshold: float) -> bool:
+    baseline, current = load(baseline_path), load(current_path)
+    print(f"\n{current['name']}: {baseline_path.name} -> {current_path.name}")
+    print(f"{'stage':<12} {'wall s (old/new/Δ)':>25} {'cpu s (old/new/Δ)':>25} {'peak MiB (old/new/Δ)':>25}")
+    regressed = False
+    for row in compare(baseline, current, threshold):
+        flags = ", ".join(row["regressions"])
+        regressed = regressed or bool(flags)
+        print(f"{row['stage']:<12} {change(*row['wall_s'])} {change(*row['cpu_s'])} "
+              f"{change(*row['peak_rss_bytes'], scale=2 ** 20)}  {'REGRESSED: ' + flags if flags else ''}")
+    total_old, total_new = baseline["total"]["wall_s"], current["total"]["wall_s"]
+    print(f"{'total':<12} {change(total_old, total_new)}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", default=["engine", "naval"])
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--current", type=Path)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.baseline or args.current:
+        if not (args.baseline and args.current):
+            parser.error("--baseline and --current go together")
+        pairs = [(args.baseline, args.current)]
+    else:
+        pairs = []
+        for name in args.names:
+            runs = history(MODELS_DIR, name)
+            if len(runs) < 2:
+                print(f"{name}: need two saved runs in {MODELS_DIR / 'runs'}, found {len(runs)}")
+                continue
+            pairs.append((runs[-2], runs[-1]))
+
+    regressed = [report(baseline, current, args.threshold) for baseline, current in pairs]
+    sys.exit(1 if any(regressed) else 0)
+
+
+if __name__ == "__main__":
+    main()
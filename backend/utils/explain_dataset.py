@@ -0,0 +1,199 @@
+"""
+Offline SHAP explanations for whole datasets.
+
+Reads a CSV in chunks and computes SHAP values for every row across a process
+pool. Each worker unpickles the explainer once (pool initializer) and pins its
+booster to one thread, so N workers use N cores without OpenMP
+oversubscription. Results are written straight into the `.npy` file as chunks
+complete; its header is written last, once the row count is known, so the CSV
+is read once and memory stays at a few chunks regardless of dataset size. The
+output can be opened with `np.load(path, mmap_mode="r")`. A JSON sidecar
+records feature/output names, base values and the array layout. Feature names
+come from the served model (`gbm_backends.feature_names`), so any backend's
+explainer works.
+
+    python utils/explain_dataset.py naval
+    python utils/explain_dataset.py engine data/fleet.csv -o reports/engine_shap.npy --workers 8
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = BACKEND_ROOT / "sample_data"
+MODELS_DIR = BACKEND_ROOT / "models"
+EXPLAINERS_DIR = BACKEND_ROOT / "explainers"
+# Room reserved for the .npy header, which is written once the row count is known
+HEADER_BYTES = 128
+
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from execution import limit_threads
+import gbm_backends
+
+MODELS = {
+    "engine": {
+        "model": "marine_model.pkl",
+        "explainer": "engine_shap_explainer.pkl",
+        "dataset": "engine_fault_detection_dataset.csv",
+        "outputs": ["Normal", "Minor Fault", "Critical Fault"],
+    },
+    "naval": {
+        "model": "naval_model.pkl",
+        "explainer": "naval_shap_explainer.pkl",
+        "dataset": "Predictive_Maintenance_Naval_Vessel_Condition.csv",
+        "outputs": ["compressor_decay", "turbine_decay"],
+    },
+}
+
+_explainer = None
+
+
+def clean_columns(columns: pd.Index) -> pd.Index:
+    """Same header cleaning as the naval training script."""
+    return (columns
+            .str.replace(r'[\[\]()]', '', regex=True)
+            .str.strip()
+            .str.replace(' ', '_')
+            .str.replace('.', ''))
+
+
+def to_features(chunk: pd.DataFrame, names: list) -> np.ndarray:
+    if not set(names) <= set(chunk.columns):
+        chunk = chunk.set_axis(clean_columns(chunk.columns), axis=1)
+    missing = [name for name in names if name not in chunk.columns]
+    if missing:
+        raise ValueError(f"Dataset is missing model features: {missing}")
+    return chunk[names].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float32)
+
+
+def write_header(handle, shape: tuple):
+    """Version 1.0 `.npy` header for float32 `shape`, space-padded to HEADER_BYTES."""
+    magic = np.lib.format.magic(1, 0)
+    header = repr({"descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)), "fortran_order": False,
+                   "shape": shape})
+    length = HEADER_BYTES - len(magic) - 2
+    if len(header) + 1 > length:
+        raise ValueError(f"Array header for shape {shape} does not fit in {HEADER_BYTES} bytes")
+    handle.seek(0)
+    handle.write(magic + struct.pack("<H", length) + (header.ljust(length - 1) + "\n").encode("latin1"))
+
+
+def _init_worker(explainer_path: str):
+    global _explainer
+    _explainer = joblib.load(explainer_path)
+    limit_threads(None, _explainer)
+
+
+def _explain(start: int, X: np.ndarray):
+    return start, _explainer(X).values.astype(np.float32)
+
+
+def explain_dataset(model_path: Path, explainer_path: Path, dataset: Path, output: Path,
+                    chunk_size: int = 10000, workers: int = 0, outputs=None):
+    """Write SHAP values of every dataset row to `output` (.npy); returns the sidecar metadata."""
+    workers = workers or os.cpu_count() or 1
+    names = gbm_backends.feature_names(joblib.load(model_path))
+    if names is None:
+        raise ValueError(f"Model {model_path} has no stored feature names; retrain from a DataFrame")
+    explainer = joblib.load(explainer_path)
+    expected = np.atleast_1d(np.asarray(explainer.expected_value, dtype=np.float64))
+    del explainer
+    # Multi-output models get a trailing axis per class/target, like TreeExplainer
+    row_shape = (len(names),) + ((len(expected),) if len(expected) > 1 else ())
+    row_bytes = int(np.prod(row_shape)) * np.dtype(np.float32).itemsize
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    print(f"Explaining {dataset} ({len(names)} features) with {workers} workers, chunks of {chunk_size}")
+    started = time.perf_counter()
+    last_report = started
+    done = 0
+    pending = set()
+
+    def collect(futures, handle):
+        nonlocal done, last_report
+        for future in futures:
+            start, chunk_values = future.result()
+            handle.seek(HEADER_BYTES + start * row_bytes)
+            handle.write(np.ascontiguousarray(chunk_values).tobytes())
+            done += len(chunk_values)
+        now = time.perf_counter()
+        if now - last_report >= 2.0:
+            print(f"  {done} rows, {done / (now - started):,.0f} rows/s", flush=True)
+            last_report = now
+
+    with open(output, "wb") as handle, \
+            ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(str(explainer_path),)) as pool:
+        rows = 0
+        for chunk in pd.read_csv(dataset, chunksize=chunk_size):
+            # Keep a bounded number of chunks in flight so memory does not grow with the dataset
+            if len(pending) >= 2 * workers:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished, handle)
+            pending.add(pool.submit(_explain, rows, to_features(chunk, names)))
+            rows += len(chunk)
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(finished, handle)
+        shape = (rows,) + row_shape
+        write_header(handle, shape)
+
+    elapsed = time.perf_counter() - started
+    metadata = {
+        "dataset": str(dataset),
+        "model": str(model_path),
+        "explainer": str(explainer_path),
+        "rows": rows,
+        "shape": list(shape),
+        "layout": "rows x features" + (" x outputs" if len(shape) == 3 else ""),
+        "dtype": "float32",
+        "feature_names": names,
+        "outputs": outputs,
+        "base_values": expected.tolist(),
+        "workers": workers,
+        "chunk_size": chunk_size,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else None,
+    }
+    with open(output.with_suffix(".json"), "w") as handle:
+        json.dump(metadata, handle, indent=2)
+    print(f"✓ SHAP values saved to {output} ({rows / elapsed:,.0f} rows/s over {elapsed:.1f}s)")
+    print(f"✓ Metadata saved to {output.with_suffix('.json')}")
+    return metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model", choices=sorted(MODELS))
+    parser.add_argument("dataset", nargs="?", type=Path, help="CSV to explain (default: the training dataset)")
+    parser.add_argument("-o", "--output", type=Path, help="output .npy (default: explainers/<model>_shap_values.npy)")
+    parser.add_argument("--model-path", type=Path, help="model pickle (default: the served one)")
+    parser.add_argument("--explainer", type=Path, help="explainer pickle (default: the served one)")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=0, help="processes (default: CPU count)")
+    args = parser.parse_args()
+
+    config = MODELS[args.model]
+    explain_dataset(
+        args.model_path or MODELS_DIR / config["model"],
+        args.explainer or EXPLAINERS_DIR / config["explainer"],
+        args.dataset or DATA_DIR / config["dataset"],
+        args.output or EXPLAINERS_DIR / f"{args.model}_shap_values.npy",
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        outputs=config["outputs"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+Single-pass profile of a CSV export, for datasets too large for pandas EDA.
+
+The CSV is streamed once in chunks. Per column the profile keeps:
+
+- counts of missing cells and of cells that are not numbers,
+- min, max, mean and central moments (std, skewness, excess kurtosis), merged
+  chunk by chunk with the pairwise update of Chan et al. / Pébay,
+- a KLL-style quantile sketch of bounded size, from which the quantiles and
+  a histogram over [min, max] are read at the end,
+
+and across numeric columns a pairwise-complete correlation matrix, equal to
+`df.corr()`, built from co-moment sums shifted by the first chunk's means.
+Memory depends on the chunk size, the sketch size and the number of columns,
+not on the number of rows. The report is written as JSON and as a
+self-contained HTML page.
+
+    python utils/profile_dataset.py sample_data/engine_fault_detection_dataset.csv
+    python utils/profile_dataset.py exports/fleet.csv --chunk-size 200000 -o reports/fleet
+"""
+from pathlib import Path
+import argparse
+import html
+import json
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+REPORTS_DIR = BACKEND_ROOT / "reports"
+
+QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch: levels of sorted compactors, items on level h weigh 2**h.
+
+    A full level is sorted and every other item (random offset) moves up a
+    level, so at most about 3k items are kept whatever the stream length.
+    """
+
+    def __init__(self, k: int = 256, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values: np.ndarray):
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(self.levels[level])
+                # An odd item out stays on this level so total weight is preserved exactly
+                keep, items = items[:len(items) % 2], items[len(items) % 2:]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def weighted(self):
+        """Retained items, sorted, with their weights."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantiles(self, qs) -> List[Optional[float]]:
+        if self.n == 0:
+            return [None for _ in qs]
+        items, weights = self.weighted()
+        ranks = np.cumsum(weights) - weights / 2
+        return [float(v) for v in np.interp(np.asarray(qs) * weights.sum(), ranks, items)]
+
+    def histogram(self, low: float, high: float, bins: int) -> Dict:
+        items, weights = self.weighted()
+        counts, edges = np.histogram(items, bins=bins, range=(low, high) if high > low else None, weights=weights)
+        # Weights sum to n exactly; rounding keeps the bins integral
+        return {"edges": edges.tolist(), "counts": np.rint(counts).astype(int).tolist()}
+
+    @property
+    def size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+
+class Moments:
+    """Count, min, max, mean and central moment sums M2..M4 per column, merged chunk by chunk."""
+
+    def __init__(self, columns: int):
+        self.n = np.zeros(columns)
+        self.mean = np.zeros(columns)
+        self.m2 = np.zeros(columns)
+        self.m3 = np.zeros(columns)
+        self.m4 = np.zeros(columns)
+        self.min = np.full(columns, np.inf)
+        self.max = np.full(columns, -np.inf)
+
+    def update(self, X: np.ndarray):
+        valid = ~np.isnan(X)
+        nb = valid.sum(axis=0).astype(float)
+        if not nb.any():
+            return
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mb = np.where(nb > 0, np.nansum(X, axis=0) / nb, 0.0)
+            centered = np.where(valid, X - mb, 0.0)
+        squared = centered * centered
+        m2b, m3b, m4b = squared.sum(axis=0), (squared * centered).sum(axis=0), (squared * squared).sum(axis=0)
+        self.min = np.fmin(self.min, np.where(valid, X, np.inf).min(axis=0))
+        self.max = np.fmax(self.max, np.where(valid, X, -np.inf).max(axis=0))
+
+        na, ma = self.n, self.mean
+        n = na + nb
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = mb - ma
+            a, b = np.where(n > 0, na / n, 0.0), np.where(n > 0, nb / n, 0.0)
+            m4 = (self.m4 + m4b + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+                  + 6 * delta ** 2 * (a ** 2 * m2b + b ** 2 * self.m2) + 4 * delta * (a * m3b - b * self.m3))
+            m3 = (self.m3 + m3b + delta ** 3 * na * nb * (na - nb) / n ** 2
+                  + 3 * delta * (a * m2b - b * self.m2))
+            m2 = self.m2 + m2b + delta ** 2 * na * nb / n
+        grown = n > 0
+        self.m4 = np.where(grown, m4, self.m4)
+        self.m3 = np.where(grown, m3, self.m3)
+        self.m2 = np.where(grown, m2, self.m2)
+        self.mean = np.where(grown, ma + delta * b, ma)
+        self.n = n
+
+    def summary(self, column: int) -> Dict:
+        """pandas-compatible statistics: sample std, adjusted skewness and excess kurtosis."""
+        n, m2, m3, m4 = self.n[column], self.m2[column], self.m3[column], self.m4[column]
+        stats = {"mean": None, "std": None, "min": None, "max": None, "skewness": None, "kurtosis": None}
+        if n == 0:
+            return stats
+        stats.update(mean=float(self.mean[column]), min=float(self.min[column]), max=float(self.max[column]))
+        if self.min[column] == self.max[column]:
+            # Constant column: the moment sums only hold rounding noise
+            stats["mean"] = stats["min"]
+            return {**stats, "std": 0.0 if n > 1 else None, "skewness": 0.0 if n > 2 else None,
+                    "kurtosis": 0.0 if n > 3 else None}
+        if n > 1:
+            stats["std"] = float(np.sqrt(m2 / (n - 1)))
+        if n > 2 and m2 > 0:
+            g1 = np.sqrt(n) * m3 / m2 ** 1.5
+            stats["skewness"] = float(g1 * np.sqrt(n * (n - 1)) / (n - 2))
+        if n > 3 and m2 > 0:
+            g2 = n * m4 / m2 ** 2 - 3
+            stats["kurtosis"] = float(((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3)))
+        return stats
+
+
+class Comoments:
+    """Pairwise-complete sums for a correlation matrix, like `DataFrame.corr()`.
+
+    For every pair the sums run over rows where both values are present.
+    Values are shifted by the first chunk's column means so the sums stay small.
+    """
+
+    def __init__(self, columns: int):
+        self.shift = None
+        self.n = np.zeros((columns, columns))
+        self.sx = np.zeros((columns, columns))
+        self.sxx = np.zeros((columns, columns))
+        self.sxy = np.zeros((columns, columns))
+
+    def update(self, X: np.ndarray):
+        valid = (~np.isnan(X)).astype(float)
+        if self.shift is None:
+            counts = valid.sum(axis=0)
+            self.shift = np.where(counts > 0, np.nansum(X, axis=0) / np.maximum(counts, 1), 0.0)
+        values = np.where(valid > 0, X - self.shift, 0.0)
+        self.n += valid.T @ valid
+        # sx[i, j]: sum of column i over rows where column j is present too
+        self.sx += values.T @ valid
+        self.sxx += (values * values).T @ valid
+        self.sxy += values.T @ values
+
+    def correlation(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            n = np.where(self.n > 1, self.n, np.nan)
+            covariance = self.sxy - self.sx * self.sx.T / n
+            variance_x = self.sxx - self.sx ** 2 / n
+            return covariance / np.sqrt(variance_x * variance_x.T)
+
+
+class DatasetProfile:
+    def __init__(self, sketch_size: int = 256):
+        self.sketch_size = sketch_size
+        self.columns: Optional[List[str]] = None
+        self.rows = 0
+        self.chunks = 0
+
+    def _start(self, columns: List[str]):
+        self.columns = columns
+        count = len(columns)
+        self.missing = np.zeros(count, dtype=np.int64)
+        self.invalid = np.zeros(count, dtype=np.int64)
+        self.moments = Moments(count)
+        self.comoments = Comoments(count)
+        self.sketches = [QuantileSketch(self.sketch_size, seed=i) for i in range(count)]
+
+    def update(self, chunk: pd.DataFrame):
+        if self.columns is None:
+            self._start(list(chunk.columns))
+        elif list(chunk.columns) != self.columns:
+            raise ValueError("All chunks must have the same columns")
+        missing = chunk.isna().to_numpy()
+        X = chunk.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+        self.missing += missing.sum(axis=0)
+        self.invalid += (np.isnan(X) & ~missing).sum(axis=0)
+        self.moments.update(X)
+        self.comoments.update(X)
+        for column, sketch in enumerate(self.sketches):
+            sketch.update(X[:, column])
+        self.rows += len(chunk)
+        self.chunks += 1
+
+    def report(self, bins: int = 30) -> Dict:
+        columns = {}
+        numeric = []
+        for i, name in enumerate(self.columns or []):
+            present = self.rows - int(self.missing[i])
+            # A column counts as numeric when most of its present cells parse as numbers
+            is_numeric = present > 0 and self.invalid[i] <= present / 2
+            column = {
+                "type": "numeric" if is_numeric else "text",
+                "count": present,
+                "missing": int(self.missing[i]),
+                "missing_fraction": self.missing[i] / self.rows if self.rows else 0.0,
+                "non_numeric": int(self.invalid[i]),
+            }
+            if is_numeric:
+                numeric.append(i)
+                column.update(self.moments.summary(i))
+                sketch = self.sketches[i]
+                column["quantiles"] = dict(zip((f"{q:g}" for q in QUANTILES), sketch.quantiles(QUANTILES)))
+                if sketch.n:
+                    column["histogram"] = sketch.histogram(column["min"], column["max"], bins)
+            columns[name] = column
+
+        correlation = self.comoments.correlation() if self.columns else np.empty((0, 0))
+        # Undefined for constant columns, as in pandas
+        constant = self.moments.min == self.moments.max if self.columns else []
+        correlation[constant, :] = np.nan
+        correlation[:, constant] = np.nan
+        correlation = correlation[np.ix_(numeric, numeric)]
+        return {
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "columns": columns,
+            "correlation": {
+                "columns": [self.columns[i] for i in numeric],
+                "matrix": [[None if np.isnan(v) else float(v) for v in row] for row in correlation],
+            },
+            "sketch_size": self.sketch_size,
+            "retained_items": sum(sketch.size for sketch in getattr(self, "sketches", [])),
+        }
+
+
+def profile_csv(path: Path, chunk_size: int = 100000, sketch_size: int = 256, bins: int = 30) -> Dict:
+    profile = DatasetProfile(sketch_size)
+    started = time.perf_counter()
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        profile.update(chunk)
+        print(f"  {profile.rows:,} rows", end="\r", flush=True)
+    print()
+    elapsed = time.perf_counter() - started
+    report = profile.report(bins)
+    report.update({"dataset": str(path), "chunk_size": chunk_size, "seconds": elapsed})
+    return report
+
+
+def _cell(value, digits: int = 4) -> str:
+    if value is None:
+        return "–"
+    if isinstance(value, float):
+        return f"{value:.{digits}g}"
+    return html.escape(str(value))
+
+
+def _histogram_svg(histogram: Dict, width: int = 160, height: int = 40) -> str:
+    counts = histogram["counts"]
+    peak = max(counts) or 1
+    bar = width / len(counts)
+    bars = "".join(
+        f'<rect x="{i * bar:.1f}" y="{height - c / peak * height:.1f}" width="{max(bar - 1, 0.5):.1f}" '
+        f'height="{c / peak * height:.1f}"/>'
+        for i, c in enumerate(counts)
+    )
+    return f'<svg width="{width}" height="{height}" class="hist">{bars}</svg>'
+
+
+def _correlation_color(value) -> str:
+    if value is None:
+        return "#eee"
+    # Blue for negative, red for positive, white at zero
+    strength = int(255 * (1 - min(abs(value), 1.0)))
+    return f"rgb(255,{strength},{strength})" if value > 0 else f"rgb({strength},{strength},255)"
+
+
+def render_html(report: Dict) -> str:
+    stat_keys = ["count", "missing", "non_numeric", "mean", "std", "min", "max", "skewness", "kurtosis"]
+    header = "".join(f"<th>{key}</th>" for key in stat_keys + ["quantiles (1/5/25/50/75/95/99%)", "histogram"])
+    rows = []
+    for name, column in report["columns"].items():
+        quantiles = ", ".join(_cell(v, 3) for v in column.get("quantiles", {}).values())
+        histogram = _histogram_svg(column["histogram"]) if "histogram" in column else ""
+        cells = "".join(f"<td>{_cell(column.get(key))}</td>" for key in stat_keys)
+        rows.append(f"<tr><th>{html.escape(name)}</th>{cells}<td>{quantiles}</td><td>{histogram}</td></tr>")
+
+    names = report["correlation"]["columns"]
+    corr_header = "".join(f'<th class="rot"><div>{html.escape(name)}</div></th>' for name in names)
+    corr_rows = "".join(
+        f"<tr><th>{html.escape(name)}</th>"
+        + "".join(f'<td style="background:{_correlation_color(v)}">{_cell(v, 2)}</td>' for v in row)
+        + "</tr>"
+        for name, row in zip(names, report["correlation"]["matrix"])
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Profile of {html.escape(report['dataset'])}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; font-size: 12px; margin-bottom: 2em; }}
+td, th {{ border: 1px solid #ccc; padding: 3px 6px; text-align: right; }}
+th {{ background: #f5f5f5; }}
+.hist rect {{ fill: #4a7ebb; }}
+th.rot {{ height: 140px; vertical-align: bottom; }}
+th.rot div {{ writing-mode: vertical-rl; transform: rotate(180deg); }}
+</style></head><body>
+<h1>{html.escape(report['dataset'])}</h1>
+<p>{report['rows']:,} rows, {len(report['columns'])} columns, profiled in {report['seconds']:.1f}s
+({report['chunks']} chunks of {report['chunk_size']:,} rows). Quantiles and histograms come from
+sketches of {report['sketch_size']} items per level.</p>
+<h2>Columns</h2>
+<table><tr><th>column</th>{header}</tr>{''.join(rows)}</table>
+<h2>Correlation</h2>
+<table><tr><th></th>{corr_header}</tr>{corr_rows}</table>
+</body></html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", type=Path)
+    parser.add_argument("-o", "--output", type=Path,
+                        help="output path without extension (default: reports/<dataset>_profile)")
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    parser.add_argument("--sketch-size", type=int, default=256, help="quantile sketch items per level")
+    parser.add_argument("--bins", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"Profiling {args.dataset}")
+    report = profile_csv(args.dataset, args.chunk_size, args.sketch_size, args.bins)
+    output = args.output or REPORTS_DIR / f"{args.dataset.stem}_profile"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    json_path, html_path = output.with_name(output.name + ".json"), output.with_name(output.name + ".html")
+    with open(json_path, "w") as handle:
+        json.dump(report, handle, indent=2)
+    html_path.write_text(render_html(report), encoding="utf-8")
+    print(f"✓ {report['rows']:,} rows profiled in {report['seconds']:.1f}s")
+    print(f"✓ JSON report saved to {json_path}")
+    print(f"✓ HTML report saved to {html_path}")
+
+
+if __name__ == "__main__":
+    main()
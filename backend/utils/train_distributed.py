@@ -0,0 +1,181 @@
+"""
+Distributed XGBoost training: speedup curve and multi-node entry points.
+
+`scale` trains a model through the local launcher once per worker count and
+prints the per-worker timing and the speedup curve (also written to
+`models/<model>_scaling.json`). By default each run gets one kernel thread per
+worker, so the curve measures data parallelism rather than OpenMP threads.
+
+Across machines, start one tracker and one worker per node. Each worker reads
+only its shard of the CSV (every N-th row, or a file written by `split`) and
+cleans, splits and, for the engine model, oversamples it on its own, so no
+node holds or resamples the full dataset. Rank 0 saves the model.
+
+    python utils/train_distributed.py scale naval --workers 1,2,4
+    python utils/train_distributed.py split engine --workers 4 -o shards/
+    python utils/train_distributed.py tracker --workers 4 --host 10.0.0.1 --port 9091
+    python utils/train_distributed.py worker naval --rank 0 --workers 4 --tracker 10.0.0.1:9091
+    python utils/train_distributed.py worker engine --rank 0 --workers 4 --tracker 10.0.0.1:9091 \
+        --data shards/engine_fault_detection_dataset-0-of-4.csv --presplit
+
+Training the served artifacts on several local processes is
+`TRAINING_WORKERS=4 python utils/train_models.py`.
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+
+import joblib
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+MODELS_DIR = BACKEND_ROOT / "models"
+
+for path in (BACKEND_ROOT, Path(__file__).resolve().parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import distributed
+import gbm_backends
+from train_models import (ENGINE_PARAMS, NAVAL_PARAMS, clean_engine, clean_naval, dataset_path, engine_data,
+                          naval_data, oversample, read_dataset, split_engine, split_naval, stage_cache)
+
+DATASETS = {"engine": "engine_fault_detection_dataset.csv",
+            "naval": "Predictive_Maintenance_Naval_Vessel_Condition.csv"}
+
+
+def estimator_factory(name: str):
+    xgboost = gbm_backends.get("xgboost")
+    if name == "engine":
+        return lambda: xgboost.estimator("classifier", **ENGINE_PARAMS)
+    return lambda: xgboost.estimator("regressor", **NAVAL_PARAMS)
+
+
+def training_rows(name: str):
+    """Rows the fit stage sees, the estimator factory and whether shards are stratified."""
+    cache = stage_cache()
+    if name == "engine":
+        *_, X, y = engine_data(cache)
+        return X.value, y.value, estimator_factory(name), True
+    _, X, _, y, _ = naval_data(cache)
+    return X.value, y.value, estimator_factory(name), False
+
+
+def shard_loader(name: str, path: Path, presplit: bool = False):
+    """Shard loader for a multi-node worker: reads, cleans, splits and (engine) oversamples one shard.
+
+    The hold-out split is stratified within the shard and SMOTE interpolates
+    between the shard's own rows, so the union of the shards is not the
+    single-node training set.
+    """
+    def load(rank: int, world_size: int):
+        df = read_dataset(path) if presplit else distributed.read_shard(path, world_size, rank)
+        if name == "engine":
+            X_train, _, y_train, _ = split_engine(clean_engine(df))
+            return oversample(X_train, y_train)
+        X_train, _, y_train, _ = split_naval(clean_naval(df))
+        return X_train, y_train
+    return load
+
+
+def scale(args):
+    X, y, make_estimator, stratify = training_rows(args.model)
+    counts = [int(count) for count in args.workers.split(",")]
+    print(f"Training {args.model} on {len(X)} rows with {counts} workers, "
+          f"{args.threads or 'cores / workers'} threads each")
+    rows = distributed.scaling(make_estimator, X, y, counts, stratify=stratify, nthread=args.threads or None)
+
+    for row in rows:
+        print(f"\n{row['workers']} workers x {row['nthread']} threads")
+        print(f"{'rank':>4} {'rows':>8} {'connect s':>9} {'shard s':>8} {'fit s':>8}")
+        for worker in row["per_worker"]:
+            print(f"{worker['rank']:>4} {worker['rows']:>8} {worker['connect_s']:>9.2f} "
+                  f"{worker['shard_s']:>8.2f} {worker['fit_s']:>8.2f}")
+
+    print(f"\n{'workers':>7} {'wall s':>8} {'fit s':>8} {'speedup':>8} {'fit speedup':>11} {'efficiency':>10}")
+    for row in rows:
+        print(f"{row['workers']:>7} {row['wall_s']:>8.2f} {row['fit_s']:>8.2f} {row['speedup']:>7.2f}x "
+              f"{row['fit_speedup']:>10.2f}x {row['efficiency']:>10.0%}")
+    print(f"(CPU count {os.cpu_count()}; speedup is bounded by the cores available)")
+
+    output = args.output or MODELS_DIR / f"{args.model}_scaling.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump({"model": args.model, "rows": len(X), "cpu_count": os.cpu_count(), "runs": rows}, handle, indent=2)
+    print(f"✓ Scaling report saved to {output}")
+
+
+def split(args):
+    outputs = distributed.write_shards(dataset_path(DATASETS[args.model]), args.workers, args.output)
+    for output in outputs:
+        print(f"✓ Shard saved to {output}")
+
+
+def tracker(args):
+    tracker, worker_args = distributed.start_tracker(args.workers, host=args.host, port=args.port,
+                                                     timeout=args.timeout)
+    print(f"Tracker listening for {args.workers} workers: {json.dumps(worker_args)}", flush=True)
+    tracker.wait_for(args.timeout)
+    tracker.free()
+    print("All workers finished")
+
+
+def worker(args):
+    host, port = args.tracker.rsplit(":", 1)
+    tracker_args = {"dmlc_tracker_uri": host, "dmlc_tracker_port": int(port), "dmlc_timeout": args.timeout}
+    load_shard = shard_loader(args.model, args.data or dataset_path(DATASETS[args.model]), args.presplit)
+    report = distributed.fit_worker(args.rank, args.workers, tracker_args, estimator_factory(args.model),
+                                    load_shard, nthread=args.threads or None)
+    model = report.pop("model")
+    print(json.dumps(report))
+    if model is not None:
+        model.set_params(n_jobs=None)
+        output = args.output or MODELS_DIR / f"{args.model}_distributed.pkl"
+        joblib.dump(model, output)
+        print(f"✓ Model saved to {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scale_parser = commands.add_parser("scale", help="speedup curve through the local launcher")
+    scale_parser.add_argument("model", choices=["engine", "naval"])
+    scale_parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    scale_parser.add_argument("--threads", type=int, default=1, help="kernel threads per worker (0: cores / workers)")
+    scale_parser.add_argument("-o", "--output", type=Path)
+    scale_parser.set_defaults(run=scale)
+
+    split_parser = commands.add_parser("split", help="pre-split a dataset into one CSV per worker")
+    split_parser.add_argument("model", choices=["engine", "naval"])
+    split_parser.add_argument("--workers", type=int, required=True)
+    split_parser.add_argument("-o", "--output", type=Path, required=True, help="directory for the shard files")
+    split_parser.set_defaults(run=split)
+
+    tracker_parser = commands.add_parser("tracker", help="rendezvous for multi-node workers")
+    tracker_parser.add_argument("--workers", type=int, required=True)
+    tracker_parser.add_argument("--host", required=True, help="address the workers can reach")
+    tracker_parser.add_argument("--port", type=int, default=9091)
+    tracker_parser.add_argument("--timeout", type=int, default=distributed.DEFAULT_TIMEOUT)
+    tracker_parser.set_defaults(run=tracker)
+
+    worker_parser = commands.add_parser("worker", help="one node of a multi-node run")
+    worker_parser.add_argument("model", choices=["engine", "naval"])
+    worker_parser.add_argument("--rank", type=int, required=True)
+    worker_parser.add_argument("--workers", type=int, required=True)
+    worker_parser.add_argument("--tracker", required=True, help="tracker host:port")
+    worker_parser.add_argument("--threads", type=int, default=0, help="kernel threads (default: all cores)")
+    worker_parser.add_argument("--timeout", type=int, default=distributed.DEFAULT_TIMEOUT)
+    worker_parser.add_argument("--data", type=Path, help="dataset CSV (default: the bundled one)")
+    worker_parser.add_argument("--presplit", action="store_true",
+                               help="--data holds only this rank's rows (from `split`)")
+    worker_parser.add_argument("-o", "--output", type=Path, help="where rank 0 saves the model")
+    worker_parser.set_defaults(run=worker)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
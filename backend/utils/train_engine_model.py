@@ -2,6 +2,7 @@
 Training script for Engine Fault Detection Model the datasets are missing so utazidrop pale sample data folder.
 """
 from pathlib import Path
+import sys
 
 import pandas as pd
 import numpy as np
@@ -18,6 +19,13 @@ DATA_DIR = BACKEND_ROOT / "sample_data"
 MODELS_DIR = BACKEND_ROOT / "models"
 EXPLAINERS_DIR = BACKEND_ROOT / "explainers"
 
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from cascade import MAX_ACCURACY_LOSS, fit_cascade, summary
+from drift import build_reference
+from run_report import RunReport
+
 def load_dataset(filename: str) -> pd.DataFrame:
     dataset_path = DATA_DIR / filename
     if not dataset_path.exists():
@@ -30,28 +38,33 @@ def train_engine_model():
     print("=" * 50)
     print("Training Engine Fault Detection Model")
     print("=" * 50)
+    run = RunReport("engine")
     
     # Load dataset
-    df_engine = load_dataset('engine_fault_detection_dataset.csv')
+    with run.stage("load"):
+        df_engine = load_dataset('engine_fault_detection_dataset.csv')
     print(f"Loaded {len(df_engine)} samples")
     
     # Clean target variable
-    df_engine['Engine_Condition'] = pd.to_numeric(df_engine['Engine_Condition'], errors='coerce')
-    df_engine.dropna(subset=['Engine_Condition'], inplace=True)
-    df_engine['Engine_Condition'] = df_engine['Engine_Condition'].astype(int)
+    with run.stage("clean"):
+        df_engine['Engine_Condition'] = pd.to_numeric(df_engine['Engine_Condition'], errors='coerce')
+        df_engine.dropna(subset=['Engine_Condition'], inplace=True)
+        df_engine['Engine_Condition'] = df_engine['Engine_Condition'].astype(int)
     
     # Split features and target
-    X = df_engine.drop('Engine_Condition', axis=1)
-    y = df_engine['Engine_Condition']
-    
-    # Train-test split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    with run.stage("split"):
+        X = df_engine.drop('Engine_Condition', axis=1)
+        y = df_engine['Engine_Condition']
+        
+        # Train-test split
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
     
     # Apply SMOTE to balance classes
-    smote = SMOTE(random_state=42)
-    X_train_resampled, y_train_resampled = smote.fit_resample(X_train, y_train)
+    with run.stage("smote"):
+        smote = SMOTE(random_state=42)
+        X_train_resampled, y_train_resampled = smote.fit_resample(X_train, y_train)
     print(f"After SMOTE: {y_train_resampled.value_counts().to_dict()}")
     
     # Train XGBoost classifier
@@ -64,27 +77,51 @@ def train_engine_model():
     )
     
     print("Training model...")
-    xgb_model.fit(X_train_resampled, y_train_resampled)
+    with run.stage("fit"):
+        xgb_model.fit(X_train_resampled, y_train_resampled)
     
     # Evaluate
-    y_pred = xgb_model.predict(X_test)
+    with run.stage("evaluate"):
+        y_pred = xgb_model.predict(X_test)
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred, 
                                 target_names=['Normal', 'Minor Fault', 'Critical Fault']))
+    run.metrics["accuracy"] = float((y_pred == y_test).mean())
+    
+    # First stage of the serving cascade, calibrated against the full model
+    with run.stage("cascade"):
+        cascade = fit_cascade(X_train_resampled, y_train_resampled, xgb_model, X_test, y_test, MAX_ACCURACY_LOSS)
+    calibration = cascade["calibration"]
+    print("\n" + summary(calibration))
+    run.metrics["cascade_escalation_rate"] = calibration["holdout"]["escalation_rate"]
     
     # Create SHAP explainer
-    explainer = shap.TreeExplainer(xgb_model)
+    with run.stage("explainer"):
+        explainer = shap.TreeExplainer(xgb_model)
+    
+    # Reference feature distribution for drift monitoring (pre-SMOTE training rows)
+    with run.stage("reference"):
+        reference = build_reference(X_train)
     
     # Save models
     MODELS_DIR.mkdir(parents=True, exist_ok=True)
     EXPLAINERS_DIR.mkdir(parents=True, exist_ok=True)
-
     engine_model_path = MODELS_DIR / 'marine_model.pkl'
     engine_explainer_path = EXPLAINERS_DIR / 'engine_shap_explainer.pkl'
-    joblib.dump(xgb_model, engine_model_path)
-    joblib.dump(explainer, engine_explainer_path)
+    engine_reference_path = MODELS_DIR / 'engine_reference.pkl'
+    engine_cascade_path = MODELS_DIR / 'engine_cascade.pkl'
+    with run.stage("dump"):
+        joblib.dump(xgb_model, engine_model_path)
+        joblib.dump(explainer, engine_explainer_path)
+        joblib.dump(reference, engine_reference_path)
+        joblib.dump(cascade, engine_cascade_path)
     print(f"\n✓ Engine model saved to {engine_model_path}")
     print(f"✓ SHAP explainer saved to {engine_explainer_path}")
+    print(f"✓ Drift reference saved to {engine_reference_path}")
+    print(f"✓ Cascade first stage saved to {engine_cascade_path}")
+    
+    print("\n" + run.summary())
+    print(f"✓ Run report saved to {run.save(MODELS_DIR)}")
 
 if __name__ == "__main__":
     train_engine_model()
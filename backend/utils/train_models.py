@@ -3,15 +3,16 @@ Training script for both predictive maintenance models.
 Run this to train and save the models before starting the API.
 """
 from pathlib import Path
+import sys
 
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix, r2_score, mean_squared_error, mean_absolute_error
 from imblearn.over_sampling import SMOTE
-import xgboost as xgb
 import shap
 import joblib
+import json
 import os
 
 
@@ -20,142 +21,351 @@ DATA_DIR = BACKEND_ROOT / "sample_data"
 MODELS_DIR = BACKEND_ROOT / "models"
 EXPLAINERS_DIR = BACKEND_ROOT / "explainers"
 
-def train_engine_model():
-    print("=" * 50)
-    print("Training Engine Fault Detection Model")
-    print("=" * 50)
-    
-    # Load dataset
-    df_engine = load_dataset('engine_fault_detection_dataset.csv')
-    print(f"Loaded {len(df_engine)} samples")
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from cascade import FIRST_STAGE_PARAMS, MAX_ACCURACY_LOSS, calibrate, evaluate, fit_cascade, summary
+from compaction import compact
+import distributed
+from drift import N_BINS, bin_index, build_reference
+from features import NAVAL_FIELD_ALIASES
+import gbm_backends
+from model_store import registry_entry
+from run_report import RunReport
+from stage_cache import StageCache
+
+# Quality a compacted model may give up: engine accuracy, naval mean R²
+ENGINE_COMPACTION_TOLERANCE = 0.01
+NAVAL_COMPACTION_TOLERANCE = 0.002
+
+ENGINE_PARAMS = {
+    "objective": "multi:softmax",
+    "num_class": 3,
+    "use_label_encoder": False,
+    "eval_metric": "mlogloss",
+    "random_state": 42,
+}
+NAVAL_PARAMS = {"objective": "reg:squarederror", "random_state": 42}
+NAVAL_TARGETS = ['GT_Compressor_decay_state_coefficient', 'GT_Turbine_decay_state_coefficient']
+# How the API presents each model's outputs, for the registry entries of compacted models
+SERVED_OUTPUTS = {
+    "engine": {"labels": ['Normal', 'Minor Fault', 'Critical Fault']},
+    "naval": {"labels": ['compressor_decay', 'turbine_decay'], "output_keys": ['compressor', 'turbine'],
+              "field_aliases": NAVAL_FIELD_ALIASES},
+}
+
+# Stage outputs are cached under models/cache/ (TRAINING_CACHE=off disables it)
+CACHE_DIR = Path(os.getenv("TRAINING_CACHE_DIR", MODELS_DIR / "cache"))
+CACHE_MAX_MB = int(os.getenv("TRAINING_CACHE_MB", "2048"))
+# Local processes the fit stage is spread across (1 = in-process training)
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", "1"))
+# Gradient-boosting library the served models are trained with (gbm_backends)
+TRAINING_BACKEND = os.getenv("TRAINING_BACKEND", gbm_backends.DEFAULT_BACKEND)
+
+
+def stage_cache() -> StageCache:
+    enabled = os.getenv("TRAINING_CACHE", "on").lower() not in ("off", "0", "false")
+    return StageCache(CACHE_DIR if enabled else None, max_bytes=CACHE_MAX_MB * 1024 * 1024)
+
+
+# Pipeline stages. Each is a pure function of its inputs and parameters, so its output can be
+# cached under a hash of both and of its source.
+
+def read_dataset(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path)
+
+
+def clean_engine(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df['Engine_Condition'] = pd.to_numeric(df['Engine_Condition'], errors='coerce')
+    df.dropna(subset=['Engine_Condition'], inplace=True)
+    df['Engine_Condition'] = df['Engine_Condition'].astype(int)
+    return df
+
+
+def split_engine(df: pd.DataFrame):
+    X = df.drop('Engine_Condition', axis=1)
+    y = df['Engine_Condition']
+    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+
+def oversample(X_train, y_train):
+    """SMOTE to balance the fault classes."""
+    return SMOTE(random_state=42).fit_resample(X_train, y_train)
+
+
+def model_params(kind: str, backend: str) -> dict:
+    """Training parameters: the tuned XGBoost ones, or the backend's defaults with the shared seed."""
+    if backend == "xgboost":
+        return ENGINE_PARAMS if kind == "classifier" else NAVAL_PARAMS
+    return {"random_state": 42}
+
+
+def fit_estimator(X, y, kind: str, backend: str = gbm_backends.DEFAULT_BACKEND, **params):
+    return gbm_backends.get(backend).fit(X, y, kind, **params)
+
+
+def fit_distributed(X, y, kind: str, workers: int, stratify: bool, **params):
+    """Data-parallel fit over `workers` local processes; returns the model and per-worker timings."""
+    xgboost = gbm_backends.get("xgboost")
+    return distributed.train(lambda: xgboost.estimator(kind, **params), X, y, workers, stratify=stratify)
+
+
+def build_explainer(model):
+    return gbm_backends.explainer(model)
+
+
+def clean_naval(df: pd.DataFrame) -> pd.DataFrame:
+    if 'Unnamed: 0' in df.columns:
+        df = df.drop('Unnamed: 0', axis=1)
+    if 'index' in df.columns:
+        df = df.drop('index', axis=1)
     
-    # Clean target variable
-    df_engine['Engine_Condition'] = pd.to_numeric(df_engine['Engine_Condition'], errors='coerce')
-    df_engine.dropna(subset=['Engine_Condition'], inplace=True)
-    df_engine['Engine_Condition'] = df_engine['Engine_Condition'].astype(int)
+    return df.set_axis(df.columns
+                       .str.replace('[\\[\\]()]', '', regex=True)
+                       .str.strip()
+                       .str.replace(' ', '_')
+                       .str.replace('.', ''), axis=1)
+
+
+def split_naval(df: pd.DataFrame):
+    X_naval = df.drop(columns=NAVAL_TARGETS)
+    y_naval = df[NAVAL_TARGETS]
+    return train_test_split(X_naval, y_naval, test_size=0.2, random_state=42)
+
+
+def fit_stage(cache: StageCache, run, X, y, kind: str, params: dict, workers: int = 1, stratify: bool = False,
+              backend: str = gbm_backends.DEFAULT_BACKEND):
+    """Fit stage: in-process, or data-parallel across `workers` local processes (XGBoost only)."""
+    if workers <= 1:
+        return cache.run("fit", fit_estimator, X, y, params={"kind": kind, "backend": backend, **params},
+                         code=(gbm_backends,), report=run)
+    if backend != "xgboost":
+        raise ValueError(f"Distributed training supports the xgboost backend only, not {backend!r}")
+    model, report = cache.run("fit", fit_distributed, X, y,
+                              params={"kind": kind, "workers": workers, "stratify": stratify, **params},
+                              code=(distributed.train, distributed.fit_worker, distributed.shard, gbm_backends),
+                              report=run)
+    print(distributed_summary(report.value))
+    run.metrics["distributed"] = report.value
+    return model
+
+
+def distributed_summary(report: dict) -> str:
+    lines = [f"{'rank':>4} {'rows':>8} {'connect s':>9} {'shard s':>8} {'fit s':>8}"]
+    for worker in report["per_worker"]:
+        lines.append(f"{worker['rank']:>4} {worker['rows']:>8} {worker['connect_s']:>9.2f} "
+                     f"{worker['shard_s']:>8.2f} {worker['fit_s']:>8.2f}")
+    lines.append(f"{report['workers']} workers x {report['nthread']} threads: "
+                 f"fit {report['fit_s']:.2f}s, launcher wall {report['wall_s']:.2f}s")
+    return "\n".join(lines)
+
+
+def engine_data(cache: StageCache, run=None):
+    """Load, clean, split and oversample the engine dataset; returns the stage artifacts."""
+    # Load dataset and clean target variable
+    df_engine = cache.run("load", read_dataset, dataset_path('engine_fault_detection_dataset.csv'), report=run)
+    df_engine = cache.run("clean", clean_engine, df_engine, report=run)
     
     # Split features and target
-    X = df_engine.drop('Engine_Condition', axis=1)
-    y = df_engine['Engine_Condition']
-    
-    # Train-test split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    X_train, X_test, y_train, y_test = cache.run("split", split_engine, df_engine, report=run)
     
     # Apply SMOTE to balance classes
-    smote = SMOTE(random_state=42)
-    X_train_resampled, y_train_resampled = smote.fit_resample(X_train, y_train)
-    print(f"After SMOTE: {y_train_resampled.value_counts().to_dict()}")
-    
-    # Train XGBoost classifier
-    xgb_model = xgb.XGBClassifier(
-        objective='multi:softmax',
-        num_class=3,
-        use_label_encoder=False,
-        eval_metric='mlogloss',
-        random_state=42
-    )
-    
-    print("Training model...")
-    xgb_model.fit(X_train_resampled, y_train_resampled)
+    X_train_resampled, y_train_resampled = cache.run("smote", oversample, X_train, y_train, report=run)
+    return df_engine, X_train, X_test, y_train, y_test, X_train_resampled, y_train_resampled
+
+
+def naval_data(cache: StageCache, run=None):
+    """Load, clean and split the naval dataset; returns the stage artifacts."""
+    # Load dataset and clean column names
+    df_naval = cache.run("load", read_dataset,
+                         dataset_path('Predictive_Maintenance_Naval_Vessel_Condition.csv'), report=run)
+    df_naval = cache.run("clean", clean_naval, df_naval, report=run)
+    
+    # Split features and targets
+    X_train, X_test, y_train, y_test = cache.run("split", split_naval, df_naval, report=run)
+    return df_naval, X_train, X_test, y_train, y_test
+
+
+def train_engine_model(cache: StageCache = None, workers: int = TRAINING_WORKERS, backend: str = TRAINING_BACKEND):
+    print("=" * 50)
+    print("Training Engine Fault Detection Model")
+    print("=" * 50)
+    run = RunReport("engine")
+    cache = cache or stage_cache()
+    
+    df_engine, X_train, X_test, y_train, y_test, X_train_resampled, y_train_resampled = engine_data(cache, run)
+    print(f"Loaded {len(df_engine.value)} samples")
+    print(f"After SMOTE: {y_train_resampled.value.value_counts().to_dict()}")
+    
+    # Train the classifier
+    print(f"Training {backend} model..." if workers <= 1 else f"Training model on {workers} workers...")
+    run.metrics["backend"] = backend
+    xgb_model = fit_stage(cache, run, X_train_resampled, y_train_resampled, "classifier",
+                          model_params("classifier", backend), workers, stratify=True, backend=backend)
     
     # Evaluate
-    y_pred = xgb_model.predict(X_test)
+    with run.stage("evaluate"):
+        y_pred = xgb_model.value.predict(X_test.value)
     print("\nClassification Report:")
-    print(classification_report(y_test, y_pred, 
+    print(classification_report(y_test.value, y_pred, 
                                 target_names=['Normal', 'Minor Fault', 'Critical Fault']))
+    run.metrics["accuracy"] = float((y_pred == y_test.value).mean())
+    
+    cascade = cache.run("cascade", fit_cascade, X_train_resampled, y_train_resampled, xgb_model, X_test, y_test,
+                        params={"max_accuracy_loss": MAX_ACCURACY_LOSS, **FIRST_STAGE_PARAMS},
+                        code=(calibrate, evaluate), report=run).value
+    calibration = cascade["calibration"]
+    print("\n" + summary(calibration))
+    run.metrics["cascade_escalation_rate"] = calibration["holdout"]["escalation_rate"]
     
     # Create SHAP explainer
-    explainer = shap.TreeExplainer(xgb_model)
+    explainer = cache.run("explainer", build_explainer, xgb_model, code=(gbm_backends,), report=run).value
+    
+    # Reference feature distribution for drift monitoring (pre-SMOTE training rows)
+    reference = cache.run("reference", build_reference, X_train, params={"n_bins": N_BINS},
+                          code=(bin_index,), report=run).value
     
     # Save models
     MODELS_DIR.mkdir(parents=True, exist_ok=True)
     EXPLAINERS_DIR.mkdir(parents=True, exist_ok=True)
     engine_model_path = MODELS_DIR / 'marine_model.pkl'
     engine_explainer_path = EXPLAINERS_DIR / 'engine_shap_explainer.pkl'
-    joblib.dump(xgb_model, engine_model_path)
-    joblib.dump(explainer, engine_explainer_path)
+    engine_reference_path = MODELS_DIR / 'engine_reference.pkl'
+    engine_cascade_path = MODELS_DIR / 'engine_cascade.pkl'
+    with run.stage("dump"):
+        joblib.dump(xgb_model.value, engine_model_path)
+        joblib.dump(explainer, engine_explainer_path)
+        joblib.dump(reference, engine_reference_path)
+        joblib.dump(cascade, engine_cascade_path)
     print(f"\n✓ Engine model saved to {engine_model_path}")
     print(f"✓ SHAP explainer saved to {engine_explainer_path}")
+    print(f"✓ Drift reference saved to {engine_reference_path}")
+    print(f"✓ Cascade first stage saved to {engine_cascade_path}")
+    
+    run.metrics["stage_cache"] = cache.stats()
+    print("\n" + run.summary())
+    print(f"✓ Run report saved to {run.save(MODELS_DIR)}")
+    return xgb_model.value, X_train_resampled.value, y_train_resampled.value, X_test.value, y_test.value
 
-def train_naval_model():
+def train_naval_model(cache: StageCache = None, workers: int = TRAINING_WORKERS, backend: str = TRAINING_BACKEND):
     print("\n" + "=" * 50)
     print("Training Naval Vessel Condition Model")
     print("=" * 50)
+    run = RunReport("naval")
+    cache = cache or stage_cache()
     
-    # Load dataset
-    df_naval = load_dataset('Predictive_Maintenance_Naval_Vessel_Condition.csv')
-    print(f"Loaded {len(df_naval)} samples")
-    
-    # Clean column names
-    if 'Unnamed: 0' in df_naval.columns:
-        df_naval = df_naval.drop('Unnamed: 0', axis=1)
-    if 'index' in df_naval.columns:
-        df_naval = df_naval.drop('index', axis=1)
-    
-    df_naval.columns = (df_naval.columns
-                        .str.replace('[\[\]()]', '', regex=True)
-                        .str.strip()
-                        .str.replace(' ', '_')
-                        .str.replace('.', ''))
+    df_naval, X_train, X_test, y_train, y_test = naval_data(cache, run)
+    print(f"Loaded {len(df_naval.value)} samples")
     
-    # Define targets
-    target_cols = ['GT_Compressor_decay_state_coefficient', 'GT_Turbine_decay_state_coefficient']
-    
-    # Split features and targets
-    X_naval = df_naval.drop(columns=target_cols)
-    y_naval = df_naval[target_cols]
-    
-    # Train-test split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X_naval, y_naval, test_size=0.2, random_state=42
-    )
-    
-    # Train XGBoost regressor
-    xgb_regressor = xgb.XGBRegressor(
-        objective='reg:squarederror',
-        random_state=42
-    )
-    
-    print("Training model...")
-    xgb_regressor.fit(X_train, y_train)
+    # Train the regressor
+    print(f"Training {backend} model..." if workers <= 1 else f"Training model on {workers} workers...")
+    run.metrics["backend"] = backend
+    xgb_regressor = fit_stage(cache, run, X_train, y_train, "regressor", model_params("regressor", backend),
+                              workers, backend=backend)
     
     # Evaluate
-    y_pred = xgb_regressor.predict(X_test)
-    y_pred_df = pd.DataFrame(y_pred, columns=target_cols)
+    with run.stage("evaluate"):
+        y_pred = xgb_regressor.value.predict(X_test.value)
+    y_pred_df = pd.DataFrame(y_pred, columns=NAVAL_TARGETS)
     
     print("\nRegression Metrics:")
-    for i, col in enumerate(target_cols):
-        r2 = r2_score(y_test[col], y_pred_df[col])
-        rmse = np.sqrt(mean_squared_error(y_test[col], y_pred_df[col]))
-        mae = mean_absolute_error(y_test[col], y_pred_df[col])
+    for i, col in enumerate(NAVAL_TARGETS):
+        r2 = r2_score(y_test.value[col], y_pred_df[col])
+        rmse = np.sqrt(mean_squared_error(y_test.value[col], y_pred_df[col]))
+        mae = mean_absolute_error(y_test.value[col], y_pred_df[col])
+        run.metrics[col] = {"r2": float(r2), "rmse": float(rmse), "mae": float(mae)}
         print(f"\n{col}:")
         print(f"  R²: {r2:.4f}")
         print(f"  RMSE: {rmse:.6f}")
         print(f"  MAE: {mae:.6f}")
     
     # Create SHAP explainer
-    reg_explainer = shap.TreeExplainer(xgb_regressor)
+    reg_explainer = cache.run("explainer", build_explainer, xgb_regressor, code=(gbm_backends,), report=run).value
+    
+    # Reference feature distribution for drift monitoring
+    reference = cache.run("reference", build_reference, X_train, params={"n_bins": N_BINS},
+                          code=(bin_index,), report=run).value
     
     # Save models
     MODELS_DIR.mkdir(parents=True, exist_ok=True)
     EXPLAINERS_DIR.mkdir(parents=True, exist_ok=True)
     naval_model_path = MODELS_DIR / 'naval_model.pkl'
     naval_explainer_path = EXPLAINERS_DIR / 'naval_shap_explainer.pkl'
-    joblib.dump(xgb_regressor, naval_model_path)
-    joblib.dump(reg_explainer, naval_explainer_path)
+    naval_reference_path = MODELS_DIR / 'naval_reference.pkl'
+    with run.stage("dump"):
+        joblib.dump(xgb_regressor.value, naval_model_path)
+        joblib.dump(reg_explainer, naval_explainer_path)
+        joblib.dump(reference, naval_reference_path)
     print(f"\n✓ Naval model saved to {naval_model_path}")
     print(f"✓ SHAP explainer saved to {naval_explainer_path}")
+    print(f"✓ Drift reference saved to {naval_reference_path}")
+    
+    run.metrics["stage_cache"] = cache.stats()
+    print("\n" + run.summary())
+    print(f"✓ Run report saved to {run.save(MODELS_DIR)}")
+    return xgb_regressor.value, X_train.value, y_train.value, X_test.value, y_test.value
+
+
+def compact_models():
+    """Train both models, then build compacted variants and report their quality/latency frontier."""
+    if TRAINING_BACKEND != "xgboost":
+        raise ValueError(f"Compaction supports the xgboost backend only, not {TRAINING_BACKEND!r}")
+    targets = [
+        ("engine", train_engine_model, "marine_model", ENGINE_COMPACTION_TOLERANCE),
+        ("naval", train_naval_model, "naval_model", NAVAL_COMPACTION_TOLERANCE),
+    ]
+    for name, train, artifact, tolerance in targets:
+        model, X_train, y_train, X_test, y_test = train()
+        print("\n" + "=" * 50)
+        print(f"Compacting {name} model")
+        print("=" * 50)
+        
+        # Variants are selected on one half of the test split and reported on the other
+        X_val, X_holdout, y_val, y_holdout = train_test_split(
+            X_test, y_test, test_size=0.5, random_state=42,
+            stratify=y_test if name == "engine" else None
+        )
+        report = compact(model, X_train, y_train, X_val, y_val, X_holdout, y_holdout, tolerance)
+        
+        metric = "accuracy" if name == "engine" else "mean R²"
+        print(f"\n{'variant':<10} {metric:>9} {'rounds':>6} {'trees':>6} {'feats':>5} "
+              f"{'size KB':>8} {'predict µs':>10} {'shap µs':>9}")
+        for result in report["results"]:
+            marker = "*" if result["variant"] in report["frontier"] else " "
+            print(f"{result['variant']:<10} {result['quality']:>9.4f} {result['rounds']:>6} "
+                  f"{result['trees']:>6} {result['features']:>5} {result['size_bytes'] / 1024:>8.0f} "
+                  f"{result['predict_us']:>10.0f} {result['shap_us']:>9.0f} {marker}")
+        print("* on the quality/latency frontier")
+        if report["dropped_features"]:
+            print(f"Features with negligible SHAP importance: {report['dropped_features']}")
+        print(f"Recommended within {tolerance} {metric}: {report['recommended']}")
+        
+        recommended = report["models"][report["recommended"]]
+        compact_model_path = MODELS_DIR / f'{artifact}_compact.pkl'
+        compact_explainer_path = EXPLAINERS_DIR / f'{name}_compact_shap_explainer.pkl'
+        compact_report_path = MODELS_DIR / f'{name}_compaction.json'
+        joblib.dump(recommended, compact_model_path)
+        joblib.dump(shap.TreeExplainer(recommended), compact_explainer_path)
+        # Naval fields keep the API's names, aliased for only the features the variant kept
+        entry = registry_entry(f"{name}_compact", "classifier" if name == "engine" else "regressor", recommended,
+                               compact_model_path.name, compact_explainer_path.name, **SERVED_OUTPUTS[name])
+        with open(compact_report_path, 'w') as handle:
+            json.dump({**{key: value for key, value in report.items() if key != "models"},
+                       "registry_entry": entry}, handle, indent=2)
+        print(f"\n✓ Compacted model saved to {compact_model_path}")
+        print(f"✓ SHAP explainer saved to {compact_explainer_path}")
+        print(f"✓ Compaction report saved to {compact_report_path}")
+        print(f"Serve it by adding this entry to {MODELS_DIR / 'registry.json'}:\n{json.dumps(entry)}")
 
 
-def load_dataset(filename: str) -> pd.DataFrame:
-    dataset_path = DATA_DIR / filename
-    if not dataset_path.exists():
+def dataset_path(filename: str) -> Path:
+    path = DATA_DIR / filename
+    if not path.exists():
         raise FileNotFoundError(
-            f"Dataset {filename} is missing. Expected at {dataset_path}."
+            f"Dataset {filename} is missing. Expected at {path}."
         )
-    return pd.read_csv(dataset_path)
+    return path
 
 if __name__ == "__main__":
     import sys
@@ -172,8 +382,13 @@ if __name__ == "__main__":
             print("\n" + "=" * 50)
             print("Naval model trained successfully!")
             print("=" * 50)
+        elif model_type == "compact":
+            compact_models()
+            print("\n" + "=" * 50)
+            print("Compacted models saved successfully!")
+            print("=" * 50)
         else:
-            print("Usage: python train_models.py [engine|naval|all]")
+            print("Usage: python train_models.py [engine|naval|compact]")
             sys.exit(1)
     else:
         # Train both by default
@@ -2,6 +2,7 @@
 Training script for Naval Vessel Condition Model.
 """
 from pathlib import Path
+import sys
 
 import pandas as pd
 import numpy as np
@@ -17,6 +18,12 @@ DATA_DIR = BACKEND_ROOT / "sample_data"
 MODELS_DIR = BACKEND_ROOT / "models"
 EXPLAINERS_DIR = BACKEND_ROOT / "explainers"
 
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from drift import build_reference
+from run_report import RunReport
+
 def load_dataset(filename: str) -> pd.DataFrame:
     dataset_path = DATA_DIR / filename
     if not dataset_path.exists():
@@ -29,34 +36,38 @@ def train_naval_model():
     print("=" * 50)
     print("Training Naval Vessel Condition Model")
     print("=" * 50)
+    run = RunReport("naval")
     
     # Load dataset
-    df_naval = load_dataset('Predictive_Maintenance_Naval_Vessel_Condition.csv')
+    with run.stage("load"):
+        df_naval = load_dataset('Predictive_Maintenance_Naval_Vessel_Condition.csv')
     print(f"Loaded {len(df_naval)} samples")
     
     # Clean column names
-    if 'Unnamed: 0' in df_naval.columns:
-        df_naval = df_naval.drop('Unnamed: 0', axis=1)
-    if 'index' in df_naval.columns:
-        df_naval = df_naval.drop('index', axis=1)
-    
-    df_naval.columns = (df_naval.columns
-                        .str.replace('[\[\]()]', '', regex=True)
-                        .str.strip()
-                        .str.replace(' ', '_')
-                        .str.replace('.', ''))
+    with run.stage("clean"):
+        if 'Unnamed: 0' in df_naval.columns:
+            df_naval = df_naval.drop('Unnamed: 0', axis=1)
+        if 'index' in df_naval.columns:
+            df_naval = df_naval.drop('index', axis=1)
+        
+        df_naval.columns = (df_naval.columns
+                            .str.replace('[\[\]()]', '', regex=True)
+                            .str.strip()
+                            .str.replace(' ', '_')
+                            .str.replace('.', ''))
     
     # Define targets
     target_cols = ['GT_Compressor_decay_state_coefficient', 'GT_Turbine_decay_state_coefficient']
     
     # Split features and targets
-    X_naval = df_naval.drop(columns=target_cols)
-    y_naval = df_naval[target_cols]
-    
-    # Train-test split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X_naval, y_naval, test_size=0.2, random_state=42
-    )
+    with run.stage("split"):
+        X_naval = df_naval.drop(columns=target_cols)
+        y_naval = df_naval[target_cols]
+        
+        # Train-test split
+        X_train, X_test, y_train, y_test = train_test_split(
+            X_naval, y_naval, test_size=0.2, random_state=42
+        )
     
     # Train XGBoost regressor
     xgb_regressor = xgb.XGBRegressor(
@@ -65,10 +76,12 @@ def train_naval_model():
     )
     
     print("Training model...")
-    xgb_regressor.fit(X_train, y_train)
+    with run.stage("fit"):
+        xgb_regressor.fit(X_train, y_train)
     
     # Evaluate
-    y_pred = xgb_regressor.predict(X_test)
+    with run.stage("evaluate"):
+        y_pred = xgb_regressor.predict(X_test)
     y_pred_df = pd.DataFrame(y_pred, columns=target_cols)
     
     print("\nRegression Metrics:")
@@ -76,23 +89,36 @@ def train_naval_model():
         r2 = r2_score(y_test[col], y_pred_df[col])
         rmse = np.sqrt(mean_squared_error(y_test[col], y_pred_df[col]))
         mae = mean_absolute_error(y_test[col], y_pred_df[col])
+        run.metrics[col] = {"r2": float(r2), "rmse": float(rmse), "mae": float(mae)}
         print(f"\n{col}:")
         print(f"  R²: {r2:.4f}")
         print(f"  RMSE: {rmse:.6f}")
         print(f"  MAE: {mae:.6f}")
     
     # Create SHAP explainer
-    reg_explainer = shap.TreeExplainer(xgb_regressor)
+    with run.stage("explainer"):
+        reg_explainer = shap.TreeExplainer(xgb_regressor)
+    
+    # Reference feature distribution for drift monitoring
+    with run.stage("reference"):
+        reference = build_reference(X_train)
     
     # Save models
     MODELS_DIR.mkdir(parents=True, exist_ok=True)
     EXPLAINERS_DIR.mkdir(parents=True, exist_ok=True)
     naval_model_path = MODELS_DIR / 'naval_model.pkl'
     naval_explainer_path = EXPLAINERS_DIR / 'naval_shap_explainer.pkl'
-    joblib.dump(xgb_regressor, naval_model_path)
-    joblib.dump(reg_explainer, naval_explainer_path)
+    naval_reference_path = MODELS_DIR / 'naval_reference.pkl'
+    with run.stage("dump"):
+        joblib.dump(xgb_regressor, naval_model_path)
+        joblib.dump(reg_explainer, naval_explainer_path)
+        joblib.dump(reference, naval_reference_path)
     print(f"\n✓ Naval model saved to {naval_model_path}")
     print(f"✓ SHAP explainer saved to {naval_explainer_path}")
+    print(f"✓ Drift reference saved to {naval_reference_path}")
+    
+    print("\n" + run.summary())
+    print(f"✓ Run report saved to {run.save(MODELS_DIR)}")
 
 if __name__ == "__main__":
     train_naval_model()
@@ -0,0 +1,114 @@
+"""
+What-if sweeps and partial dependence.
+
+A sweep fixes a base feature vector and varies one or two features over a
+grid. `build_grid` writes every grid point into a single preallocated
+(points, features) float32 matrix so the whole response surface is scored in
+one model call instead of one request per point. Surfaces are cached per
+(model, base vector, grid, explain) in a small LRU, so dashboards re-asking the
+same question do not re-run the booster or SHAP.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel, Field, confloat, model_validator
+
+MAX_GRID_POINTS = 1000
+# Points in the whole surface (product of the grid sizes)
+MAX_SURFACE_POINTS = 10000
+
+# Grid points are scored like request fields (features.FeatureSchema), which reject NaN/inf
+FiniteFloat = confloat(allow_inf_nan=False)
+
+
+class FeatureGrid(BaseModel):
+    feature: str
+    values: Optional[List[FiniteFloat]] = Field(None, min_length=1, max_length=MAX_GRID_POINTS)
+    start: Optional[FiniteFloat] = None
+    stop: Optional[FiniteFloat] = None
+    steps: int = Field(50, ge=2, le=MAX_GRID_POINTS)
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.values is None and (self.start is None or self.stop is None):
+            raise ValueError("Give either values or start and stop")
+        return self
+
+    def points(self) -> np.ndarray:
+        if self.values is not None:
+            return np.asarray(self.values, dtype=np.float32)
+        return np.linspace(self.start, self.stop, self.steps, dtype=np.float32)
+
+
+class WhatIfRequest(BaseModel):
+    base: Dict[str, float]
+    grid: List[FeatureGrid] = Field(..., min_length=1, max_length=2)
+    explain: bool = False
+
+    @model_validator(mode="after")
+    def check_grid(self):
+        features = [grid.feature for grid in self.grid]
+        if len(set(features)) != len(features):
+            raise ValueError("Grid features must be distinct")
+        points = int(np.prod([len(grid.points()) for grid in self.grid]))
+        if points > MAX_SURFACE_POINTS:
+            raise ValueError(f"Surface has {points} points, limit is {MAX_SURFACE_POINTS}")
+        return self
+
+
+def build_grid(base: np.ndarray, columns: List[int], axes: List[np.ndarray]) -> np.ndarray:
+    """Rows of the full grid (first axis varying slowest) over a copy of the base vector."""
+    shape = tuple(len(axis) for axis in axes)
+    X = np.empty((int(np.prod(shape)), base.shape[-1]), dtype=np.float32)
+    X[:] = base.reshape(1, -1)
+    for column, mesh in zip(columns, np.meshgrid(*axes, indexing="ij")):
+        X[:, column] = mesh.ravel()
+    return X
+
+
+def cache_key(model_key: str, base: np.ndarray, columns: List[int], axes: List[np.ndarray], explain: bool) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model_key.encode())
+    digest.update(np.ascontiguousarray(base, dtype=np.float32).tobytes())
+    for column, axis in zip(columns, axes):
+        digest.update(np.int64(column).tobytes())
+        digest.update(np.ascontiguousarray(axis).tobytes())
+    digest.update(b"explain" if explain else b"predict")
+    return digest.hexdigest()
+
+
+class SurfaceCache:
+    """Thread-safe LRU of computed response surfaces."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            surface = self._entries.get(key)
+            if surface is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+    def put(self, key: str, surface: Dict):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = surface
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
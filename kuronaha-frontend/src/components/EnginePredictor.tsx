@@ -19,64 +19,64 @@ type FieldConfig = {
 };
 
 type EnginePayload = {
-  Lever_position: number;
-  Ship_speed: number;
-  Gas_Turbine_shaft_torque: number;
-  Gas_Turbine_rate_of_revolutions: number;
-  Gas_Generator_rate_of_revolutions: number;
-  Starboard_Propeller_Torque: number;
-  Port_Propeller_Torque: number;
-  HP_Turbine_exit_temperature: number;
-  GT_Compressor_inlet_air_temperature: number;
-  GT_Compressor_outlet_air_temperature: number;
-  HP_Turbine_exit_pressure: number;
+  Vibration_Amplitude: number;
+  RMS_Vibration: number;
+  Vibration_Frequency: number;
+  Surface_Temperature: number;
+  Exhaust_Temperature: number;
+  Acoustic_dB: number;
+  Acoustic_Frequency: number;
+  Intake_Pressure: number;
+  Exhaust_Pressure: number;
+  Frequency_Band_Energy: number;
+  Amplitude_Mean: number;
 };
 
 const ENGINE_FIELDS: FieldConfig[] = [
-  { name: "Lever_position", label: "Lever position", step: "0.01" },
-  { name: "Ship_speed", label: "Ship speed (knots)", step: "0.1" },
-  { name: "Gas_Turbine_shaft_torque", label: "Shaft torque", step: "1" },
-  { name: "Gas_Turbine_rate_of_revolutions", label: "Turbine RPM", step: "1" },
-  { name: "Gas_Generator_rate_of_revolutions", label: "Generator RPM", step: "1" },
-  { name: "Starboard_Propeller_Torque", label: "Starboard torque", step: "1" },
-  { name: "Port_Propeller_Torque", label: "Port torque", step: "1" },
-  { name: "HP_Turbine_exit_temperature", label: "HP exit temperature", step: "0.1" },
-  { name: "GT_Compressor_inlet_air_temperature", label: "Compressor inlet temp", step: "0.1" },
-  { name: "GT_Compressor_outlet_air_temperature", label: "Compressor outlet temp", step: "0.1" },
-  { name: "HP_Turbine_exit_pressure", label: "HP exit pressure", step: "0.01" },
+  { name: "Vibration_Amplitude", label: "Vibration amplitude", step: "0.01" },
+  { name: "RMS_Vibration", label: "RMS vibration", step: "0.01" },
+  { name: "Vibration_Frequency", label: "Vibration frequency (Hz)", step: "1" },
+  { name: "Surface_Temperature", label: "Surface temperature", step: "0.1" },
+  { name: "Exhaust_Temperature", label: "Exhaust temperature", step: "0.1" },
+  { name: "Acoustic_dB", label: "Acoustic level (dB)", step: "0.1" },
+  { name: "Acoustic_Frequency", label: "Acoustic frequency (Hz)", step: "1" },
+  { name: "Intake_Pressure", label: "Intake pressure", step: "0.1" },
+  { name: "Exhaust_Pressure", label: "Exhaust pressure", step: "0.1" },
+  { name: "Frequency_Band_Energy", label: "Frequency band energy", step: "0.01" },
+  { name: "Amplitude_Mean", label: "Amplitude mean", step: "0.01" },
 ];
 
 const ENGINE_PRESETS = {
   cruise: {
     label: "Cruise telemetry",
     payload: {
-      Lever_position: 0.51,
-      Ship_speed: 15.4,
-      Gas_Turbine_shaft_torque: 510,
-      Gas_Turbine_rate_of_revolutions: 3500,
-      Gas_Generator_rate_of_revolutions: 7900,
-      Starboard_Propeller_Torque: 455,
-      Port_Propeller_Torque: 447,
-      HP_Turbine_exit_temperature: 850,
-      GT_Compressor_inlet_air_temperature: 295,
-      GT_Compressor_outlet_air_temperature: 450,
-      HP_Turbine_exit_pressure: 15.5,
+      Vibration_Amplitude: 5.01,
+      RMS_Vibration: 2.59,
+      Vibration_Frequency: 1031.7,
+      Surface_Temperature: 89.6,
+      Exhaust_Temperature: 396.2,
+      Acoustic_dB: 90.4,
+      Acoustic_Frequency: 2569.8,
+      Intake_Pressure: 105.1,
+      Exhaust_Pressure: 95.3,
+      Frequency_Band_Energy: 0.54,
+      Amplitude_Mean: 0.25,
     } satisfies EnginePayload,
   },
   surge: {
     label: "Surge telemetry",
     payload: {
-      Lever_position: 0.78,
-      Ship_speed: 9.4,
-      Gas_Turbine_shaft_torque: 690,
-      Gas_Turbine_rate_of_revolutions: 4020,
-      Gas_Generator_rate_of_revolutions: 8800,
-      Starboard_Propeller_Torque: 520,
-      Port_Propeller_Torque: 515,
-      HP_Turbine_exit_temperature: 910,
-      GT_Compressor_inlet_air_temperature: 302,
-      GT_Compressor_outlet_air_temperature: 480,
-      HP_Turbine_exit_pressure: 18.2,
+      Vibration_Amplitude: 5.12,
+      RMS_Vibration: 2.5,
+      Vibration_Frequency: 977.5,
+      Surface_Temperature: 88.5,
+      Exhaust_Temperature: 397.1,
+      Acoustic_dB: 91.8,
+      Acoustic_Frequency: 2702.2,
+      Intake_Pressure: 104.7,
+      Exhaust_Pressure: 95.6,
+      Frequency_Band_Energy: 0.58,
+      Amplitude_Mean: 0.26,
     } satisfies EnginePayload,
   },
 } as const;
@@ -137,7 +137,7 @@ export function EnginePredictor() {
   return (
     <Card
       title="Engine faults"
-      description="Feed turbine telemetry and classify the condition instantly."
+      description="Feed vibration, thermal and acoustic telemetry and classify the condition instantly."
       actions={
         <div className="flex items-center gap-3 text-sm">
           <label className="flex items-center gap-2">